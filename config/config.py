@@ -1,29 +1,183 @@
 import os
-from dotenv import load_dotenv
+from typing import Any, Callable, Dict, Iterable, Optional
 
-# Load environment variables from .env file
-load_dotenv()
+# Per-environment defaults, selected with ENVIRONMENT; environment variables (and .env) still win
+PROFILES: Dict[str, Dict[str, Any]] = {
+    "test": {},
+    # The bundled stub started with `python -m utils.stub_server`
+    "local": {"BASE_URL": "http://127.0.0.1:8000", "MAX_RETRIES": 0},
+    "ci": {"BASE_URL": "https://api.restful-api.dev", "MAX_RETRIES": 3, "LOG_LEVEL": "INFO"},
+}
+
+
+class ConfigError(ValueError):
+    """A setting has a value that can't be converted or is out of range"""
+
+
+def _bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ("1", "true", "yes", "on"):
+        return True
+    if text in ("0", "false", "no", "off", ""):
+        return False
+    raise ValueError(f"not a boolean: {value!r}")
+
+
+def _url(value: Any) -> str:
+    text = str(value)
+    if not text.startswith(("http://", "https://")):
+        raise ValueError(f"not an http(s) URL: {value!r}")
+    return text
+
+
+def _optional(value: Any) -> Optional[str]:
+    return str(value) if value not in (None, "") else None
+
+
+class Setting:
+    """Typed field of Settings, read from the environment on first access and cached"""
+
+    def __init__(self, default: Any, cast: Callable[[Any], Any] = str, choices: Optional[Iterable[Any]] = None,
+                 minimum: Optional[float] = None):
+        self.default = default
+        self.cast = cast
+        self.choices = tuple(choices) if choices is not None else None
+        self.minimum = minimum
+
+    def __set_name__(self, owner, name: str):
+        self.name = name
+
+    def __get__(self, settings: Optional["Settings"], owner=None) -> Any:
+        if settings is None:
+            return self
+        try:
+            return settings._values[self.name]
+        except KeyError:
+            value = settings._values[self.name] = self.convert(settings._raw(self))
+            return value
+
+    def __set__(self, settings: "Settings", value: Any):
+        settings._values[self.name] = self.convert(value)
+
+    def convert(self, raw: Any) -> Any:
+        try:
+            value = self.cast(raw)
+        except (TypeError, ValueError) as e:
+            raise ConfigError(f"{self.name}: {e}") from None
+        if self.choices is not None and value not in self.choices:
+            raise ConfigError(f"{self.name}: {value!r} is not one of {', '.join(map(repr, self.choices))}")
+        if self.minimum is not None and value is not None and value < self.minimum:
+            raise ConfigError(f"{self.name}: {value!r} is below the minimum of {self.minimum}")
+        return value
+
+
+class Settings:
+    """Framework configuration: nothing is read until first used, then each value is converted, checked and cached
+
+    A value comes from, in order: an assignment (`Config.BASE_URL = ...`), the environment or `.env`, the
+    ENVIRONMENT's profile in PROFILES, the default below.
+    """
+
+    # Base URL of the API under test
+    BASE_URL = Setting("https://api.example.com", _url)
 
-class Config:
-    # Base URLs for different environments
-    BASE_URL = os.getenv('BASE_URL', 'https://api.example.com')
-    print(f"Using BASE_URL: {BASE_URL}")  # This will show which URL is actually being used
-    
     # API Timeouts
-    REQUEST_TIMEOUT = int(os.getenv('REQUEST_TIMEOUT', 30))
-    
+    REQUEST_TIMEOUT = Setting(30, int, minimum=1)
+
+    # Maximum number of requests AsyncAPIClient keeps in flight
+    MAX_CONCURRENCY = Setting(100, int, minimum=1)
+
+    # Connection pooling for the shared APIClient session
+    POOL_CONNECTIONS = Setting(10, int, minimum=1)  # Number of per-host pools to cache
+    POOL_MAXSIZE = Setting(10, int, minimum=1)  # Connections kept open per host
+    POOL_BLOCK = Setting(False, _bool)  # Wait for a free connection instead of opening extra ones
+    KEEP_ALIVE = Setting(True, _bool)
+
+    # Content-Encoding of request bodies of at least REQUEST_COMPRESSION_MIN_BYTES (empty sends them as-is)
+    REQUEST_COMPRESSION = Setting("", choices=("", "gzip", "deflate", "zstd"))
+    REQUEST_COMPRESSION_MIN_BYTES = Setting(1024, int, minimum=0)
+    # Accept-Encoding sent with every request (empty: every encoding urllib3 can decode; `identity` disables)
+    ACCEPT_ENCODING = Setting("")
+
+    # Number of validations after which a schema switches to a code-generated validator (0 disables)
+    SCHEMA_FAST_PATH_THRESHOLD = Setting(50, int, minimum=0)
+
+    # Level of the framework's test logger; records are only formatted when a test fails
+    LOG_LEVEL = Setting("DEBUG", lambda value: str(value).upper(), choices=("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"))
+
+    # Record/replay GET responses: record, replay or replay-or-record (empty disables)
+    CASSETTE_MODE = Setting("", choices=("", "record", "replay", "replay-or-record"))
+    CASSETTE_PATH = Setting("cassettes/api.cassette")
+    CASSETTE_COMPRESS = Setting(False, _bool)
+
+    # Session-wide cache of GET responses, revalidated with ETag/Last-Modified once stale (off by default)
+    HTTP_CACHE = Setting(False, _bool)
+    HTTP_CACHE_TTL = Setting(60.0, float, minimum=0)
+    HTTP_CACHE_MAX_BYTES = Setting(64 * 1024 * 1024, int, minimum=0)
+
+    # Request-level retries of transient failures (5xx, 429, connection errors)
+    MAX_RETRIES = Setting(2, int, minimum=0)
+    RETRY_BACKOFF = Setting(0.2, float, minimum=0)  # First backoff in seconds, doubled per retry, fully jittered
+    RETRY_BACKOFF_MAX = Setting(5.0, float, minimum=0)
+    RETRY_BUDGET_RATIO = Setting(0.2, float, minimum=0)  # Retries allowed per request sent, across the session
+    CIRCUIT_BREAKER_THRESHOLD = Setting(5, int, minimum=1)  # Consecutive failures that stop retrying
+    CIRCUIT_BREAKER_RESET = Setting(30.0, float, minimum=0)
+
+    # sqlite file remembering test durations between runs (empty disables)
+    HISTORY_DB = Setting(".pytest_history.db")
+
     # Authentication
-    API_KEY = os.getenv('API_KEY')
-    AUTH_TOKEN = os.getenv('AUTH_TOKEN')
-    
-    # Environment
-    ENVIRONMENT = os.getenv('ENVIRONMENT', 'test')
-    
-    @staticmethod
-    def get_headers():
+    API_KEY = Setting(None, _optional)
+    AUTH_TOKEN = Setting(None, _optional)
+
+    # Environment, selecting a profile from PROFILES
+    ENVIRONMENT = Setting("test", choices=tuple(PROFILES))
+
+    def __init__(self, environ: Optional[Dict[str, str]] = None, load_env_file: bool = True):
+        self._environ = environ
+        self._load_env_file = load_env_file
+        self._values: Dict[str, Any] = {}
+
+    @property
+    def environ(self):
+        if self._environ is None:
+            if self._load_env_file:
+                from dotenv import load_dotenv
+                # Load environment variables from .env file, once, and only when a setting is first read
+                load_dotenv()
+            self._environ = os.environ
+        return self._environ
+
+    def _raw(self, setting: Setting) -> Any:
+        if setting.name in self.environ:
+            return self.environ[setting.name]
+        if setting.name != "ENVIRONMENT":
+            profile = PROFILES[self.ENVIRONMENT]
+            if setting.name in profile:
+                return profile[setting.name]
+        return setting.default
+
+    @classmethod
+    def fields(cls) -> Dict[str, Setting]:
+        return {name: value for name, value in vars(cls).items() if isinstance(value, Setting)}
+
+    def validate(self) -> Dict[str, Any]:
+        """Resolve every setting now, raising ConfigError for the first invalid one"""
+        return {name: getattr(self, name) for name in self.fields()}
+
+    def reset(self):
+        """Forget resolved values and assignments so settings are read again"""
+        self._values.clear()
+
+    def get_headers(self) -> Dict[str, Optional[str]]:
         """Return default headers for API requests"""
         return {
             'Content-Type': 'application/json',
-            'Authorization': f'Bearer {Config.AUTH_TOKEN}' if Config.AUTH_TOKEN else None,
-            'X-API-Key': Config.API_KEY if Config.API_KEY else None
-        } 
\ No newline at end of file
+            'Authorization': f'Bearer {self.AUTH_TOKEN}' if self.AUTH_TOKEN else None,
+            'X-API-Key': self.API_KEY if self.API_KEY else None
+        }
+
+
+Config = Settings()
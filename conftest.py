@@ -0,0 +1,2 @@
+# Framework plugins available to every pytest run in this repository
+pytest_plugins = ["utils.load_plugin", "utils.schedule_plugin", "utils.results_plugin"]
@@ -1,9 +1,11 @@
 import pytest
-import requests
 from config.config import Config
-import json
 from urllib.parse import urljoin
-from utils.api_client import APIClient
+from utils.diff import diff_objects
+from utils.log import logger, TruncatedBody, TruncatedJSON
+from utils.models import PRODUCT_SCHEMA
+from utils.schema_validation import validate, validate_many
+
 
 class BaseTest:
     """Base test class with common functionality"""
@@ -12,50 +14,28 @@ class BaseTest:
         """Setup method run before each test"""
         self.base_url = Config.BASE_URL.rstrip('/')  # Remove trailing slash if present
         self.base_endpoint = "/objects"  # Base endpoint for the objects API
-        self.api_client = requests.Session()
-        print(f"\nUsing base URL: {self.base_url}")
-        print(f"Using endpoint: {self.base_endpoint}")
+        logger.debug("Using base URL: %s, endpoint: %s", self.base_url, self.base_endpoint)
     
     @pytest.fixture(autouse=True)
-    def setup(self):
+    def setup(self, shared_api_client):
         """Setup method that runs before each test"""
-        self.api_client = APIClient()
+        self.api_client = shared_api_client  # One pooled session per test session (and per xdist worker)
         self.base_endpoint = "/objects"  # Base endpoint for the objects API
         yield
         
+    @pytest.fixture
+    async def async_api_client(self):
+        """Async client for tests written as `async def`, closed after the test"""
+        # Imported here so collecting sync-only modules doesn't pay for aiohttp
+        from utils.async_api_client import AsyncAPIClient
+        async with AsyncAPIClient() as client:
+            yield client
+        
     @pytest.fixture
     def product_schema(self):
         """Common schema for product objects"""
-        return {
-            "type": "object",
-            "properties": {
-                "id": {"type": "string"},
-                "name": {"type": "string"},
-                "data": {
-                    "type": ["object", "null"],
-                    "properties": {
-                        "color": {"type": ["string", "null"]},
-                        "capacity": {"type": ["string", "null"]},
-                        "capacity GB": {"type": ["integer", "null"]},
-                        "price": {"type": ["number", "null"]},
-                        "generation": {"type": ["string", "null"]},
-                        "year": {"type": ["integer", "null"]},
-                        "CPU model": {"type": ["string", "null"]},
-                        "Hard disk size": {"type": ["string", "null"]},
-                        "Strap Colour": {"type": ["string", "null"]},
-                        "Case Size": {"type": ["string", "null"]},
-                        "Color": {"type": ["string", "null"]},
-                        "Description": {"type": ["string", "null"]},
-                        "Screen size": {"type": ["number", "null"]},
-                        "Capacity": {"type": ["string", "null"]},
-                        "Generation": {"type": ["string", "null"]},
-                        "Price": {"type": ["string", "null"]}
-                    },
-                    "additionalProperties": True
-                }
-            },
-            "required": ["id", "name", "data"]
-        }
+        # Always the same object so its compiled validator is reused across tests
+        return PRODUCT_SCHEMA
         
     def get_full_url(self, path=""):
         """Get full URL for a given path"""
@@ -67,21 +47,28 @@ class BaseTest:
     def validate_response_schema(self, response, schema):
         """Validate response against JSON schema"""
         try:
-            from jsonschema import validate
             response_json = response.json()
-            print(f"\nValidating schema for response: {json.dumps(response_json, indent=2)[:500]}")
-            validate(instance=response_json, schema=schema)
+            logger.debug("Validating schema for response: %s", TruncatedJSON(response_json, 500))
+            validate(response_json, schema)
+        except Exception as e:
+            logger.error("Schema validation error: %s", e)
+            raise
+            
+    def validate_many(self, objects, schema):
+        """Validate a list of objects against an item schema in a single pass"""
+        try:
+            logger.debug("Validating schema for %d objects", len(objects))
+            validate_many(objects, schema)
         except Exception as e:
-            print(f"Schema validation error: {str(e)}")
+            logger.error("Schema validation error: %s", e)
             raise
             
     def assert_status_code(self, response, expected_status_code):
         """Assert response status code"""
-        print(f"\nRequest URL: {response.request.url}")
-        print(f"Request Method: {response.request.method}")
-        print(f"Response Status: {response.status_code}")
-        print(f"Response Headers: {json.dumps(dict(response.headers), indent=2)}")
-        print(f"Response Body: {response.text[:1000]}")  # First 1000 chars to avoid huge output
+        # Arguments are only formatted if the test fails, and the body is cut at 1000 bytes before decoding
+        logger.debug("Request: %s %s\nResponse Status: %s\nResponse Headers: %s\nResponse Body: %s",
+                     response.request.method, response.request.url, response.status_code,
+                     response.headers, TruncatedBody(response, 1000))
         
         assert response.status_code == expected_status_code, \
             f"Expected status code {expected_status_code}, but got {response.status_code}"
@@ -94,4 +81,18 @@ class BaseTest:
         """Assert product contains required fields"""
         assert "id" in product, "Product missing 'id' field"
         assert "name" in product, "Product missing 'name' field"
-        assert "data" in product or product["data"] is None, "Product missing 'data' field" 
+        assert "data" in product or product["data"] is None, "Product missing 'data' field"
+
+    def assert_matches_cases(self, objects, cases, key="id"):
+        """Assert objects match a batch of expected cases, field by field; objects without a case are ignored"""
+        return self.assert_no_diff(objects, cases, key, ignore_unexpected=True)
+
+    def assert_no_diff(self, objects, expected, key="id", **options):
+        """Assert objects (a list or a stream) match expectations keyed by `key`, reporting every difference
+
+        Options are passed to utils.diff.diff_objects (rel_tol, abs_tol, ignore, strict, ignore_unexpected, ...).
+        """
+        report = diff_objects(expected, objects, key, **options)
+        logger.debug("Compared %d objects, %d differences", report.compared, report.total)
+        assert not report, report.summary()
+        return report
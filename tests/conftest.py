@@ -0,0 +1,291 @@
+import json
+import os
+import warnings
+import allure
+import pytest
+from config.config import Config, ConfigError
+from utils.api_client import APIClient, ConnectionStats
+from utils.cassette import MODES, Cassette
+from utils.data_cases import scan_batches
+from utils.http_cache import CacheStats, ResponseCache
+from utils.log import FailureLogHandler, configure_logging
+from utils.metrics import LatencyRecorder
+from utils.object_factory import ObjectFactory
+from utils.retry import CircuitBreaker, RetryBudget, RetryPolicy
+from utils.results_plugin import results_writer_key
+from utils.schedule_plugin import history_key
+from utils.stub_server import StubServer
+
+MACBOOK_PAYLOAD = {
+    "name": "Apple MacBook Pro 16",
+    "data": {
+        "year": 2019,
+        "price": 1849.99,
+        "CPU model": "Intel Core i9",
+        "Hard disk size": "1 TB"
+    }
+}
+
+connection_stats_key = pytest.StashKey[ConnectionStats]()
+cache_stats_key = pytest.StashKey[CacheStats]()
+stub_server_key = pytest.StashKey[StubServer]()
+request_metrics_key = pytest.StashKey[LatencyRecorder]()
+failure_log_key = pytest.StashKey[FailureLogHandler]()
+
+
+def pytest_addoption(parser):
+    parser.addoption("--stub", action="store_true", default=False,
+                     help="Run against an in-process stub of the /objects API instead of BASE_URL")
+    parser.addoption("--stub-latency-ms", type=float, default=0.0, help="Delay added to every stub response")
+    parser.addoption("--stub-jitter-ms", type=float, default=0.0, help="Extra random stub delay, uniform in [0, jitter]")
+    parser.addoption("--stub-error-rate", type=float, default=0.0, help="Fraction of stub requests that fail with 500")
+    parser.addoption("--stub-compress", action="store_true", default=False,
+                     help="Compress stub responses the client accepts compressed")
+    parser.addoption("--metrics-json", default="request_metrics.json",
+                     help="Where to write per-endpoint request timings at session end ('' to disable)")
+    parser.addoption("--cassette-mode", default=Config.CASSETTE_MODE or None, choices=MODES,
+                     help="Record GET responses to, or replay them from, --cassette")
+    parser.addoption("--cassette", default=Config.CASSETTE_PATH, help="Cassette file used by --cassette-mode")
+    parser.addoption("--cassette-compress", action="store_true", default=Config.CASSETTE_COMPRESS,
+                     help="zlib-compress recorded bodies")
+    parser.addoption("--http-cache", action="store_true", default=Config.HTTP_CACHE,
+                     help="Cache GET responses for the session (HTTP_CACHE_TTL, HTTP_CACHE_MAX_BYTES)")
+
+
+def pytest_configure(config):
+    try:
+        Config.validate()
+    except ConfigError as e:
+        raise pytest.UsageError(f"Invalid configuration: {e}")
+    config.stash[connection_stats_key] = ConnectionStats()
+    config.stash[cache_stats_key] = CacheStats()
+    config.stash[request_metrics_key] = LatencyRecorder()
+    config.stash[failure_log_key] = configure_logging(Config.LOG_LEVEL)
+    if config.getoption("cassette_mode") in ("record", "replay-or-record") and config.getoption("numprocesses", None):
+        raise pytest.UsageError("Recording a cassette is not supported with xdist (-n); record serially, replay in parallel")
+    if config.getoption("stub"):
+        server = config.stash[stub_server_key] = StubServer(
+            latency=config.getoption("stub_latency_ms") / 1000,
+            jitter=config.getoption("stub_jitter_ms") / 1000,
+            error_rate=config.getoption("stub_error_rate"),
+            compress_responses=config.getoption("stub_compress"),
+        ).start()
+        Config.BASE_URL = server.url
+
+
+def pytest_report_header(config):
+    return f"base url: {Config.BASE_URL} (environment: {Config.ENVIRONMENT})"
+
+
+def pytest_unconfigure(config):
+    server = config.stash.get(stub_server_key, None)
+    if server is not None:
+        server.stop()
+
+
+def pytest_generate_tests(metafunc):
+    """Parametrize `cases` from the file named by @pytest.mark.cases(path, batch_size=...)"""
+    marker = metafunc.definition.get_closest_marker("cases")
+    if marker is None or "cases" not in metafunc.fixturenames:
+        return
+    path = os.path.join(os.path.dirname(str(metafunc.definition.fspath)), *marker.args)
+    # Only batch locations are kept; rows are read when each test runs
+    batches = list(scan_batches(path, **marker.kwargs))
+    metafunc.parametrize("cases", batches, ids=repr)
+
+
+def pytest_collection_modifyitems(items):
+    for item in items:
+        if "object_factory" in item.fixturenames:
+            item.add_marker(pytest.mark.mutating)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    item.config.stash[failure_log_key].clear()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    # Log records are only formatted for failing tests; passing tests just drop them
+    if report.failed:
+        text = item.config.stash[failure_log_key].format_records()
+        if text:
+            report.sections.append((f"Captured api log {call.when}", text))
+
+
+@pytest.fixture(scope="session")
+def shared_api_client(pytestconfig):
+    """APIClient shared by every test in the session; xdist workers each get their own"""
+    mode = pytestconfig.getoption("cassette_mode")
+    cassette = None
+    if mode:
+        cassette = Cassette(pytestconfig.getoption("cassette"), mode, compress=pytestconfig.getoption("cassette_compress"))
+    cache = None
+    if pytestconfig.getoption("http_cache"):
+        cache = ResponseCache(Config.HTTP_CACHE_MAX_BYTES, Config.HTTP_CACHE_TTL)
+    client = APIClient(cassette=cassette, cache=cache)
+    client.add_listener(pytestconfig.stash[request_metrics_key].record)
+    yield client
+    pytestconfig.stash[connection_stats_key].merge(client.connection_stats())
+    if cache is not None:
+        pytestconfig.stash[cache_stats_key].merge(cache.stats)
+    client.close()
+    if cassette is not None:
+        cassette.close()
+
+
+@pytest.fixture(autouse=True)
+def request_metrics(request, shared_api_client):
+    """Timings of the requests made by one test, attached to the Allure report"""
+    recorder = LatencyRecorder()
+    shared_api_client.add_listener(recorder.record)
+    yield recorder
+    shared_api_client.remove_listener(recorder.record)
+    # Remembered in the run history so unmarked tests can be classified read-only or mutating
+    request.node.user_properties.append(("api_methods", sorted({method for method, _ in recorder.endpoints})))
+    if recorder.endpoints:
+        allure.attach(json.dumps(recorder.summary(), indent=2), name="request metrics",
+                      attachment_type=allure.attachment_type.JSON)
+
+
+@pytest.fixture
+def object_factory(shared_api_client):
+    """Factory creating objects through the shared client; everything it created is deleted after the test"""
+    factory = ObjectFactory(shared_api_client)
+    yield factory
+    leaked = factory.cleanup()
+    if leaked:
+        warnings.warn(f"Failed to delete test objects: {', '.join(leaked)}")
+
+
+@pytest.fixture
+def create_macbook(object_factory):
+    """Fixture to create a MacBook object and return its data"""
+    return object_factory.create(MACBOOK_PAYLOAD)
+
+
+@pytest.fixture
+def client_factory(stub_server):
+    """Build APIClients (against the stub unless given a base_url); all of them are closed after the test, pass
+    or fail"""
+    clients = []
+
+    def make(**kwargs) -> APIClient:
+        kwargs.setdefault("base_url", stub_server.url)
+        client = APIClient(**kwargs)
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.close()
+
+
+@pytest.fixture
+def client(request, client_factory):
+    """An APIClient of its own against the stub; parametrize it indirectly with a dict of APIClient arguments"""
+    return client_factory(**getattr(request, "param", {}))
+
+
+@pytest.fixture
+def isolated_retry_policy():
+    """No retries, and a budget and circuit breaker of its own, so failures a test provokes on purpose don't open
+    the session-wide breaker for the tests after it"""
+    return RetryPolicy(max_retries=0, budget=RetryBudget(), breaker=CircuitBreaker())
+
+
+@pytest.fixture(scope="session")
+def stub_server(pytestconfig):
+    """Local /objects API served in-process for the duration of the session"""
+    server = pytestconfig.stash.get(stub_server_key, None)
+    if server is not None:
+        yield server
+        return
+    with StubServer() as server:
+        yield server
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    # On xdist workers, hand the counters to the controller
+    if hasattr(config, "workeroutput"):
+        config.workeroutput["connection_stats"] = config.stash[connection_stats_key].as_dict()
+        config.workeroutput["cache_stats"] = config.stash[cache_stats_key].as_dict()
+        config.workeroutput["request_metrics"] = config.stash[request_metrics_key].to_dict()
+        return
+    path = config.getoption("metrics_json")
+    recorder = config.stash[request_metrics_key]
+    if path and recorder.endpoints:
+        with open(path, "w") as f:
+            json.dump({"summary": recorder.summary(), "histograms": recorder.to_dict()}, f, indent=2)
+    writer = config.stash[results_writer_key]
+    if writer is not None:
+        cache = config.stash[cache_stats_key]
+        writer.write({"event": "metrics", "requests": recorder.summary(),
+                      "connections": config.stash[connection_stats_key].as_dict(),
+                      "cache": cache.as_dict() if cache.lookups else None})
+    history = config.stash[history_key]
+    if history is not None and recorder.endpoints:
+        history.record_endpoints(
+            (f"{method} {endpoint}", stats.count, stats.phases["total"].percentile(50), stats.phases["total"].percentile(99))
+            for (method, endpoint), stats in recorder.endpoints.items()
+        )
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    output = getattr(node, "workeroutput", {})
+    stats = output.get("connection_stats")
+    if stats:
+        node.config.stash[connection_stats_key].merge(ConnectionStats(stats["opened"], stats["requests_sent"]))
+    cache_stats = output.get("cache_stats")
+    if cache_stats:
+        node.config.stash[cache_stats_key].merge(CacheStats(**cache_stats))
+    metrics = output.get("request_metrics")
+    if metrics:
+        node.config.stash[request_metrics_key].merge(LatencyRecorder.from_dict(metrics))
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_html_results_summary(prefix, summary, postfix, session):
+    cache = session.config.stash[cache_stats_key]
+    if cache.lookups:
+        prefix.append(f"<p>HTTP cache: {_cache_summary(cache)}</p>")
+    rows = session.config.stash[request_metrics_key].summary()
+    if not rows:
+        return
+    cells = "".join(
+        f"<tr><td>{row['method']} {row['endpoint']}</td><td>{row['requests']}</td><td>{row['errors']}</td>"
+        + "".join(f"<td>{row['phases']['total'][p]:.1f}</td>" for p in ("p50_ms", "p90_ms", "p99_ms", "p999_ms"))
+        + f"<td>{row['request_bytes']}</td><td>{row['response_bytes']}</td>"
+        + f"<td>{row['request_wire_bytes']}</td><td>{row['response_wire_bytes']}</td></tr>"
+        for row in rows
+    )
+    prefix.append(
+        "<h2>Request metrics</h2><table><tr><th>Endpoint</th><th>Requests</th><th>Errors</th>"
+        "<th>p50 ms</th><th>p90 ms</th><th>p99 ms</th><th>p999 ms</th><th>Bytes sent</th><th>Bytes received</th>"
+        "<th>Wire sent</th><th>Wire received</th></tr>"
+        f"{cells}</table>"
+    )
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    stats = config.stash[connection_stats_key]
+    if stats.requests_sent:
+        terminalreporter.write_sep("-", "connection pool")
+        terminalreporter.write_line(
+            f"requests sent: {stats.requests_sent}, connections opened: {stats.opened}, reused: {stats.reused}"
+        )
+    cache = config.stash[cache_stats_key]
+    if cache.lookups:
+        terminalreporter.write_sep("-", "http cache")
+        terminalreporter.write_line(_cache_summary(cache))
+
+
+def _cache_summary(stats: CacheStats) -> str:
+    return (f"hits: {stats.hits}, revalidated: {stats.revalidated}, misses: {stats.misses} "
+            f"({stats.hit_ratio:.0%} without a body transfer), evicted: {stats.evicted}, "
+            f"invalidated: {stats.invalidated}")
@@ -0,0 +1,45 @@
+import asyncio
+import pytest
+from tests.base_test import BaseTest
+from utils.async_api_client import AsyncAPIClient
+
+class TestAsyncAPI(BaseTest):
+    """Tests for AsyncAPIClient against the local stub server"""
+
+    @pytest.fixture
+    async def stub_client(self, stub_server):
+        async with AsyncAPIClient(base_url=stub_server.url, max_concurrency=10) as client:
+            yield client
+
+    async def test_get_single_object(self, stub_client, product_schema):
+        """Test getting a single object asynchronously"""
+        response = await stub_client.get(f"{self.base_endpoint}/1")
+
+        self.assert_status_code(response, 200)
+        self.validate_response_schema(response, product_schema)
+        assert response.json()["name"] == "Google Pixel 6 Pro"
+
+    async def test_fan_out_gets(self, stub_client):
+        """Test fanning out many concurrent GETs through the bounded client"""
+        ids = [str(i % 13 + 1) for i in range(200)]
+        responses = await asyncio.gather(*(stub_client.get(f"{self.base_endpoint}/{id_}") for id_ in ids))
+
+        assert [r.status_code for r in responses] == [200] * len(ids)
+        assert [r.json()["id"] for r in responses] == ids
+
+    async def test_crud_round_trip(self, stub_client):
+        """Test create, update, patch and delete through the async verbs"""
+        payload = {"name": "Apple MacBook Pro 16", "data": {"year": 2019, "price": 1849.99}}
+        created = (await stub_client.post(self.base_endpoint, json=payload)).json()
+        object_url = f"{self.base_endpoint}/{created['id']}"
+
+        response = await stub_client.put(object_url, json={"name": "Updated", "data": {"year": 2020}})
+        self.assert_status_code(response, 200)
+        assert response.json()["data"] == {"year": 2020}
+
+        response = await stub_client.patch(object_url, json={"name": "Patched"})
+        self.assert_status_code(response, 200)
+        assert response.json()["name"] == "Patched"
+
+        self.assert_status_code(await stub_client.delete(object_url), 200)
+        self.assert_status_code(await stub_client.get(object_url), 404)
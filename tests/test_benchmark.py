@@ -0,0 +1,51 @@
+import json
+import pytest
+from tests.base_test import BaseTest
+from utils.benchmark import BENCHMARKS, compare, main, measure, run_benchmarks
+from utils.stub_server import SEED_OBJECTS
+
+
+class TestBenchmark(BaseTest):
+    """Tests for the offline benchmark runner"""
+
+    def test_measure_calibrates_rounds(self):
+        """Test a fast function is repeated until a round lasts min_time"""
+        calls = []
+        stats = measure(lambda: calls.append(1), rounds=3, min_time=0.005)
+        assert stats["rounds"] == 3 and stats["number"] > 1
+        assert stats["min"] <= stats["median"] <= 0.005
+        assert len(calls) > 3 * stats["number"]
+
+    def test_compare_flags_slower_medians(self):
+        """Test only benchmarks slower than the threshold, and present in both runs, are reported"""
+        baseline = {"a": {"median": 1.0}, "b": {"median": 1.0}, "gone": {"median": 1.0}}
+        current = {"a": {"median": 1.1}, "b": {"median": 1.5}, "new": {"median": 9.0}}
+        assert compare(current, baseline, threshold=0.2) == [("b", 1.0, 1.5, 1.5)]
+
+    def test_save_and_compare(self, tmp_path, capsys):
+        """Test results are saved and a later run fails against an impossibly fast baseline"""
+        path = str(tmp_path / "run.json")
+        main(["--filter", "schema.validate_many[1]", "--rounds", "2", "--min-time", "0.001", "--save", path])
+        with open(path) as f:
+            saved = json.load(f)
+        assert list(saved["benchmarks"]) == ["schema.validate_many[1]"]
+
+        saved["benchmarks"]["schema.validate_many[1]"]["median"] = 1e-12
+        with open(path, "w") as f:
+            json.dump(saved, f)
+        with pytest.raises(SystemExit) as exc_info:
+            main(["--filter", "schema.validate_many[1]", "--rounds", "2", "--min-time", "0.001", "--compare", path])
+        assert exc_info.value.code == 1
+        assert "REGRESSION schema.validate_many[1]" in capsys.readouterr().out
+
+    def test_created_objects_deleted_after_post(self, monkeypatch):
+        """Test the objects the POST benchmark creates are deleted before the next benchmark is set up"""
+        sizes = []
+
+        def probe(context):
+            sizes.append(len(context["server"].store.list()))
+            return lambda: None
+
+        monkeypatch.setitem(BENCHMARKS, "probe", probe)
+        run_benchmarks(["client.POST", "probe"], rounds=2, min_time=0.001)
+        assert sizes == [len(SEED_OBJECTS)]
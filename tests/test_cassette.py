@@ -0,0 +1,104 @@
+import os
+import pytest
+from tests.base_test import BaseTest
+from utils.cassette import Cassette, CassetteMissError
+from utils.payload import decoded_headers
+from utils.stub_server import StubServer
+
+class TestCassette(BaseTest):
+    """Tests for recording responses to a cassette file and replaying them offline"""
+
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_replay_is_byte_identical(self, tmp_path, compress, client_factory):
+        """Test a replayed response has the recorded status, headers and exact body bytes"""
+        path = str(tmp_path / "api.cassette")
+        with StubServer() as server:
+            cassette = Cassette(path, "record", compress=compress)
+            client = client_factory(base_url=server.url, cassette=cassette)
+            recorded = [client.get(f"{self.base_endpoint}/{id_}") for id_ in ("1", "7", "404")]
+            recorded.append(client.get(self.base_endpoint, params=[("id", "3"), ("id", "5")]))
+            cassette.close()
+
+        # The server is gone and replay uses a different base URL: nothing may reach the network
+        cassette = Cassette(path, "replay")
+        client = client_factory(base_url="http://127.0.0.1:9", cassette=cassette)
+        assert len(cassette) == 4
+        for original in recorded:
+            replayed = client.get(original.request.path_url)
+            assert replayed.status_code == original.status_code
+            assert replayed.content == original.content
+            assert replayed.headers == dict(decoded_headers(original.headers.items()))
+            assert "Content-Length" not in replayed.headers
+        self.assert_product_fields(client.get(f"{self.base_endpoint}/7").json())
+
+        with pytest.raises(CassetteMissError):
+            client.get(f"{self.base_endpoint}/2")
+        cassette.close()
+
+    def test_replay_or_record_appends_misses(self, tmp_path, client_factory):
+        """Test replay-or-record serves known requests from disk and records new ones"""
+        path = str(tmp_path / "api.cassette")
+        with StubServer() as server:
+            cassette = Cassette(path, "replay-or-record")
+            client = client_factory(base_url=server.url, cassette=cassette)
+            first = client.get(f"{self.base_endpoint}/1")
+            cassette.close()
+
+            server.store.update("1", {"name": "changed"})
+            cassette = Cassette(path, "replay-or-record")
+            client.adapter.cassette = cassette
+            assert client.get(f"{self.base_endpoint}/1").content == first.content
+            client.get(f"{self.base_endpoint}/2")
+            requests_seen = client.connection_stats().requests_sent
+            cassette.close()
+
+        assert requests_seen == 2
+        assert len(Cassette(path, "replay")) == 2
+
+    def test_mutating_requests_pass_through(self, tmp_path, client_factory):
+        """Test only GET requests are recorded by default"""
+        cassette = Cassette(str(tmp_path / "api.cassette"), "record")
+        client = client_factory(cassette=cassette)
+        response = client.post(self.base_endpoint, json={"name": "Cassette", "data": None})
+        self.assert_status_code(response, 200)
+        assert len(cassette) == 0
+        cassette.close()
+
+    def test_transient_failures_not_recorded(self, tmp_path, client_factory, isolated_retry_policy):
+        """Test 5xx and 429 responses pass through without being recorded"""
+        cassette = Cassette(str(tmp_path / "api.cassette"), "record")
+        for status in (503, 429):
+            with StubServer(error_rate=1.0, error_status=status) as server:
+                client = client_factory(base_url=server.url, cassette=cassette, retry_policy=isolated_retry_policy)
+                self.assert_status_code(client.get(f"{self.base_endpoint}/1"), status)
+        assert len(cassette) == 0
+        cassette.close()
+
+    def test_record_mode_keeps_other_recordings(self, tmp_path):
+        """Test a later record session adds to the cassette instead of replacing it"""
+        path = str(tmp_path / "api.cassette")
+        first, second = Cassette.key("GET", "/objects/1", None), Cassette.key("GET", "/objects/2", None)
+        for key, body in ((first, b"one"), (second, b"two"), (first, b"uno")):
+            cassette = Cassette(path, "record")
+            cassette.record(key, 200, "OK", [], body)
+            cassette.close()
+
+        cassette = Cassette(path, "replay")
+        assert len(cassette) == 2
+        assert cassette.lookup(first)[3] == b"uno" and cassette.lookup(second)[3] == b"two"
+        cassette.close()
+
+    def test_re_recorded_bytes_are_compacted(self, tmp_path):
+        """Test re-recording the same request over and over doesn't grow the file without bound"""
+        path = str(tmp_path / "api.cassette")
+        key = Cassette.key("GET", "/objects/1", None)
+        sizes = []
+        for i in range(20):
+            cassette = Cassette(path, "record")
+            cassette.record(key, 200, "OK", [], b"x" * 1000 + str(i).encode())
+            cassette.close()
+            sizes.append(os.path.getsize(path))
+        assert max(sizes) < 3 * sizes[0]
+        cassette = Cassette(path, "replay")
+        assert len(cassette) == 1 and cassette.lookup(key)[3].endswith(b"19")
+        cassette.close()
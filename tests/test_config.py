@@ -0,0 +1,52 @@
+import subprocess
+import sys
+import pytest
+from config.config import ConfigError, Settings
+from tests.base_test import BaseTest
+from utils.startup_benchmark import parse_importtime
+
+
+class TestConfig(BaseTest):
+    """Tests for the lazy, validated settings object"""
+
+    def test_import_has_no_side_effects(self):
+        """Test importing the config neither prints nor loads .env until a setting is read"""
+        code = "import sys, config.config as c; print('dotenv' in sys.modules); c.Config.BASE_URL; print('dotenv' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        assert result.stdout.split() == ["False", "True"]
+
+    def test_typed_values_and_precedence(self):
+        """Test values are converted and resolved as assignment > environment > profile > default"""
+        settings = Settings({"ENVIRONMENT": "ci", "REQUEST_TIMEOUT": "5", "POOL_BLOCK": "yes"}, load_env_file=False)
+        assert settings.REQUEST_TIMEOUT == 5
+        assert settings.POOL_BLOCK is True
+        assert settings.BASE_URL == "https://api.restful-api.dev"  # from the ci profile
+        assert settings.MAX_RETRIES == 3
+        assert settings.KEEP_ALIVE is True  # default
+        assert settings.API_KEY is None
+
+        settings.BASE_URL = "http://127.0.0.1:1234"
+        assert settings.BASE_URL == "http://127.0.0.1:1234"
+        settings.reset()
+        assert settings.BASE_URL == "https://api.restful-api.dev"
+
+    @pytest.mark.parametrize("environ", [
+        {"REQUEST_TIMEOUT": "soon"},
+        {"REQUEST_TIMEOUT": "0"},
+        {"BASE_URL": "api.example.com"},
+        {"ENVIRONMENT": "moon"},
+        {"LOG_LEVEL": "chatty"},
+        {"KEEP_ALIVE": "maybe"},
+        {"REQUEST_COMPRESSION": "br"},
+    ])
+    def test_invalid_values_are_rejected(self, environ):
+        """Test validate() reports unconvertible and out-of-range values"""
+        with pytest.raises(ConfigError, match=next(iter(environ))):
+            Settings(environ, load_env_file=False).validate()
+
+    def test_parse_importtime(self):
+        """Test -X importtime lines are parsed with their nesting depth"""
+        stderr = ("import time: self [us] | cumulative | imported package\n"
+                  "import time:       120 |        120 |     _io\n"
+                  "import time:       905 |     154892 | pytest\n")
+        assert parse_importtime(stderr) == [("_io", 120, 120, 2), ("pytest", 905, 154892, 0)]
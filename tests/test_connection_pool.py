@@ -0,0 +1,14 @@
+from tests.base_test import BaseTest
+
+class TestConnectionPool(BaseTest):
+    """Tests for connection reuse in APIClient's pooled session"""
+
+    def test_requests_reuse_pooled_connection(self, client):
+        """Test sequential requests are served over a single kept-alive connection"""
+        for _ in range(5):
+            self.assert_status_code(client.get(f"{self.base_endpoint}/1"), 200)
+
+        stats = client.connection_stats()
+        assert stats.requests_sent == 5
+        assert stats.opened == 1, f"Expected 1 connection to be opened, got {stats.opened}"
+        assert stats.reused == 4
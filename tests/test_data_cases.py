@@ -0,0 +1,65 @@
+import importlib.util
+import json
+import pytest
+from tests.base_test import BaseTest
+from utils.data_cases import ANY, MISSING, compare_columns, iter_cases, scan_batches, to_columns
+
+
+class TestDataCases(BaseTest):
+    """Tests for case files read in batches and compared column by column"""
+
+    def test_batches_are_located_without_reading_rows(self, tmp_path):
+        """Test a large JSONL file is split into batches that each read back only their own rows"""
+        path = tmp_path / "cases.jsonl"
+        with open(path, "w") as f:
+            for i in range(25000):
+                f.write(json.dumps({"id": str(i), "name": f"object {i}"}) + "\n")
+                if i % 1000 == 0:
+                    f.write("\n")
+
+        batches = list(scan_batches(str(path), batch_size=10000))
+        assert [(b.start, b.count) for b in batches] == [(0, 10000), (10000, 10000), (20000, 5000)]
+        assert repr(batches[1]) == "cases.jsonl[10000:20000]"
+        rows = batches[2].rows()
+        assert rows[0] == {"id": "20000", "name": "object 20000"}
+        assert rows[-1]["id"] == "24999"
+
+    def test_csv_cells(self, tmp_path):
+        """Test CSV cells are read as JSON values where possible, keys stay strings and blanks are skipped"""
+        path = tmp_path / "cases.csv"
+        path.write_text('id,name,data.price,data.Price\n7,"Pro, 16",1849.99,\n12,Air,,"""419.99"""\n')
+
+        assert list(iter_cases(str(path))) == [
+            {"id": "7", "name": "Pro, 16", "data.price": 1849.99},
+            {"id": "12", "name": "Air", "data.Price": "419.99"},
+        ]
+
+    def test_to_columns_pads_absent_fields(self):
+        """Test rows are transposed by dotted field, with fields a row doesn't mention matching anything"""
+        columns = to_columns([{"id": "1", "data": {"color": "Red"}}, {"id": "2", "data": None}])
+        assert columns["id"] == ["1", "2"]
+        assert columns["data.color"][0] == "Red" and columns["data.color"][1] is ANY
+        assert columns["data"][0] is ANY and columns["data"][1] is None
+
+    def test_compare_columns_reports_mismatches(self):
+        """Test each differing field and each missing object is reported once"""
+        expected = [
+            {"id": "1", "name": "Pixel", "data": {"color": "White"}},
+            {"id": "2", "name": "Mini", "data.color": "Blue"},
+            {"id": "3", "name": "Fold"},
+        ]
+        actual = [{"id": "2", "name": "Mini", "data": None}, {"id": "1", "name": "Pixel", "data": {"color": "Black"}}]
+
+        mismatches = compare_columns(expected, actual)
+        assert [(m.key, m.field, m.expected, m.actual) for m in mismatches] == [
+            ("3", "id", "3", MISSING),
+            ("1", "data.color", "White", "Black"),
+            ("2", "data.color", "Blue", MISSING),
+        ]
+
+    def test_parquet_needs_pyarrow(self, tmp_path):
+        """Test reading a Parquet case file without pyarrow fails with a clear error"""
+        if importlib.util.find_spec("pyarrow") is not None:
+            pytest.skip("pyarrow is installed")
+        with pytest.raises(ImportError, match="pyarrow"):
+            list(scan_batches(str(tmp_path / "cases.parquet")))
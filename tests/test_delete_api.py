@@ -1,9 +1,6 @@
 import pytest
-import requests
-import json
 from tests.base_test import BaseTest
-from config.config import Config
-from tests.test_post_api import create_macbook
+from utils.log import logger, TruncatedJSON
 
 class TestDeleteAPI(BaseTest):
     """Test class for DELETE API endpoints"""
@@ -12,15 +9,11 @@ class TestDeleteAPI(BaseTest):
         """Test deleting an existing MacBook object via DELETE request"""
         created_id = create_macbook["id"]
         
-        print(f"\nDeleting object with ID: {created_id}")
-        print("Original object data:")
-        print(json.dumps(create_macbook, indent=2))
+        logger.debug("Deleting object with ID: %s", created_id)
+        logger.debug("Original object data: %s", TruncatedJSON(create_macbook))
         
         # Make the DELETE request
-        response = requests.delete(
-            f"{Config.BASE_URL}/objects/{created_id}",
-            headers={"Content-Type": "application/json"}
-        )
+        response = self.api_client.delete(f"{self.base_endpoint}/{created_id}")
         
         # Assert status code is 200
         assert response.status_code == 200, f"Expected status code 200 but got {response.status_code}"
@@ -30,27 +23,24 @@ class TestDeleteAPI(BaseTest):
         
         # Assert the response indicates successful deletion
         assert "message" in response_data, "Response should contain a message"
-        print(f"\nServer response: {response_data['message']}")
+        logger.debug("Server response: %s", response_data["message"])
         
         # Verify the object was actually deleted by attempting to GET it
-        get_response = requests.get(f"{Config.BASE_URL}/objects/{created_id}")
+        get_response = self.api_client.get(f"{self.base_endpoint}/{created_id}")
         assert get_response.status_code == 404, "Object should not exist after deletion"
         
         # Print verification of deletion
-        print(f"\nVerified: Object with ID {created_id} no longer exists (404 Not Found)")
+        logger.debug("Verified: Object with ID %s no longer exists (404 Not Found)", created_id)
         
     def test_delete_nonexistent_object(self):
         """Test deleting a non-existent object returns appropriate error"""
         non_existent_id = "nonexistent123"
         
         # Make the DELETE request
-        response = requests.delete(
-            f"{Config.BASE_URL}/objects/{non_existent_id}",
-            headers={"Content-Type": "application/json"}
-        )
+        response = self.api_client.delete(f"{self.base_endpoint}/{non_existent_id}")
         
         # Assert status code is 404
         assert response.status_code == 404, f"Expected status code 404 but got {response.status_code}"
         
         # Print verification
-        print(f"\nVerified: Cannot delete non-existent object (404 Not Found)") 
\ No newline at end of file
+        logger.debug("Verified: Cannot delete non-existent object (404 Not Found)") 
\ No newline at end of file
@@ -0,0 +1,83 @@
+import time
+from tests.base_test import BaseTest
+from utils.data_cases import MISSING
+from utils.diff import diff_objects, equivalent
+
+
+def _objects(count):
+    for i in range(count):
+        yield {"id": str(i), "name": f"object {i}", "data": {"price": i * 1.1, "tags": ["a", "b"]}}
+
+
+class TestDiff(BaseTest):
+    """Tests for the keyed, order-insensitive object diff"""
+
+    def test_report_lists_every_kind_of_difference(self):
+        """Test changed and missing fields, missing, unexpected and duplicate objects are all reported"""
+        expected = [
+            {"id": "1", "name": "Pixel", "data": {"color": "White"}},
+            {"id": "2", "name": "Mini", "data.price": 389.99},
+            {"id": "3", "name": "Fold"},
+        ]
+        actual = [
+            {"id": "2", "name": "Mini", "data": {"price": 389.99000000001}},
+            {"id": "1", "name": "Pixel", "data": None},
+            {"id": "9", "name": "Extra"},
+            {"id": "1", "name": "Pixel", "data": None},
+        ]
+
+        report = diff_objects(expected, actual)
+        assert report.compared == 2
+        assert report.counts == {"changed": 1, "added": 0, "missing": 1, "unexpected": 1, "duplicate": 1}
+        assert [(d.kind, d.key, d.path, d.actual) for d in report.differences] == [
+            ("unexpected", "9", None, None),
+            ("duplicate", "1", None, None),
+            ("changed", "1", "data.color", MISSING),
+            ("missing", "3", None, None),
+        ]
+        assert report.summary().startswith("4 differences in 2 compared objects")
+        assert report.to_dict()["differences"][2]["actual"] == "<missing>"
+
+    def test_types_and_duplicate_expectations(self):
+        """Test booleans don't match numbers, ints match equal floats and a repeated expected key is a duplicate"""
+        expected = [{"id": "1", "active": True, "count": 1, "tags": [True]}, {"id": "1", "active": False}]
+        actual = [{"id": "1", "active": 1, "count": 1.0, "tags": [1]}]
+
+        report = diff_objects(expected, actual)
+        assert [(d.kind, d.key, d.path) for d in report.differences] == [
+            ("duplicate", "1", None), ("changed", "1", "active"), ("changed", "1", "tags")]
+        assert not equivalent(True, 1) and not equivalent(0, False) and equivalent(1, 1.0)
+
+    def test_options(self):
+        """Test strict, ignore, ignore_unexpected and tolerance options"""
+        expected = [{"id": "1", "name": "Pixel", "data": {"price": 10.0}}]
+        actual = [{"id": "1", "name": "Pixel", "createdAt": "now", "data": {"price": 10.5, "color": "Red"}},
+                  {"id": "2", "name": "Other"}]
+
+        report = diff_objects(expected, actual, strict=True, ignore=["createdAt"], ignore_unexpected=True)
+        assert [repr(d) for d in report.differences] == [
+            "1: data.price expected 10.0, got 10.5", "1: unexpected field data.color = 'Red'"]
+        assert not diff_objects(expected, actual, abs_tol=0.5, ignore_unexpected=True)
+
+    def test_equivalent(self):
+        """Test tolerant equality of floats, nested dicts and (optionally unordered) lists"""
+        assert equivalent(0.1 + 0.2, 0.3)
+        assert equivalent({"a": [1.0, {"b": 2}]}, {"a": [1, {"b": 2.0000000000001}]})
+        assert not equivalent([1, 2], [2, 1])
+        assert equivalent([1, 2, 2], [2, 1, 2], unordered_lists=True)
+        assert not equivalent([1, 2, 2], [2, 1, 1], unordered_lists=True)
+
+    def test_large_stream(self):
+        """Test 100k streamed objects are compared, with the detailed report capped"""
+        expected = list(_objects(100_000))
+        for i in range(0, 100_000, 100):
+            expected[i] = dict(expected[i], name="renamed")
+
+        start = time.perf_counter()
+        report = diff_objects(expected, _objects(100_000), max_differences=10)
+        elapsed = time.perf_counter() - start
+
+        assert report.compared == 100_000
+        assert report.counts["changed"] == 1000
+        assert len(report.differences) == 10 and report.truncated
+        assert elapsed < 10, f"Diffing 100k objects took {elapsed:.1f}s"
@@ -0,0 +1,80 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from tests.base_test import BaseTest
+from utils.fuzz import FuzzRunner, FuzzStats, PayloadGenerator, shrink
+from utils.models import PRODUCT_SCHEMA
+from utils.retry import RetryPolicy
+from utils.schema_validation import validate
+
+
+class TestFuzz(BaseTest):
+    """Tests for the contract-driven fuzzer"""
+
+    @pytest.fixture
+    def client(self, client_factory):
+        return client_factory(retry_policy=RetryPolicy(max_retries=0))
+
+    def test_generated_payloads_match_the_schema(self):
+        """Test generated payloads validate once the server assigns an id, and are reproducible from the seed"""
+        payloads = [PayloadGenerator(seed=7).payload() for _ in range(2)]
+        assert payloads[0] == payloads[1]
+        generator = PayloadGenerator(seed=7)
+        for _ in range(500):
+            payload = generator.payload()
+            assert "id" not in payload
+            validate(dict(payload, id="1"), PRODUCT_SCHEMA)
+            patch = generator.patch()
+            assert patch and set(patch) <= {"name", "data"}
+
+    def test_shrink_finds_a_minimal_payload(self):
+        """Test unrelated fields are dropped and the failing value is simplified while it still fails"""
+        payload = {"name": "Apple MacBook Pro 16",
+                   "data": {"year": 2019, "price": 1849.99, "CPU model": "Intel Core i9", "color": "Silver"}}
+
+        def still_fails(p):
+            return isinstance(p["data"], dict) and p["data"].get("price", 0) > 100
+
+        shrunk = shrink(payload, still_fails)
+        assert shrunk["name"] == ""
+        assert list(shrunk["data"]) == ["price"]
+        assert 100 < shrunk["data"]["price"] < 250
+        assert payload["data"]["price"] == 1849.99
+
+    def test_run_against_stub(self, stub_server, client):
+        """Test a short concurrent run passes every property and leaves no objects behind"""
+        before = len(stub_server.store.list())
+        stats = FuzzRunner(client, workers=4, seed=3).run(cases=200)
+        assert stats.total == 200 and stats.failed == 0
+        assert sum(h.count for h in stats.cost.values()) == 200
+        assert stats.cleanup.count == stats.cases["POST"], "Every POSTed object is deleted, timed apart"
+        assert stats.throughput > 0
+        assert len(stub_server.store.list()) == before
+
+    def test_failures_are_shrunk(self, client):
+        """Test a broken property is reported with its shrunk payload"""
+        def short_names(method, sent, body):
+            if len(body.get("name") or "") > 100:
+                return "name longer than 100 characters"
+            return None
+
+        runner = FuzzRunner(client, workers=2, seed=1, methods=["PUT"], keep_failures=1, check=short_names)
+        stats = runner.run(cases=300)
+        assert stats.failed > 0 and len(stats.failures) == 1
+        failure = stats.failures[0]
+        assert failure.message == "name longer than 100 characters"
+        assert 100 < len(failure.shrunk["name"]) < len(failure.payload["name"])
+        assert failure.shrunk["data"] is None
+
+    def test_failure_places_reserved_once(self):
+        """Test concurrent workers can't claim more shrink-and-keep places than keep_failures"""
+        stats = FuzzStats()
+        with ThreadPoolExecutor(8) as pool:
+            claimed = list(pool.map(lambda _: stats.reserve_failure(3), range(100)))
+        assert sum(claimed) == 3
+
+    def test_target_setup_failure_fails_the_run(self, client_factory, isolated_retry_policy):
+        """Test a worker that can't create its target records a failure instead of dying silently"""
+        client = client_factory(base_url="http://127.0.0.1:9", retry_policy=isolated_retry_policy)
+        stats = FuzzRunner(client, workers=2, seed=1).run(cases=10)
+        assert stats.total == 0 and stats.failed == 2
+        assert stats.failures[0].message.startswith("creating the PUT/PATCH target raised ConnectionError")
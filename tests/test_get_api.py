@@ -1,23 +1,15 @@
 import pytest
 from tests.base_test import BaseTest
 
+@pytest.mark.read_only
 class TestGetAPI(BaseTest):
     def test_get_all_objects(self, product_schema):
         """Test getting all objects"""
-        # Send GET request
-        response = self.api_client.get(self.base_endpoint)
-        
-        # Validate response
-        self.assert_status_code(response, 200)
-        objects = response.json()
-        assert isinstance(objects, list), "Response should be a list of objects"
-        assert len(objects) > 0, "Response should not be empty"
-        
-        # Validate schema for each object
-        for obj in objects:
-            # Create a mock response object with the current object
-            mock_response = type('Response', (), {'json': lambda self: obj})()
-            self.validate_response_schema(mock_response, product_schema)
+        # Stream the list, validating each object's schema as it arrives
+        count = 0
+        for _ in self.api_client.iter_objects(self.base_endpoint, schema=product_schema):
+            count += 1
+        assert count > 0, "Response should not be empty"
 
     def test_get_single_object(self, product_schema):
         """Test getting a single object"""
@@ -69,6 +61,16 @@ class TestGetAPI(BaseTest):
         assert product["id"] == object_id
         assert product["name"] == expected_name
 
+    @pytest.mark.cases("data/object_names.csv", batch_size=1)
+    def test_get_object_from_case_file(self, cases, product_schema):
+        """Test single objects against expectations kept in a CSV case file"""
+        case, = cases
+        response = self.api_client.get(f"{self.base_endpoint}/{case['id']}")
+
+        self.assert_status_code(response, 200)
+        self.validate_response_schema(response, product_schema)
+        self.assert_matches_cases([response.json()], [case])
+
     @pytest.mark.parametrize("invalid_id", ["999999", "invalid_id"])
     def test_get_nonexistent_object(self, invalid_id):
         """Test getting an object that doesn't exist"""
@@ -0,0 +1,131 @@
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+from tests.base_test import BaseTest
+from utils.http_cache import ResponseCache
+from utils.metrics import LatencyRecorder
+from utils.retry import RetryPolicy
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestHTTPCache(BaseTest):
+    """Tests for the opt-in GET response cache"""
+
+    @pytest.fixture
+    def clock(self):
+        return _Clock()
+
+    @pytest.fixture
+    def cache(self, clock):
+        return ResponseCache(ttl=10, clock=clock)
+
+    @pytest.fixture
+    def client(self, client_factory, cache):
+        return client_factory(cache=cache, retry_policy=RetryPolicy(max_retries=0))
+
+    def test_hit_then_revalidate(self, client, cache, clock):
+        """Test a fresh entry is served locally and a stale one is revalidated with If-None-Match"""
+        first = client.get("/objects/7")
+        second = client.get("/objects/7")
+        assert second.json() == first.json()
+        assert client.connection_stats().requests_sent == 1
+
+        clock.now = 11
+        third = client.get("/objects/7")
+        assert third.status_code == 200 and third.json() == first.json()
+        assert client.connection_stats().requests_sent == 2
+        assert cache.stats.as_dict() == {"hits": 1, "revalidated": 1, "misses": 1, "stored": 1,
+                                         "evicted": 0, "invalidated": 0}
+
+    def test_replays_kept_out_of_latencies(self, client, cache, clock):
+        """Test fresh hits and 304 replays are flagged as cached and only the real fetch is timed"""
+        recorder = LatencyRecorder()
+        timings = []
+        client.add_listener(timings.append)
+        client.add_listener(recorder.record)
+        client.get("/objects/7")
+        client.get("/objects/7")
+        clock.now = 11
+        client.get("/objects/7")
+
+        assert [timing.cached for timing in timings] == [False, True, True]
+        assert recorder.endpoints[("GET", "/objects/{id}")].count == 1
+        assert cache.stats.hits == cache.stats.revalidated == 1
+
+    def test_writes_invalidate_resource_and_collection(self, client, cache):
+        """Test PATCH and DELETE through the client drop cached copies of the object and of listings"""
+        object_id = client.post("/objects", json={"name": "Cached", "data": None}).json()["id"]
+        client.get(f"/objects/{object_id}")
+        client.get("/objects", params=[("id", object_id)])
+        client.get("/objects/1")
+        assert len(cache) == 3
+
+        client.patch(f"/objects/{object_id}", json={"name": "Renamed"})
+        assert len(cache) == 1, "Only the unrelated /objects/1 should stay cached"
+        assert client.get(f"/objects/{object_id}").json()["name"] == "Renamed"
+
+        client.delete(f"/objects/{object_id}")
+        assert client.get(f"/objects/{object_id}").status_code == 404
+        assert cache.stats.invalidated == 3
+
+    def test_write_invalidates_after_it_is_sent(self, client, cache, monkeypatch):
+        """Test a copy re-cached while a write is in flight is dropped, even when the write raises"""
+        client.get("/objects/1")
+
+        def racing_write(request, **kwargs):
+            cache.store(request.url, 200, "OK", CaseInsensitiveDict(), b'{"id": "1"}')
+            raise requests.ConnectionError("connection reset")
+
+        monkeypatch.setattr(client.adapter, "_send_recorded", racing_write)
+        with pytest.raises(requests.ConnectionError):
+            client.patch("/objects/1", json={"name": "Renamed"})
+        assert len(cache) == 0
+
+    def test_vary_keys_on_request_headers(self):
+        """Test a response with Vary is only reused for requests with the same values of the named headers"""
+        cache = ResponseCache(clock=_Clock())
+        url = "http://h/objects/1"
+        headers = CaseInsensitiveDict({"Vary": "Accept-Encoding"})
+        gzip = CaseInsensitiveDict({"Accept-Encoding": "gzip"})
+        identity = CaseInsensitiveDict({"Accept-Encoding": "identity"})
+        cache.store(url, 200, "OK", headers, b"gzip", gzip)
+        assert cache.lookup(url, identity) == (None, False)
+        cache.store(url, 200, "OK", headers, b"identity", identity)
+        assert cache.lookup(url, gzip)[0].body == b"gzip" and cache.lookup(url, identity)[0].body == b"identity"
+
+        cache.invalidate(url)
+        assert len(cache) == 0
+        assert cache.store(url, 200, "OK", CaseInsensitiveDict({"Vary": "*"}), b"") is None
+
+    def test_lru_eviction_and_cache_control(self):
+        """Test the size bound evicts least recently used entries and Cache-Control is honoured"""
+        cache = ResponseCache(max_bytes=500, ttl=60, clock=_Clock())
+        headers = CaseInsensitiveDict({"Content-Type": "application/json"})
+        for name in ("a", "b", "c"):
+            cache.store(f"http://h/objects/{name}", 200, "OK", headers, b"x" * 100)
+        cache.lookup("http://h/objects/a")
+        cache.store("http://h/objects/d", 200, "OK", headers, b"x" * 100)
+        assert cache.lookup("http://h/objects/b") == (None, False)
+        assert cache.lookup("http://h/objects/a")[1] and cache.lookup("http://h/objects/d")[1]
+        assert cache.size <= 500 and cache.stats.evicted == 1
+
+        assert cache.store("http://h/big", 200, "OK", headers, b"x" * 1000) is None
+        assert cache.store("http://h/secret", 200, "OK", CaseInsensitiveDict({"Cache-Control": "no-store"}), b"") is None
+        assert cache.store("http://h/gone", 404, "Not Found", headers, b"") is None
+        entry = cache.store("http://h/short", 200, "OK", CaseInsensitiveDict({"Cache-Control": "max-age=5"}), b"")
+        assert entry.expires == 5
+
+    def test_wire_headers_not_stored(self):
+        """Test Content-Encoding and Content-Length are dropped since the cached body is already decoded"""
+        cache = ResponseCache(clock=_Clock())
+        headers = CaseInsensitiveDict({"Content-Type": "application/json", "Content-Encoding": "gzip",
+                                       "Content-Length": "31", "ETag": '"1"'})
+        entry = cache.store("http://h/objects/1", 200, "OK", headers, b'{"id": "1"}')
+        assert entry.headers == [("Content-Type", "application/json"), ("ETag", '"1"')]
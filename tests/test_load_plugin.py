@@ -0,0 +1,59 @@
+import os
+from tests.base_test import BaseTest
+
+pytest_plugins = ["pytester"]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE = '''
+import itertools
+import pytest
+
+calls = itertools.count()
+
+def test_pass():
+    pass
+
+def test_first_call_only():
+    assert next(calls) == 0, "already used"
+
+@pytest.mark.mutating
+def test_mutating():
+    pass
+'''
+
+
+class TestLoadPlugin(BaseTest):
+    """Tests for replaying tests as load scenarios with --load"""
+
+    def _run(self, pytester, monkeypatch, *args):
+        monkeypatch.setenv("PYTHONPATH", ROOT)
+        pytester.makepyfile(test_sample=SAMPLE)
+        return pytester.runpytest_subprocess("-p", "utils.load_plugin", "-p", "no:cacheprovider", "--load",
+                                             "--load-workers", "2", "--load-iterations", "6", *args)
+
+    def test_passing_scenario(self, pytester, monkeypatch):
+        """Test a scenario whose iterations all pass is reported and exits 0"""
+        result = self._run(pytester, monkeypatch, "-k", "test_pass")
+        assert result.ret == 0
+        result.stdout.fnmatch_lines(["*load results (2 workers*", "test_sample.py::test_pass * 6 * 0.0"])
+
+    def test_failing_scenario(self, pytester, monkeypatch):
+        """Test failed iterations are reported with the first error and make the run exit non-zero"""
+        result = self._run(pytester, monkeypatch)
+        assert result.ret == 1
+        result.stdout.fnmatch_lines(["test_sample.py::test_pass * 6 * 0.0",
+                                     "test_sample.py::test_first_call_only * 6 * 83.3",
+                                     "*first failure: AssertionError: already used"])
+
+    def test_mutating_scenario_skipped(self, pytester, monkeypatch):
+        """Test a mutating test is not replayed, since its workers would share one fixture-created object"""
+        result = self._run(pytester, monkeypatch, "-k", "test_mutating")
+        assert result.ret == 0
+        result.stdout.fnmatch_lines(["test_sample.py::test_mutating * skipped: mutating tests are not replayed*"])
+
+    def test_rejects_xdist(self, pytester, monkeypatch):
+        """Test --load refuses to run under -n, where every worker would replay the scenarios"""
+        result = self._run(pytester, monkeypatch, "-n", "2")
+        assert result.ret == 4
+        result.stderr.fnmatch_lines(["*--load runs every scenario in this process*"])
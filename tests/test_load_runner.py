@@ -0,0 +1,107 @@
+import json
+import os
+import pytest
+import subprocess
+import sys
+from tests.base_test import BaseTest
+from utils.load_runner import (Coordinator, LoadStats, Scenario, Step, arrival_times, load_plan, main,
+                               run_scenario, start_workers)
+from utils.retry import RetryPolicy
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CREATE_GET_DELETE = Scenario("create-get-delete", [
+    Step("POST", "/objects", json={"name": "Apple MacBook Pro 16", "data": {"year": 2019}}, save="id0"),
+    Step("GET", "/objects/{id0}"),
+    Step("DELETE", "/objects/{id0}"),
+    Step("GET", "/objects/{id0}", expect=404),
+])
+
+
+def _take(iterator, count):
+    return [next(iterator) for _ in range(count)]
+
+
+class TestLoadRunner(BaseTest):
+    """Tests for the multi-process load runner"""
+
+    def test_processes_interleave_one_schedule(self):
+        """Test the arrivals of P processes together form the single evenly spaced schedule"""
+        single = _take(arrival_times(100, ramp_up=2), 300)
+        split = sorted(t for k in range(3) for t in _take(arrival_times(100, ramp_up=2, index=k, stride=3), 100))
+        assert split == single
+
+    def test_ramp_up_schedule(self):
+        """Test the rate climbs linearly: half the full-rate arrivals during the ramp, then constant spacing"""
+        times = _take(arrival_times(100, ramp_up=2), 400)
+        assert sum(t < 2 for t in times) == 100
+        assert times[1] - times[0] > times[99] - times[98]
+        assert abs((times[300] - times[299]) - 0.01) < 1e-9
+        assert _take(arrival_times(50), 3) == [0.0, 0.02, 0.04]
+
+    def test_stats_round_trip_and_merge(self):
+        """Test worker stats survive serialization and merge by adding counts"""
+        a, b = LoadStats(), LoadStats()
+        a.record("s1", 0.010, None)
+        b.record("s1", 0.020, "GET /objects returned 500, expected 200")
+        b.record("s2", 0.005, None)
+        merged = LoadStats()
+        merged.merge(LoadStats.from_dict(json.loads(json.dumps(a.to_dict()))))
+        merged.merge(LoadStats.from_dict(json.loads(json.dumps(b.to_dict()))))
+        assert merged.iterations == 3 and merged.failures == 1
+        assert merged.scenarios["s1"].iterations == 2
+        assert merged.scenarios["s1"].first_error.startswith("GET /objects returned 500")
+        assert a.scenarios["s1"].iterations == 1
+
+    def test_run_scenario_fills_in_created_ids(self, client_factory):
+        """Test ids saved from a POST are substituted into later steps, and a wrong status fails the scenario"""
+        client = client_factory(retry_policy=RetryPolicy(max_retries=0))
+        assert run_scenario(client, CREATE_GET_DELETE) is None
+        wrong = Scenario("wrong", [Step("GET", "/objects/does-not-exist")])
+        assert run_scenario(client, wrong) == "GET /objects/does-not-exist returned 404, expected 200"
+
+    def test_plan_captured_from_tests(self, tmp_path):
+        """Test each test's requests become a scenario, with fixture-created ids turned into placeholders"""
+        path = str(tmp_path / "plan.json")
+        subprocess.run([sys.executable, "-m", "utils.load_runner", "--save-plan", path,
+                        "--tests", "tests/test_delete_api.py"], cwd=ROOT, check=True, capture_output=True)
+        scenarios = {scenario.name: scenario for scenario in load_plan(path)}
+        steps = scenarios["tests/test_delete_api.py::TestDeleteAPI::test_delete_macbook"].steps
+        assert steps[0].method == "POST" and steps[0].save == "id0"
+        assert [step.endpoint for step in steps[1:]][:2] == ["/objects/{id0}", "/objects/{id0}"]
+
+    @pytest.mark.parametrize("argv", [["--listen", "0.0.0.0:7700"], ["--connect", "coordinator:7700"]])
+    def test_network_use_needs_an_authkey(self, argv, monkeypatch, capsys):
+        """Test workers can't be reached over the network with a guessable key"""
+        monkeypatch.delenv("LOAD_RUNNER_AUTHKEY", raising=False)
+        with pytest.raises(SystemExit) as exc_info:
+            main(argv)
+        assert exc_info.value.code == 2
+        assert "LOAD_RUNNER_AUTHKEY" in capsys.readouterr().err
+        first, second = Coordinator(), Coordinator()
+        try:
+            assert len(first.authkey) == 32 and first.authkey != second.authkey
+        finally:
+            first.close()
+            second.close()
+
+    def test_coordinator_merges_worker_processes(self, stub_server):
+        """Test two worker processes run the closed and open models and report every request"""
+        coordinator = Coordinator()
+        config = {"base_url": stub_server.url, "plan": [CREATE_GET_DELETE.to_dict()], "users": 4,
+                  "think_time": 0.0, "rate": 40, "concurrency": 4, "ramp_up": 0.0, "duration": 1.0,
+                  "interval": 0.5, "seed": 1}
+        try:
+            for arrival in ("closed", "open"):
+                workers = start_workers(coordinator.address, coordinator.authkey, 2)
+                result = coordinator.run(dict(config, arrival=arrival), 2)
+                for worker in workers:
+                    worker.join()
+                stats = result.stats
+                assert not result.lost and stats.failures == 0 and stats.iterations > 0
+                assert stats.recorder.endpoints[("POST", "/objects")].count == stats.iterations
+                assert stats.recorder.endpoints[("GET", "/objects/{id}")].count == 2 * stats.iterations
+                if arrival == "open":
+                    assert stats.iterations == 40 and stats.lag.count == 40
+        finally:
+            coordinator.close()
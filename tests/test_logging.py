@@ -0,0 +1,44 @@
+import logging
+from tests.base_test import BaseTest
+from utils.log import FailureLogHandler, TruncatedBody, TruncatedJSON
+
+class _Formatted:
+    """Log argument recording whether it was ever formatted"""
+
+    def __init__(self):
+        self.formatted = False
+
+    def __str__(self):
+        self.formatted = True
+        return "formatted"
+
+class TestLogging(BaseTest):
+    """Tests for the lazy, failure-only test logger"""
+
+    def test_truncated_json_stops_early(self):
+        """Test large objects are cut at the limit while encoding"""
+        objects = [{"id": str(i), "name": "Apple iPad Air", "data": None} for i in range(100000)]
+        text = str(TruncatedJSON(objects, 200))
+        assert len(text) == 203 and text.endswith("...")
+        assert str(TruncatedJSON({"id": "1"})) == '{\n  "id": "1"\n}'
+
+    def test_truncated_body_limits_bytes(self, stub_server):
+        """Test only the first bytes of a response body are decoded"""
+        response = self.api_client.session.get(f"{stub_server.url}/objects")
+        text = str(TruncatedBody(response, 50))
+        assert text == response.content[:50].decode() + "..."
+
+    def test_records_formatted_only_on_demand(self):
+        """Test buffered records keep their arguments unformatted until requested"""
+        handler = FailureLogHandler(capacity=10)
+        logger = logging.getLogger("api_tests.test_logging")
+        logger.addHandler(handler)
+        logger.setLevel(logging.DEBUG)
+        logger.propagate = False
+        argument = _Formatted()
+        logger.debug("value: %s", argument)
+        logger.removeHandler(handler)
+
+        assert not argument.formatted, "Argument should not be formatted while the test passes"
+        assert handler.format_records() == "DEBUG    value: formatted"
+        assert argument.formatted
@@ -0,0 +1,67 @@
+import json
+import tracemalloc
+import pytest
+from tests.base_test import BaseTest
+from utils.models import DATA_FIELDS, MISSING, Product, ProductTable, decode_products
+from utils.stub_server import SEED_OBJECTS
+
+
+class TestModels(BaseTest):
+    """Tests for the slotted Product model and the columnar ProductTable"""
+
+    def test_product_round_trip(self):
+        """Test products keep their fields, share interned data keys and have no per-instance dict"""
+        body = json.dumps(SEED_OBJECTS[6])
+        first, second = (Product.from_dict(json.loads(body)) for _ in range(2))
+        assert first == second and first.to_dict() == SEED_OBJECTS[6]
+        assert first.get("year") == 2019 and first.get("color", "none") == "none"
+        assert all(a is b for a, b in zip(first.data, second.data)), "Known data keys should be interned"
+        assert not hasattr(first, "__dict__")
+
+    def test_table_columns(self):
+        """Test numeric fields are stored in typed arrays and every row reads back unchanged"""
+        objects = [dict(SEED_OBJECTS[i % len(SEED_OBJECTS)], id=str(i)) for i in range(100)]
+        table = decode_products(objects)
+
+        assert len(table) == 100
+        assert [product.to_dict() for product in table] == objects
+        assert table.columns["year"].values.typecode == "q"
+        assert table.columns["Screen size"].values.typecode == "d"
+        assert isinstance(table.columns["price"].values, list), "Mixed int/float prices keep their types in a list"
+        assert table.column("year")[:7] == [MISSING] * 6 + [2019]
+        assert table.column("id")[:2] == ["0", "1"] and table.column("unknown") == [MISSING] * 100
+        assert table[1].data is None
+        assert set(DATA_FIELDS) >= set(table.columns)
+
+    def test_table_negative_index(self):
+        """Test negative indices read the same row as their positive counterpart and out-of-range ones raise"""
+        objects = [dict(SEED_OBJECTS[i % len(SEED_OBJECTS)], id=str(i)) for i in range(10)]
+        table = decode_products(objects)
+        assert table[-1].to_dict() == objects[-1]
+        assert table[-4] == table[6]
+        for index in (10, -11):
+            with pytest.raises(IndexError):
+                table[index]
+
+    def test_table_uses_less_memory_than_dicts(self):
+        """Test a decoded table takes less memory than the list of dicts it replaces"""
+        body = json.dumps([dict(SEED_OBJECTS[i % len(SEED_OBJECTS)], id=str(i)) for i in range(20000)])
+
+        tracemalloc.start()
+        objects = json.loads(body)
+        dicts_size = tracemalloc.get_traced_memory()[0]
+        del objects
+        tracemalloc.stop()
+        tracemalloc.start()
+        table = ProductTable.from_objects(json.loads(body))
+        table_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        assert len(table) == 20000
+        assert table_size < dicts_size * 0.8, f"table {table_size} bytes vs dicts {dicts_size} bytes"
+
+    def test_table_from_stream(self, product_schema):
+        """Test a table is built straight from a streamed collection response"""
+        table = ProductTable.from_objects(self.api_client.iter_objects(self.base_endpoint, schema=product_schema))
+        assert len(table) > 0
+        assert table.column("id") == [product.id for product in table]
@@ -1,6 +1,7 @@
 import pytest
 from tests.base_test import BaseTest
 
+@pytest.mark.read_only
 class TestMultipleObjectsAPI(BaseTest):
     def test_get_multiple_objects_by_ids(self, product_schema):
         """Test getting multiple objects using id parameters"""
@@ -22,46 +23,38 @@ class TestMultipleObjectsAPI(BaseTest):
         assert len(objects) == len(ids), f"Expected {len(ids)} objects, got {len(objects)}"
         
         # Validate each object's schema
-        for obj in objects:
-            mock_response = type('Response', (), {'json': lambda self: obj})()
-            self.validate_response_schema(mock_response, product_schema)
+        self.validate_many(objects, product_schema)
         
         # Validate specific objects
-        expected_objects = {
-            "3": {
+        expected_objects = [
+            {
+                "id": "3",
                 "name": "Apple iPhone 12 Pro Max",
                 "data": {
                     "color": "Cloudy White",
                     "capacity GB": 512
                 }
             },
-            "5": {
+            {
+                "id": "5",
                 "name": "Samsung Galaxy Z Fold2",
                 "data": {
                     "price": 689.99,
                     "color": "Brown"
                 }
             },
-            "10": {
+            {
+                "id": "10",
                 "name": "Apple iPad Mini 5th Gen",
                 "data": {
                     "Capacity": "64 GB",
                     "Screen size": 7.9
                 }
             }
-        }
-        
-        # Validate each object's specific fields
-        for obj in objects:
-            obj_id = obj["id"]
-            expected = expected_objects[obj_id]
-            
-            # Validate name
-            assert obj["name"] == expected["name"], f"Object {obj_id} has incorrect name"
-            
-            # Validate data fields
-            for key, value in expected["data"].items():
-                assert obj["data"][key] == value, f"Object {obj_id} has incorrect {key}"
+        ]
+        
+        # Validate every object's fields at once, in any order
+        self.assert_no_diff(objects, expected_objects)
 
     def test_get_multiple_objects_partial_invalid(self):
         """Test getting multiple objects with some invalid IDs"""
@@ -119,10 +112,35 @@ class TestMultipleObjectsAPI(BaseTest):
         assert len(objects) == len(ids), f"Expected {len(ids)} objects, got {len(objects)}"
         
         # Validate schema
-        for obj in objects:
-            mock_response = type('Response', (), {'json': lambda self: obj})()
-            self.validate_response_schema(mock_response, product_schema)
+        self.validate_many(objects, product_schema)
         
         # Validate names
         returned_names = [obj["name"] for obj in objects]
-        assert sorted(returned_names) == sorted(expected_names), "Object names don't match expected names" 
\ No newline at end of file
+        assert sorted(returned_names) == sorted(expected_names), "Object names don't match expected names"
+
+    @pytest.mark.cases("data/objects.jsonl", batch_size=5)
+    def test_get_many_matches_case_file(self, cases, product_schema):
+        """Test batches of objects against expectations streamed from a JSONL case file"""
+        rows = cases.rows()
+        result = self.api_client.get_many([row["id"] for row in rows])
+
+        assert result.missing == []
+        self.validate_many(result.objects, product_schema)
+        self.assert_matches_cases(result.objects, rows)
+
+    def test_get_many_reports_missing_ids(self):
+        """Test batch fetch de-duplicates ids, keeps requested order and reports missing ids"""
+        ids = ["10", "999", "3", "invalid_id", "10"]
+        result = self.api_client.get_many(ids)
+
+        assert [obj["id"] for obj in result] == ["10", "3"], "Objects should follow the requested order"
+        assert result.missing == ["999", "invalid_id"], "Unknown ids should be reported as missing"
+
+    def test_get_many_in_chunks(self, product_schema):
+        """Test batch fetch splits ids into several concurrent requests and merges the results"""
+        ids = [str(i) for i in range(1, 14)]
+        result = self.api_client.get_many(ids, chunk_size=4)
+
+        assert [obj["id"] for obj in result] == ids
+        assert result.missing == []
+        self.validate_many(result.objects, product_schema)
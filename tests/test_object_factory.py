@@ -0,0 +1,16 @@
+from tests.base_test import BaseTest
+from tests.conftest import MACBOOK_PAYLOAD
+from utils.object_factory import ObjectFactory
+
+class TestObjectFactory(BaseTest):
+    """Tests for the object factory used by the CRUD fixtures"""
+
+    def test_cleanup_deletes_created_objects(self, client):
+        """Test every created object is deleted in one batch, including ones already deleted"""
+        factory = ObjectFactory(client)
+        created_ids = [factory.create(MACBOOK_PAYLOAD)["id"] for _ in range(5)]
+        self.assert_status_code(client.delete(f"{self.base_endpoint}/{created_ids[0]}"), 200)
+
+        assert factory.cleanup() == [], "Cleanup should not leave any objects behind"
+        for created_id in created_ids:
+            self.assert_status_code(client.get(f"{self.base_endpoint}/{created_id}"), 404)
@@ -1,9 +1,6 @@
 import pytest
-import requests
-import json
 from tests.base_test import BaseTest
-from config.config import Config
-from tests.test_post_api import create_macbook
+from utils.log import logger, TruncatedJSON
 
 class TestPatchAPI(BaseTest):
     """Test class for PATCH API endpoints"""
@@ -13,7 +10,7 @@ class TestPatchAPI(BaseTest):
         created_id = create_macbook["id"]
         original_data = create_macbook["data"]  # Store original data for comparison
         
-        print(f"\nPartially updating object with ID: {created_id}")
+        logger.debug("Partially updating object with ID: %s", created_id)
         
         # Prepare the patch payload (only updating the name)
         patch_payload = {
@@ -21,11 +18,7 @@ class TestPatchAPI(BaseTest):
         }
         
         # Make the PATCH request
-        response = requests.patch(
-            f"{Config.BASE_URL}/objects/{created_id}",
-            json=patch_payload,
-            headers={"Content-Type": "application/json"}
-        )
+        response = self.api_client.patch(f"{self.base_endpoint}/{created_id}", json=patch_payload)
         
         # Assert status code is 200
         assert response.status_code == 200, f"Expected status code 200 but got {response.status_code}"
@@ -39,7 +32,7 @@ class TestPatchAPI(BaseTest):
         assert response_data["id"] == created_id, "ID should not change after update"
         
         # Verify the object was updated by making a GET request
-        get_response = requests.get(f"{Config.BASE_URL}/objects/{created_id}")
+        get_response = self.api_client.get(f"{self.base_endpoint}/{created_id}")
         assert get_response.status_code == 200, "Failed to retrieve the updated object"
         get_data = get_response.json()
         
@@ -49,12 +42,11 @@ class TestPatchAPI(BaseTest):
         assert get_data["data"] == original_data, "Data object should not have changed"
         
         # Print the updated data for verification
-        print("\nSuccessfully updated object with new name:")
-        print(json.dumps(get_data, indent=2))
+        logger.debug("Successfully updated object with new name: %s", TruncatedJSON(get_data))
         
         # Print what fields remained unchanged
-        print("\nVerifying unchanged fields:")
-        print("- Original price:", original_data["price"])
-        print("- Original CPU model:", original_data["CPU model"])
-        print("- Original Hard disk size:", original_data["Hard disk size"])
-        print("- Original year:", original_data["year"]) 
\ No newline at end of file
+        logger.debug("Verifying unchanged fields:")
+        logger.debug("- Original price: %s", original_data["price"])
+        logger.debug("- Original CPU model: %s", original_data["CPU model"])
+        logger.debug("- Original Hard disk size: %s", original_data["Hard disk size"])
+        logger.debug("- Original year: %s", original_data["year"]) 
\ No newline at end of file
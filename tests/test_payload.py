@@ -0,0 +1,101 @@
+import gzip
+import importlib.util
+import json
+import pytest
+from tests.base_test import BaseTest
+from utils.payload import UnsupportedEncoding, compress, decompress, encode_payload, negotiate
+from utils.stub_server import SEED_OBJECTS, StubServer
+
+HAS_ZSTD = importlib.util.find_spec("zstandard") is not None
+
+LARGE_PAYLOAD = {"name": "Apple MacBook Pro 16", "data": {"Description": "High-performance laptop " * 200}}
+
+
+class TestPayload(BaseTest):
+    """Tests for pre-encoded and compressed request bodies"""
+
+    @pytest.fixture
+    def compressing_server(self):
+        with StubServer(seed=[dict(SEED_OBJECTS[i % 13], id=str(i)) for i in range(2000)],
+                        compress_responses=True) as server:
+            yield server
+
+    def test_encode_payload(self):
+        """Test payloads are compact JSON, compressed deterministically only above min_size"""
+        plain = encode_payload({"name": "Apple AirPods", "data": None})
+        assert json.loads(plain.body) == {"name": "Apple AirPods", "data": None}
+        assert b", " not in plain.body and plain.size == len(plain.body)
+        assert plain.headers == {"Content-Type": "application/json"}
+
+        small = encode_payload({"name": "Apple AirPods"}, "gzip", min_size=1024)
+        assert small.content_encoding is None
+        large = encode_payload(LARGE_PAYLOAD, "gzip", min_size=1024)
+        assert large.headers["Content-Encoding"] == "gzip"
+        assert len(large) < large.size / 10
+        assert json.loads(gzip.decompress(large.body)) == LARGE_PAYLOAD
+        assert encode_payload(LARGE_PAYLOAD, "gzip").body == large.body
+
+    def test_unsupported_encodings(self):
+        """Test unknown encodings, and zstd without zstandard, raise UnsupportedEncoding"""
+        with pytest.raises(UnsupportedEncoding):
+            compress(b"{}", "br")
+        with pytest.raises(UnsupportedEncoding):
+            decompress(b"{}", "br")
+        assert decompress(compress(b"{}", "deflate"), "deflate") == b"{}"
+        if not HAS_ZSTD:
+            with pytest.raises(UnsupportedEncoding, match="zstandard"):
+                compress(b"{}", "zstd")
+
+    @pytest.mark.parametrize("accept,expected", [
+        ("gzip, deflate", "gzip"),
+        ("gzip;q=0, deflate", "deflate"),
+        ("*", "zstd" if HAS_ZSTD else "gzip"),
+        ("identity", None),
+        (None, None),
+    ])
+    def test_negotiate(self, accept, expected):
+        """Test the response encoding follows Accept-Encoding, skipping refused and unavailable ones"""
+        assert negotiate(accept) == expected
+
+    def test_pre_encoded_payload_is_reused(self, compressing_server, client_factory):
+        """Test one compressed payload is sent by several requests and byte counts show the savings"""
+        client = client_factory(base_url=compressing_server.url, compression="gzip")
+        timings = []
+        client.add_listener(timings.append)
+        payload = client.encode(LARGE_PAYLOAD)
+        created = [client.post(self.base_endpoint, json=payload).json() for _ in range(3)]
+        replaced = client.put(f"{self.base_endpoint}/{created[0]['id']}", json=payload)
+        assert all(obj["data"] == LARGE_PAYLOAD["data"] for obj in created)
+        self.assert_status_code(replaced, 200)
+        for timing in timings:
+            assert timing.request_bytes == payload.size
+            assert timing.request_wire_bytes == len(payload) < payload.size
+            assert 0 < timing.response_wire_bytes < timing.response_bytes
+
+    def test_dict_payloads_compressed_by_client(self, compressing_server, client_factory):
+        """Test a client with compression compresses large dict payloads and leaves small ones alone"""
+        client = client_factory(base_url=compressing_server.url, compression="gzip")
+        client.compression_min_bytes = 1024
+        large = client.post(self.base_endpoint, json=LARGE_PAYLOAD)
+        small = client.post(self.base_endpoint, json={"name": "Apple AirPods", "data": None})
+        assert large.request.headers["Content-Encoding"] == "gzip"
+        assert "Content-Encoding" not in small.request.headers
+        assert large.json()["data"] == LARGE_PAYLOAD["data"]
+        assert small.json()["name"] == "Apple AirPods"
+
+    def test_stream_decompressed_while_reading(self, compressing_server, client_factory):
+        """Test iter_objects decodes a gzip response chunk by chunk"""
+        client = client_factory(base_url=compressing_server.url)
+        timings = []
+        client.add_listener(timings.append)
+        ids = [obj["id"] for obj in client.iter_objects(self.base_endpoint, chunk_size=1024)]
+        assert ids == [str(i) for i in range(2000)]
+        assert timings[0].response_wire_bytes < len(compressing_server.store.list_encoded()) / 5
+
+    def test_unknown_request_encoding_rejected(self, compressing_server, client_factory):
+        """Test the stub answers 415 to a body it can't decode and 400 to a corrupt one"""
+        client = client_factory(base_url=compressing_server.url)
+        unknown = client.request("POST", self.base_endpoint, data=b"{}", headers={"Content-Encoding": "br"})
+        corrupt = client.request("POST", self.base_endpoint, data=b"{}", headers={"Content-Encoding": "gzip"})
+        self.assert_status_code(unknown, 415)
+        self.assert_status_code(corrupt, 400)
@@ -1,9 +1,6 @@
 import pytest
-import requests
-import json
 from tests.base_test import BaseTest
-from config.config import Config
-from tests.test_post_api import create_macbook
+from utils.log import logger, TruncatedJSON
 
 class TestPutAPI(BaseTest):
     """Test class for PUT API endpoints"""
@@ -12,7 +9,7 @@ class TestPutAPI(BaseTest):
         """Test updating an existing MacBook object via PUT request"""
         created_id = create_macbook["id"]
         
-        print(f"\nUpdating object with ID: {created_id}")
+        logger.debug("Updating object with ID: %s", created_id)
         
         # Prepare the updated payload
         updated_payload = {
@@ -27,11 +24,7 @@ class TestPutAPI(BaseTest):
         }
         
         # Make the PUT request
-        response = requests.put(
-            f"{Config.BASE_URL}/objects/{created_id}",
-            json=updated_payload,
-            headers={"Content-Type": "application/json"}
-        )
+        response = self.api_client.put(f"{self.base_endpoint}/{created_id}", json=updated_payload)
         
         # Assert status code is 200
         assert response.status_code == 200, f"Expected status code 200 but got {response.status_code}"
@@ -45,7 +38,7 @@ class TestPutAPI(BaseTest):
         assert response_data["id"] == created_id, "ID should not change after update"
         
         # Verify the object was updated by making a GET request
-        get_response = requests.get(f"{Config.BASE_URL}/objects/{created_id}")
+        get_response = self.api_client.get(f"{self.base_endpoint}/{created_id}")
         assert get_response.status_code == 200, "Failed to retrieve the updated object"
         get_data = get_response.json()
         
@@ -55,5 +48,4 @@ class TestPutAPI(BaseTest):
         assert get_data["data"] == updated_payload["data"], "Data doesn't match"
         
         # Print the updated data for verification
-        print("\nSuccessfully updated object with new data:")
-        print(json.dumps(get_data, indent=2)) 
\ No newline at end of file
+        logger.debug("Successfully updated object with new data: %s", TruncatedJSON(get_data)) 
\ No newline at end of file
@@ -0,0 +1,82 @@
+import io
+import random
+import pytest
+from tests.base_test import BaseTest
+from utils.metrics import LatencyHistogram, LatencyRecorder, RequestTiming, endpoint_template
+
+class TestRequestMetrics(BaseTest):
+    """Tests for APIClient request timing instrumentation"""
+
+    def test_listener_receives_timing_breakdown(self, client):
+        """Test connection phases are reported for a new connection only"""
+        timings = []
+        client.add_listener(timings.append)
+        client.get(f"{self.base_endpoint}/7")
+        client.post(self.base_endpoint, json={"name": "Apple MacBook Pro 16", "data": None})
+
+        first, second = timings
+        assert (first.method, first.status) == ("GET", 200)
+        assert first.connect is not None and first.dns is not None, "First request should open a connection"
+        assert first.tls is None, "Plain HTTP has no TLS handshake"
+        assert 0 < first.ttfb <= first.total
+        assert first.response_bytes > 0
+        assert second.connect is None, "Second request should reuse the pooled connection"
+        assert second.request_bytes > 0
+
+    def test_file_body_is_counted_from_content_length(self, client):
+        """Test a file-like request body is sized from its Content-Length instead of being measured"""
+        body = b'{"name": "Apple MacBook Pro 16", "data": null}'
+        timings = []
+        client.add_listener(timings.append)
+        response = client.request("POST", self.base_endpoint, data=io.BytesIO(body),
+                                  headers={"Content-Type": "application/json"})
+
+        assert response.status_code == 200
+        assert timings[0].request_wire_bytes == timings[0].request_bytes == len(body)
+
+    @pytest.mark.parametrize("url,expected", [
+        ("http://host/objects", "/objects"),
+        ("http://host/objects/7", "/objects/{id}"),
+        ("http://host/objects/ff8081818a194de0018a1b2c3d4e5f60?x=1", "/objects/{id}"),
+        ("http://host/api/v1/objects/7", "/api/v1/objects/{id}"),
+        ("http://host/objects/7/history", "/objects/{id}/history"),
+    ])
+    def test_endpoint_template(self, url, expected):
+        """Test resource ids are collapsed in endpoint templates"""
+        assert endpoint_template(url) == expected
+
+    def test_histogram_percentiles_and_merge(self):
+        """Test histogram percentiles stay within precision after merging"""
+        values = [random.uniform(0.001, 0.5) for _ in range(10000)]
+        left, right = LatencyHistogram(), LatencyHistogram()
+        for i, value in enumerate(values):
+            (left if i % 2 else right).record(value)
+        left.merge(LatencyHistogram.from_dict(right.to_dict()))
+
+        values.sort()
+        assert left.count == len(values)
+        for q in (50, 90, 99, 99.9):
+            exact = values[int(q / 100 * len(values)) - 1]
+            assert left.percentile(q) == pytest.approx(exact, rel=0.02)
+
+    def test_recorder_groups_by_endpoint(self, client):
+        """Test recorder aggregates requests per method and endpoint template"""
+        recorder = LatencyRecorder()
+        client.add_listener(recorder.record)
+        for object_id in ("1", "2", "999"):
+            client.get(f"{self.base_endpoint}/{object_id}")
+
+        stats = recorder.endpoints[("GET", "/objects/{id}")]
+        assert stats.count == 3
+        assert stats.statuses == {"200": 2, "404": 1}
+        assert stats.errors == 0
+
+    def test_throttled_requests_count_as_errors(self):
+        """Test 429 responses count toward the error rate along with 5xx and connection errors"""
+        recorder = LatencyRecorder()
+        for status in (200, 404, 429, 503, None):
+            timing = RequestTiming("GET", "http://localhost/objects/1")
+            timing.status, timing.total = status, 0.01
+            timing.error = None if status else "ConnectionError"
+            recorder.record(timing)
+        assert recorder.endpoints[("GET", "/objects/{id}")].errors == 3
@@ -0,0 +1,74 @@
+import json
+import os
+from tests.base_test import BaseTest
+from utils.report import allure_result, iter_records, render_html
+
+pytest_plugins = ["pytester"]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE = '''
+import pytest
+
+@pytest.fixture
+def broken():
+    raise RuntimeError("fixture exploded")
+
+def test_pass():
+    pass
+
+def test_fail():
+    print("noisy output")
+    assert 1 == 2, "numbers differ"
+
+def test_skip():
+    pytest.skip("not today")
+
+@pytest.mark.xfail(reason="known bug")
+def test_xfail():
+    assert False
+
+def test_error(broken):
+    pass
+'''
+
+
+class TestResultsPlugin(BaseTest):
+    """Tests for the streaming JSONL results file and its offline renderers"""
+
+    def _run(self, pytester, monkeypatch):
+        monkeypatch.setenv("PYTHONPATH", ROOT)
+        pytester.makepyfile(test_sample=SAMPLE)
+        path = pytester.path / "results.jsonl"
+        pytester.runpytest_subprocess("-p", "utils.results_plugin", "--results-jsonl", str(path), "-p", "no:cacheprovider")
+        return str(path)
+
+    def test_one_line_per_test(self, pytester, monkeypatch):
+        """Test each test's phases are merged into one record with its outcome and failure details"""
+        path = self._run(pytester, monkeypatch)
+        records = list(iter_records(path))
+        assert [r["event"] for r in records] == ["session_start"] + ["test"] * 5 + ["session_finish"]
+        tests = {r["nodeid"].split("::")[-1]: r for r in records if r["event"] == "test"}
+        assert {name: r["outcome"] for name, r in tests.items()} == {
+            "test_pass": "passed", "test_fail": "failed", "test_skip": "skipped",
+            "test_xfail": "xfailed", "test_error": "error"}
+        assert "numbers differ" in tests["test_fail"]["message"]
+        assert ["Captured stdout call", "noisy output\n"] in tests["test_fail"]["sections"]
+        assert tests["test_error"]["when"] == "setup"
+        assert "longrepr" not in tests["test_pass"]
+        assert records[-1]["counts"] == {"passed": 1, "failed": 1, "skipped": 1, "xfailed": 1, "error": 1}
+
+    def test_renderers(self, pytester, monkeypatch, tmp_path):
+        """Test the HTML report and Allure results are built from the file alone"""
+        path = self._run(pytester, monkeypatch)
+        output = tmp_path / "report.html"
+        summary = render_html(path, str(output), failures_only=True)
+        page = output.read_text()
+        assert summary.total == 5 and summary.counts["failed"] == 1
+        assert "test_fail" in page and "numbers differ" in page and "test_sample.py::test_pass" not in page
+
+        statuses = {r["nodeid"].split("::")[-1]: allure_result(r)["status"]
+                    for r in iter_records(path) if r["event"] == "test"}
+        assert statuses == {"test_pass": "passed", "test_fail": "failed", "test_skip": "skipped",
+                            "test_xfail": "skipped", "test_error": "broken"}
+        json.dumps(allure_result(next(r for r in iter_records(path) if r["event"] == "test")))
@@ -0,0 +1,94 @@
+import email.utils
+import time
+import requests
+from tests.base_test import BaseTest
+from utils.retry import CircuitBreaker, RetryBudget, RetryPolicy
+from utils.stub_server import StubServer
+
+
+def _policy(sleeps, **kwargs):
+    kwargs.setdefault("budget", RetryBudget(min_tokens=100))
+    kwargs.setdefault("breaker", CircuitBreaker(threshold=100))
+    return RetryPolicy(sleep=sleeps.append, **kwargs)
+
+
+class TestRetry(BaseTest):
+    """Tests for request-level retries with backoff, Retry-After, budget and circuit breaker"""
+
+    def test_get_retried_with_exponential_backoff(self, client_factory):
+        """Test a failing GET is retried max_retries times with jittered, doubling delays"""
+        sleeps = []
+        with StubServer(error_rate=1.0, error_status=503) as server:
+            client = client_factory(base_url=server.url, retry_policy=_policy(sleeps, max_retries=3, backoff=0.1))
+            attempts = []
+            client.add_listener(lambda timing: attempts.append((timing.attempt, timing.status)))
+            self.assert_status_code(client.get(f"{self.base_endpoint}/1"), 503)
+        assert attempts == [(0, 503), (1, 503), (2, 503), (3, 503)]
+        assert len(sleeps) == 3
+        assert all(0 <= delay <= 0.1 * 2 ** i for i, delay in enumerate(sleeps))
+
+    def test_transient_errors_are_absorbed(self, client_factory):
+        """Test GETs against a flaky backend all succeed once retried"""
+        sleeps = []
+        with StubServer(error_rate=0.3, random_seed=3) as server:
+            client = client_factory(base_url=server.url, retry_policy=_policy(sleeps, max_retries=6))
+            statuses = {client.get(f"{self.base_endpoint}/{i}").status_code for i in range(1, 14)}
+        assert statuses == {200}
+        assert sleeps, "expected at least one retry"
+
+    def test_post_retried_only_with_idempotency_key(self, client_factory):
+        """Test POST and PATCH are not retried unless they carry an Idempotency-Key"""
+        sleeps = []
+        with StubServer(error_rate=1.0) as server:
+            client = client_factory(base_url=server.url, retry_policy=_policy(sleeps, max_retries=2))
+            self.assert_status_code(client.post(self.base_endpoint, json={"name": "x", "data": None}), 500)
+            assert sleeps == []
+            response = client.post(self.base_endpoint, json={"name": "x", "data": None}, idempotency_key="abc")
+            self.assert_status_code(response, 500)
+            assert response.request.headers["Idempotency-Key"] == "abc"
+            assert len(sleeps) == 2
+            self.assert_status_code(client.patch(f"{self.base_endpoint}/1", json={"name": "y"}), 500)
+            assert len(sleeps) == 2
+            response = client.patch(f"{self.base_endpoint}/1", json={"name": "y"}, idempotency_key="def")
+            assert response.request.headers["Idempotency-Key"] == "def" and len(sleeps) == 4
+            assert client.put(f"{self.base_endpoint}/1", json={"name": "z", "data": None},
+                              idempotency_key="ghi").request.headers["Idempotency-Key"] == "ghi"
+
+    def test_retry_after_is_honoured(self, client_factory):
+        """Test Retry-After replaces the backoff, and a too-long one stops retrying"""
+        sleeps = []
+        with StubServer(error_rate=1.0, error_status=429, retry_after=1) as server:
+            client = client_factory(base_url=server.url, retry_policy=_policy(sleeps, max_retries=2))
+            client.get(f"{self.base_endpoint}/1")
+            assert sleeps == [1.0, 1.0]
+
+            sleeps.clear()
+            client.retry_policy = _policy(sleeps, max_retries=2, max_retry_after=0.5)
+            self.assert_status_code(client.get(f"{self.base_endpoint}/1"), 429)
+            assert sleeps == []
+
+        response = requests.Response()
+        response.headers["Retry-After"] = email.utils.formatdate(time.time() + 60, usegmt=True)
+        assert 55 < RetryPolicy.retry_after(response) <= 60
+
+    def test_budget_and_circuit_breaker_limit_retries(self, client_factory):
+        """Test retries stop when the budget is spent or the circuit is open"""
+        sleeps = []
+        with StubServer(error_rate=1.0) as server:
+            client = client_factory(base_url=server.url,
+                                    retry_policy=_policy(sleeps, max_retries=3, budget=RetryBudget(ratio=0, min_tokens=2)))
+            for _ in range(3):
+                client.get(f"{self.base_endpoint}/1")
+            assert len(sleeps) == 2
+
+            sleeps.clear()
+            breaker = CircuitBreaker(threshold=2, reset_timeout=60)
+            client.retry_policy = _policy(sleeps, max_retries=3, breaker=breaker)
+            client.get(f"{self.base_endpoint}/1")
+            assert len(sleeps) == 1 and breaker.is_open
+            client.get(f"{self.base_endpoint}/1")
+            assert len(sleeps) == 1
+
+            server.error_rate = 0.0
+            self.assert_status_code(client.get(f"{self.base_endpoint}/1"), 200)
+            assert not breaker.is_open
@@ -0,0 +1,140 @@
+import json
+import pytest
+from tests.base_test import BaseTest
+from utils.history import RunHistory, find_regressions
+from utils.schedule_plugin import APIScheduling, _order_items, hints_dir_key, history_key
+
+COLLECTION = [
+    "tests/test_get.py::TestGet::test_a",
+    "tests/test_get.py::TestGet::test_b",
+    "tests/test_get.py::TestGet::test_slow",
+    "tests/test_put.py::TestPut::test_x",
+    "tests/test_put.py::TestPut::test_y",
+    "tests/test_one.py::test_uses_db",
+    "tests/test_two.py::test_uses_db",
+]
+
+
+class _Config:
+    def __init__(self, stash):
+        self.stash = stash
+
+    def getvalue(self, name):
+        return ["2*popen"] if name == "tx" else None
+
+
+class _Item:
+    def __init__(self, nodeid, path):
+        self.nodeid = nodeid
+        self.path = path
+
+
+class _Node:
+    def __init__(self, name):
+        self.gateway = type("Gateway", (), {"id": name})()
+        self.shutting_down = False
+        self.sent = []
+
+    def send_runtest_some(self, indices):
+        self.sent.extend(indices)
+
+    def shutdown(self):
+        self.shutting_down = True
+
+
+class TestSchedulePlugin(BaseTest):
+    """Tests for the duration history, test ordering, regression detection and the xdist scheduler"""
+
+    def test_history_smooths_durations(self, tmp_path):
+        """Test durations are blended with the previous run and methods are replaced"""
+        history = RunHistory(str(tmp_path / "history.db"))
+        history.record([("t::a", 2.0, ["POST", "GET"], "passed"), ("t::b", 1.0, [], "passed")])
+        history.record([("t::a", 4.0, ["GET"], "passed")])
+        assert history.durations() == {"t::a": 3.0, "t::b": 1.0}
+        assert history.methods() == {"t::a": ["GET"], "t::b": []}
+        history.close()
+
+    def test_scheduler_splits_read_only_and_orders_longest_first(self, tmp_path):
+        """Test read-only tests are separate units, mutating ones grouped, and the slowest unit goes first"""
+        history = RunHistory(str(tmp_path / "history.db"))
+        history.record([(COLLECTION[0], 1.0, [], "passed"), (COLLECTION[1], 1.0, ["GET"], "passed"),
+                        (COLLECTION[2], 5.0, ["GET"], "passed"), (COLLECTION[3], 1.0, ["PUT"], "failed")])
+        hints = {COLLECTION[3]: {"kind": "mutating"}, COLLECTION[2]: {"kind": "read_only"},
+                 COLLECTION[5]: {"resource": "db"}, COLLECTION[6]: {"resource": "db"}}
+        (tmp_path / "gw0.json").write_text(json.dumps(hints))
+
+        stash = pytest.Stash()
+        stash[history_key] = history
+        stash[hints_dir_key] = str(tmp_path)
+        sched = APIScheduling(_Config(stash))
+        nodes = [_Node("gw0"), _Node("gw1")]
+        for node in nodes:
+            sched.add_node(node)
+            sched.add_node_collection(node, COLLECTION)
+        sched.schedule()
+
+        assert [sched._split_scope(nodeid) for nodeid in COLLECTION] == [
+            COLLECTION[0], COLLECTION[1], COLLECTION[2],
+            "tests/test_put.py::TestPut", "tests/test_put.py::TestPut",
+            "resource:db", "resource:db",
+        ]
+        assert nodes[0].sent[0] == COLLECTION.index(COLLECTION[2])
+        completed = set()
+        while not sched.tests_finished:
+            for node in nodes:
+                for index in [i for i in node.sent if (node.gateway.id, i) not in completed]:
+                    completed.add((node.gateway.id, index))
+                    sched.mark_test_complete(node, index)
+        assert sorted(nodes[0].sent + nodes[1].sent) == list(range(len(COLLECTION)))
+        for node in nodes:
+            assert (5 in node.sent) == (6 in node.sent), "tests sharing a resource must run on one worker"
+        history.close()
+
+    def test_find_regressions_uses_percentile_and_tolerance(self):
+        """Test only values clearly above the baseline percentile are flagged, worst first"""
+        baselines = {"a": [0.10, 0.11, 0.12, 0.10, 0.30], "b": [0.10] * 5, "c": [0.10] * 5, "d": [0.10] * 2}
+        current = {"a": 0.35, "b": 0.20, "c": 0.11, "d": 1.0}
+        regressions = find_regressions(current, baselines, q=100, tolerance=0.2, min_runs=3)
+        assert [r.name for r in regressions] == ["b"]
+        assert regressions[0].baseline == 0.10 and regressions[0].runs == 5
+        assert [r.name for r in find_regressions(current, baselines, q=50, tolerance=0.2, min_runs=3)] == ["a", "b"]
+
+    def test_history_flags_regressed_tests_and_endpoints(self, tmp_path):
+        """Test a run slower than its rolling baseline is reported and older runs are pruned"""
+        path = str(tmp_path / "history.db")
+        for duration in (0.10, 0.11, 0.10, 0.12, 0.10, 0.11):
+            history = RunHistory(path, keep_runs=5)
+            history.record([("t::a", duration, ["GET"], "passed"), ("t::b", 0.1, ["GET"], "passed")])
+            history.record_endpoints([("GET /objects/{id}", 10, duration / 10, duration)])
+            assert history.test_regressions(min_runs=3) == []
+            history.close()
+
+        history = RunHistory(path, keep_runs=5)
+        history.record([("t::a", 0.5, ["GET"], "passed"), ("t::b", 0.1, ["GET"], "failed")])
+        history.record_endpoints([("GET /objects/{id}", 10, 0.05, 0.5)])
+        assert [(r.name, r.runs) for r in history.test_regressions(min_runs=3)] == [("t::a", 4)]
+        assert [r.name for r in history.endpoint_regressions(min_runs=3)] == ["GET /objects/{id}"]
+        history.close()
+
+    def test_order_items(self, tmp_path):
+        """Test slowest-first, fail-first and changed-first orderings"""
+        history = RunHistory(str(tmp_path / "history.db"))
+        old, new = tmp_path / "test_old.py", tmp_path / "test_new.py"
+        old.write_text("")
+        history.record([("old::fast", 0.1, [], "passed"), ("old::slow", 2.0, [], "passed"),
+                        ("old::broken", 0.5, [], "failed"), ("new::changed", 0.1, [], "passed")])
+        history.close()
+        new.write_text("")  # edited after the recorded run
+
+        items = [_Item("old::fast", old), _Item("old::slow", old), _Item("old::broken", old),
+                 _Item("new::changed", new), _Item("new::added", new)]
+        history = RunHistory(str(tmp_path / "history.db"))
+        for order, expected in [
+            ("slowest-first", ["old::slow", "old::broken", "old::fast", "new::changed", "new::added"]),
+            ("fail-first", ["old::broken", "old::fast", "old::slow", "new::changed", "new::added"]),
+            ("changed-first", ["new::changed", "new::added", "old::fast", "old::slow", "old::broken"]),
+        ]:
+            ordered = list(items)
+            _order_items(ordered, order, history)
+            assert [item.nodeid for item in ordered] == expected
+        history.close()
@@ -0,0 +1,39 @@
+import pytest
+from jsonschema import ValidationError
+from tests.base_test import BaseTest
+from utils import schema_validation
+from utils.schema_validation import CachedValidator, get_validator
+
+class TestSchemaValidation(BaseTest):
+    """Tests for cached and bulk schema validation"""
+
+    def test_validator_is_cached_per_schema(self, product_schema):
+        """Test the same schema object reuses one compiled validator"""
+        assert get_validator(product_schema) is get_validator(product_schema)
+        assert get_validator(dict(product_schema)) is not get_validator(product_schema)
+
+    def test_cache_is_bounded(self, product_schema, monkeypatch):
+        """Test schemas built per call are evicted least recently used first instead of piling up"""
+        monkeypatch.setattr(schema_validation, "MAX_CACHED_SCHEMAS", 3)
+        hot = get_validator(product_schema)
+        for _ in range(5):
+            get_validator(dict(product_schema))
+            assert get_validator(product_schema) is hot
+        assert len(schema_validation._validators) <= 3
+
+    def test_validate_many_reports_invalid_item(self, product_schema):
+        """Test bulk validation fails on an invalid object anywhere in the list"""
+        objects = [{"id": str(i), "name": f"Object {i}", "data": None} for i in range(100)]
+        self.validate_many(objects, product_schema)
+
+        objects[42]["data"] = {"price": "free"}
+        with pytest.raises(ValidationError) as exc_info:
+            self.validate_many(objects, product_schema)
+        assert list(exc_info.value.absolute_path) == [42, "data", "price"]
+
+    def test_fast_path_raises_jsonschema_errors(self, product_schema):
+        """Test a hot validator still raises jsonschema's ValidationError"""
+        validator = CachedValidator(product_schema, fast_threshold=1)
+        validator.validate({"id": "1", "name": "Google Pixel 6 Pro", "data": None})
+        with pytest.raises(ValidationError):
+            validator.validate({"id": 1, "name": "Google Pixel 6 Pro", "data": None})
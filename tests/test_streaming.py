@@ -0,0 +1,42 @@
+import json
+import pytest
+from jsonschema import ValidationError
+from tests.base_test import BaseTest
+from utils.json_stream import iter_json_array
+
+class TestStreaming(BaseTest):
+    """Tests for incremental JSON parsing and memoized response bodies"""
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+    def test_iter_json_array_across_chunk_boundaries(self, chunk_size):
+        """Test items are decoded correctly however the body is split"""
+        items = [{"id": str(i), "name": "Apple é iPad", "data": {"price": i * 1.5}} for i in range(50)]
+        items += [12345, "text, with ] chars", None, [1, 2]]
+        body = json.dumps(items).encode("utf-8")
+        chunks = (body[i:i + chunk_size] for i in range(0, len(body), chunk_size))
+        assert list(iter_json_array(chunks)) == items
+
+    @pytest.mark.parametrize("body", [b"[]", b"  [ ] "])
+    def test_iter_json_array_empty(self, body):
+        """Test an empty array yields nothing"""
+        assert list(iter_json_array([body])) == []
+
+    @pytest.mark.parametrize("body", [b'{"id": "1"}', b'[{"id": "1"}', b'[1 2]'])
+    def test_iter_json_array_rejects_invalid(self, body):
+        """Test non-array or truncated bodies raise ValueError"""
+        with pytest.raises(ValueError):
+            list(iter_json_array([body]))
+
+    def test_iter_objects_validates_each_item(self, client, product_schema):
+        """Test iter_objects streams every object and validates it"""
+        objects = list(client.iter_objects(self.base_endpoint, params=[("id", "3"), ("id", "10")], schema=product_schema))
+        assert [obj["id"] for obj in objects] == ["3", "10"]
+
+        with pytest.raises(ValidationError):
+            list(client.iter_objects(self.base_endpoint, schema={"type": "object", "required": ["missing"]}))
+
+    def test_response_json_is_memoized(self, client):
+        """Test repeated response.json() calls decode the body only once"""
+        response = client.get(f"{self.base_endpoint}/1")
+        assert response.json() is response.json()
+        self.assert_response_key(response, "name")
@@ -0,0 +1,46 @@
+import time
+from tests.base_test import BaseTest
+from utils.stub_server import StubServer
+
+class TestStubServer(BaseTest):
+    """Tests for the local /objects stub's contract and fault injection"""
+
+    def test_contract(self, client, product_schema):
+        """Test the stub serves the seeded objects and the multi-id query"""
+        response = client.get(self.base_endpoint, params=[("id", "3"), ("id", "999"), ("id", "10")])
+        self.assert_status_code(response, 200)
+        assert [obj["id"] for obj in response.json()] == ["3", "10"]
+        self.validate_many(client.get(self.base_endpoint).json(), product_schema)
+        self.assert_status_code(client.get("/unknown"), 404)
+        self.assert_status_code(client.put(self.base_endpoint, json={}), 405)
+
+    def test_malformed_bodies_rejected(self, client):
+        """Test invalid JSON and non-object bodies get a 400 and the server keeps answering"""
+        headers = {"Content-Type": "application/json"}
+        for body in (b"{not json", b"[1, 2]", b"\xff\xfe"):
+            response = client.request("POST", self.base_endpoint, data=body, headers=headers)
+            self.assert_status_code(response, 400)
+            assert "error" in response.json()
+        self.assert_status_code(client.request("PUT", f"{self.base_endpoint}/1", data=b'"x"', headers=headers), 400)
+        self.assert_status_code(client.get(f"{self.base_endpoint}/1"), 200)
+
+    def test_injected_latency(self, client_factory):
+        """Test every response is delayed by latency plus jitter"""
+        with StubServer(latency=0.05, jitter=0.02, random_seed=1) as server:
+            client = client_factory(base_url=server.url)
+            start = time.perf_counter()
+            self.assert_status_code(client.get(f"{self.base_endpoint}/1"), 200)
+            elapsed = time.perf_counter() - start
+        assert 0.05 <= elapsed < 0.5
+
+    def test_injected_errors(self, client_factory, isolated_retry_policy):
+        """Test the configured fraction of requests fails with the configured status"""
+        with StubServer(error_rate=0.5, error_status=503, retry_after=2, random_seed=7) as server:
+            client = client_factory(base_url=server.url, retry_policy=isolated_retry_policy)
+            responses = [client.post(self.base_endpoint, json={"name": "x", "data": None}) for _ in range(200)]
+            server.error_rate = 0.0
+            self.assert_status_code(client.get(f"{self.base_endpoint}/1"), 200)
+        failed = [r for r in responses if r.status_code == 503]
+        assert 60 < len(failed) < 140
+        assert failed[0].headers["Retry-After"] == "2"
+        assert {r.status_code for r in responses} == {200, 503}
@@ -1,35 +1,441 @@
+import ipaddress
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
 import requests
-from typing import Optional, Dict, Any
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib3 import PoolManager
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.util.connection import allowed_gai_family
+from typing import Optional, Dict, Any, List, Callable, Iterator, Iterable
 from config.config import Config
+from utils.cassette import Cassette, CassetteMissError
+from utils.http_cache import UNSAFE_METHODS, ResponseCache
+from utils.json_stream import iter_json_array
+from utils.log import logger
+from utils.metrics import RequestTiming
+from utils.payload import EncodedPayload, encode_payload
+from utils.retry import IDEMPOTENCY_HEADER, RetryPolicy
+from utils.schema_validation import get_validator
+
+# Connection phases (dns/connect/tls) of the request currently being sent on this thread
+_phase_timings = threading.local()
+
+
+class ConnectionStats:
+    """Connections opened versus requests sent over a client's connection pools"""
+
+    def __init__(self, opened: int = 0, requests_sent: int = 0):
+        self.opened = opened
+        self.requests_sent = requests_sent
+
+    @property
+    def reused(self) -> int:
+        """Requests served over an already-open connection"""
+        return max(self.requests_sent - self.opened, 0)
+
+    def merge(self, other: "ConnectionStats"):
+        """Add another set of counters (e.g. from an xdist worker) to this one"""
+        self.opened += other.opened
+        self.requests_sent += other.requests_sent
+
+    def as_dict(self) -> Dict[str, int]:
+        return {"opened": self.opened, "requests_sent": self.requests_sent, "reused": self.reused}
+
+
+class _TimedConnectionMixin:
+    """Records DNS, TCP connect and TLS handshake durations of new connections into _phase_timings"""
+
+    def _new_conn(self):
+        phases = getattr(_phase_timings, "phases", None)
+        if phases is None:
+            return super()._new_conn()
+        host = self._dns_host
+        start = time.perf_counter()
+        try:
+            ipaddress.ip_address(host.strip("[]"))
+        except ValueError:
+            try:
+                # Resolve once here so DNS is timed apart from the TCP connect below
+                self._dns_host = socket.getaddrinfo(host, self.port, allowed_gai_family(), socket.SOCK_STREAM)[0][4][0]
+            except OSError:
+                pass  # urllib3 resolves again below and raises its own NameResolutionError
+        resolved = time.perf_counter()
+        try:
+            sock = super()._new_conn()
+        finally:
+            self._dns_host = host
+        phases["dns"] = resolved - start
+        phases["connect"] = time.perf_counter() - resolved
+        return sock
+
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        phases = getattr(_phase_timings, "phases", None)
+        if phases is not None and isinstance(self, HTTPSConnection) and "connect" in phases:
+            phases["tls"] = time.perf_counter() - start - phases["dns"] - phases["connect"]
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+_TIMED_CONNECTION_CLASSES = {HTTPConnection: _TimedHTTPConnection, HTTPSConnection: _TimedHTTPSConnection}
+
+
+class _TrackingPoolManager(PoolManager):
+    """PoolManager that remembers every pool it creates so their counters survive eviction"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.created_pools: List[Any] = []
+        self._created_lock = threading.Lock()
+
+    def _new_pool(self, scheme, host, port, request_context=None):
+        pool = super()._new_pool(scheme, host, port, request_context=request_context)
+        pool.ConnectionCls = _TIMED_CONNECTION_CLASSES.get(pool.ConnectionCls, pool.ConnectionCls)
+        with self._created_lock:
+            self.created_pools.append(pool)
+        return pool
+
+
+class BatchResult:
+    """Objects returned by APIClient.get_many, in requested order, plus the ids the API did not return"""
+
+    def __init__(self, objects: List[Dict[str, Any]], missing: List[str]):
+        self.objects = objects
+        self.missing = missing
+
+    def __iter__(self):
+        return iter(self.objects)
+
+    def __len__(self) -> int:
+        return len(self.objects)
+
+
+class APIResponse(requests.Response):
+    """requests.Response that decodes its JSON body only once, however many helpers ask for it"""
+
+    cached = False  # replayed from the ResponseCache (a fresh hit or a 304), so its timing isn't the server's
+
+    def json(self, **kwargs) -> Any:
+        if kwargs:
+            return super().json(**kwargs)
+        try:
+            return self._parsed_json
+        except AttributeError:
+            self._parsed_json = super().json()
+            return self._parsed_json
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter sized from Config that can report connection reuse, cache GET responses and record/replay
+    through a Cassette"""
+
+    def __init__(self, *args, cassette: Optional[Cassette] = None, cache: Optional[ResponseCache] = None, **kwargs):
+        self.cassette = cassette
+        self.cache = cache
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        cache = self.cache
+        if cache is not None and request.method in UNSAFE_METHODS:
+            try:
+                return self._send_recorded(request, **kwargs)
+            finally:
+                # Once the write is done (or failed midway), so a GET racing with it can't re-cache the old copy
+                cache.invalidate(request.url)
+        if cache is None or not self._cacheable(request):
+            return self._send_recorded(request, **kwargs)
+        entry, fresh = cache.lookup(request.url, request.headers)
+        if fresh:
+            return self._replay(request, entry.recording, cached=True)
+        if entry is not None:
+            request.headers.update(entry.conditional_headers())
+        response = self._send_recorded(request, **kwargs)
+        if entry is not None:
+            if response.status_code == 304:
+                response.close()
+                return self._replay(request, cache.revalidated(entry, response.headers).recording, cached=True)
+            cache.not_revalidated()
+        if not kwargs.get("stream"):
+            cache.store(request.url, response.status_code, response.reason, response.headers, response.content,
+                        request.headers)
+        return response
+
+    @staticmethod
+    def _cacheable(request) -> bool:
+        """Plain GETs; requests that carry their own conditional headers are left alone"""
+        return request.method == "GET" and not any(
+            name in request.headers for name in ("If-None-Match", "If-Modified-Since", "Range"))
+
+    def _send_recorded(self, request, **kwargs):
+        cassette = self.cassette
+        if cassette is None or request.method not in cassette.methods:
+            return super().send(request, **kwargs)
+        key = cassette.key(request.method, request.url, request.body)
+        if cassette.mode != "record":
+            recording = cassette.lookup(key)
+            if recording is not None:
+                return self._replay(request, recording)
+            if cassette.mode == "replay":
+                raise CassetteMissError(f"No recorded response for {request.method} {request.url}", request=request)
+        response = super().send(request, **kwargs)
+        cassette.record(key, response.status_code, response.reason, list(response.headers.items()), response.content)
+        return response
+
+    def _replay(self, request, recording, cached: bool = False) -> APIResponse:
+        """Build a response from a recording without touching the network; the body is the recorded bytes"""
+        status, reason, headers, body = recording
+        response = APIResponse()
+        response.status_code = status
+        response.reason = reason
+        response.headers = CaseInsensitiveDict(headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = body
+        response._content_consumed = True
+        response.cached = cached
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def build_response(self, req, resp) -> APIResponse:
+        response = super().build_response(req, resp)
+        response.__class__ = APIResponse
+        return response
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        self.poolmanager = _TrackingPoolManager(num_pools=connections, maxsize=maxsize, block=block, **pool_kwargs)
+
+    def connection_stats(self) -> ConnectionStats:
+        stats = ConnectionStats()
+        for pool in self.poolmanager.created_pools:
+            stats.opened += pool.num_connections
+            stats.requests_sent += pool.num_requests
+        return stats
+
 
 class APIClient:
-    def __init__(self):
-        self.base_url = Config.BASE_URL
+    def __init__(self, base_url: Optional[str] = None, cassette: Optional[Cassette] = None,
+                 retry_policy: Optional[RetryPolicy] = None, cache: Optional[ResponseCache] = None,
+                 compression: Optional[str] = None):
+        self.base_url = base_url or Config.BASE_URL
         self.timeout = Config.REQUEST_TIMEOUT
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.compression = compression if compression is not None else Config.REQUEST_COMPRESSION or None
+        self.compression_min_bytes = Config.REQUEST_COMPRESSION_MIN_BYTES
         self.session = requests.Session()
         self.session.headers.update(Config.get_headers())
+        if not Config.KEEP_ALIVE:
+            self.session.headers["Connection"] = "close"
+        if Config.ACCEPT_ENCODING:
+            self.session.headers["Accept-Encoding"] = Config.ACCEPT_ENCODING
+        self.adapter = PooledHTTPAdapter(
+            pool_connections=Config.POOL_CONNECTIONS,
+            pool_maxsize=Config.POOL_MAXSIZE,
+            pool_block=Config.POOL_BLOCK,
+            cassette=cassette,
+            cache=cache,
+        )
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+        self.listeners: List[Callable[[RequestTiming], None]] = []
+
+    def add_listener(self, listener: Callable[[RequestTiming], None]):
+        """Call `listener` with a RequestTiming after every request sent by this client"""
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[RequestTiming], None]):
+        self.listeners.remove(listener)
+
+    def connection_stats(self) -> ConnectionStats:
+        """Return how many connections were opened versus reused so far"""
+        return self.adapter.connection_stats()
+
+    @property
+    def cassette(self) -> Optional[Cassette]:
+        return self.adapter.cassette
+
+    @property
+    def cache(self) -> Optional[ResponseCache]:
+        return self.adapter.cache
+
+    def close(self):
+        """Close the session and its connection pools"""
+        self.session.close()
+
+    def encode(self, payload: Any) -> EncodedPayload:
+        """Serialize (and compress, if this client compresses) a payload once, to send it with `json=` many times"""
+        return encode_payload(payload, self.compression, self.compression_min_bytes)
+
+    def request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
+        """Send a request, retrying transient failures (5xx, 429, connection errors) as the retry policy allows"""
+        url = f"{self.base_url}{endpoint}"
+        payload = kwargs.get("json")
+        if isinstance(payload, EncodedPayload) or (payload is not None and self.compression):
+            # Encoded once here, so retries resend the same bytes
+            kwargs = self._with_body(self.encode(payload) if not isinstance(payload, EncodedPayload) else payload,
+                                     kwargs)
+        policy = self.retry_policy
+        policy.budget.deposit()
+        retryable = policy.is_retryable_request(method, kwargs.get("headers"))
+        attempt = 0
+        while True:
+            response = error = None
+            try:
+                response = self._send(method, url, attempt, **kwargs)
+            except requests.RequestException as e:
+                error = e
+            failed = policy.is_failure(response, error)
+            policy.breaker.record(failed)
+            if not (failed and retryable):
+                break
+            delay = policy.delay(attempt, response)
+            if delay is None or not policy.should_retry(attempt):
+                break
+            logger.debug("Retrying %s %s in %.2fs after %s", method, url, delay,
+                         type(error).__name__ if error is not None else response.status_code)
+            if response is not None:
+                response.close()
+            policy.sleep(delay)
+            attempt += 1
+        if error is not None:
+            raise error
+        return response
+
+    @staticmethod
+    def _with_body(payload: EncodedPayload, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        headers = dict(kwargs.get("headers") or {}, **payload.headers)
+        return dict(kwargs, json=None, data=payload.body, headers=headers, body_size=payload.size)
+
+    def _send(self, method: str, url: str, attempt: int, body_size: Optional[int] = None,
+              **kwargs) -> requests.Response:
+        """Send one attempt of a request and report its timing breakdown to the registered listeners"""
+        timing = RequestTiming(method, url)
+        timing.attempt = attempt
+        _phase_timings.phases = phases = {}
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+        except requests.RequestException as e:
+            timing.error = type(e).__name__
+            raise
+        else:
+            timing.status = response.status_code
+            timing.cached = getattr(response, "cached", False)
+            timing.ttfb = response.elapsed.total_seconds()
+            body = response.request.body
+            if isinstance(body, (bytes, str)):
+                timing.request_wire_bytes = len(body)
+            else:
+                # Generators and files are consumed by now; rely on the length requests declared, if any
+                timing.request_wire_bytes = int(response.request.headers.get("Content-Length") or 0)
+            timing.request_bytes = body_size if body_size is not None else timing.request_wire_bytes
+            if kwargs.get("stream"):
+                # Don't read a streamed body here; trust the declared length instead
+                timing.response_bytes = timing.response_wire_bytes = int(response.headers.get("Content-Length") or 0)
+            else:
+                timing.response_bytes = len(response.content)
+                # Bytes read off the socket before decompression; replayed responses never touched it
+                raw = response.raw
+                timing.response_wire_bytes = raw.tell() if raw is not None else 0
+            return response
+        finally:
+            timing.total = time.perf_counter() - start
+            _phase_timings.phases = None
+            timing.dns = phases.get("dns")
+            timing.connect = phases.get("connect")
+            timing.tls = phases.get("tls")
+            for listener in self.listeners:
+                listener(timing)
+
+    def iter_objects(self, endpoint: str, params: Optional[Dict[str, Any]] = None,
+                     schema: Optional[Dict[str, Any]] = None, chunk_size: int = 65536) -> Iterator[Any]:
+        """Stream a JSON array response and yield its items one by one, validating each against schema if given"""
+        validator = get_validator(schema) if schema is not None else None
+        response = self.request("GET", endpoint, params=params, stream=True)
+        with response:
+            response.raise_for_status()
+            for item in iter_json_array(response.iter_content(chunk_size), response.encoding or "utf-8"):
+                if validator is not None:
+                    validator.validate(item)
+                yield item
+
+    def get_many(self, ids: Iterable[str], chunk_size: int = 100, endpoint: str = "/objects",
+                 max_url_length: int = 2000) -> BatchResult:
+        """Fetch many objects with `?id=` queries split into URL-length-safe chunks sent concurrently
+
+        Duplicate ids are fetched once; objects come back in the order their ids were first requested.
+        """
+        unique_ids = list(dict.fromkeys(str(id_) for id_ in ids))
+        chunks = self._id_chunks(unique_ids, chunk_size, len(self.base_url) + len(endpoint), max_url_length)
+        if not chunks:
+            return BatchResult([], [])
+
+        def fetch(chunk: List[str]) -> List[Dict[str, Any]]:
+            response = self.get(endpoint, params=[("id", id_) for id_ in chunk])
+            response.raise_for_status()
+            return response.json()
+
+        with ThreadPoolExecutor(max_workers=min(len(chunks), Config.POOL_MAXSIZE)) as executor:
+            found = {obj["id"]: obj for objects in executor.map(fetch, chunks) for obj in objects}
+        return BatchResult(
+            [found[id_] for id_ in unique_ids if id_ in found],
+            [id_ for id_ in unique_ids if id_ not in found],
+        )
+
+    @staticmethod
+    def _id_chunks(ids: List[str], chunk_size: int, base_length: int, max_url_length: int) -> List[List[str]]:
+        """Split ids so each chunk has at most chunk_size ids and its URL stays under max_url_length"""
+        chunks: List[List[str]] = []
+        chunk: List[str] = []
+        length = base_length
+        for id_ in ids:
+            param_length = len("&id=") + len(quote(id_, safe=""))
+            if chunk and (len(chunk) >= chunk_size or length + param_length > max_url_length):
+                chunks.append(chunk)
+                chunk, length = [], base_length
+            chunk.append(id_)
+            length += param_length
+        if chunk:
+            chunks.append(chunk)
+        return chunks
 
     def get(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> requests.Response:
         """Send GET request to the specified endpoint"""
-        url = f"{self.base_url}{endpoint}"
-        return self.session.get(url, params=params, timeout=self.timeout)
+        return self.request("GET", endpoint, params=params)
 
-    def post(self, endpoint: str, json: Optional[Dict[str, Any]] = None, data: Optional[Dict[str, Any]] = None) -> requests.Response:
-        """Send POST request to the specified endpoint"""
-        url = f"{self.base_url}{endpoint}"
-        return self.session.post(url, json=json, data=data, timeout=self.timeout)
+    def post(self, endpoint: str, json: Optional[Dict[str, Any]] = None, data: Optional[Dict[str, Any]] = None,
+             idempotency_key: Optional[str] = None) -> requests.Response:
+        """Send POST request to the specified endpoint; with an idempotency key it is safe to retry"""
+        headers = {IDEMPOTENCY_HEADER: idempotency_key} if idempotency_key else None
+        return self.request("POST", endpoint, json=json, data=data, headers=headers)
 
-    def put(self, endpoint: str, json: Optional[Dict[str, Any]] = None) -> requests.Response:
+    def put(self, endpoint: str, json: Optional[Dict[str, Any]] = None,
+            idempotency_key: Optional[str] = None) -> requests.Response:
         """Send PUT request to the specified endpoint"""
-        url = f"{self.base_url}{endpoint}"
-        return self.session.put(url, json=json, timeout=self.timeout)
+        headers = {IDEMPOTENCY_HEADER: idempotency_key} if idempotency_key else None
+        return self.request("PUT", endpoint, json=json, headers=headers)
 
     def delete(self, endpoint: str) -> requests.Response:
         """Send DELETE request to the specified endpoint"""
-        url = f"{self.base_url}{endpoint}"
-        return self.session.delete(url, timeout=self.timeout)
+        return self.request("DELETE", endpoint)
 
-    def patch(self, endpoint: str, json: Optional[Dict[str, Any]] = None) -> requests.Response:
-        """Send PATCH request to the specified endpoint"""
-        url = f"{self.base_url}{endpoint}"
-        return self.session.patch(url, json=json, timeout=self.timeout) 
\ No newline at end of file
+    def patch(self, endpoint: str, json: Optional[Dict[str, Any]] = None,
+              idempotency_key: Optional[str] = None) -> requests.Response:
+        """Send PATCH request to the specified endpoint; with an idempotency key it is safe to retry"""
+        headers = {IDEMPOTENCY_HEADER: idempotency_key} if idempotency_key else None
+        return self.request("PATCH", endpoint, json=json, headers=headers)
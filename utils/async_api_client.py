@@ -0,0 +1,100 @@
+import asyncio
+import json as jsonlib
+import aiohttp
+from typing import Optional, Dict, Any
+from config.config import Config
+
+
+class AsyncRequest:
+    """Minimal request record mirroring the attributes of requests.PreparedRequest used by BaseTest"""
+
+    def __init__(self, method: str, url: str):
+        self.method = method
+        self.url = url
+
+
+class AsyncResponse:
+    """Fully-read response with the same surface BaseTest helpers expect from requests.Response"""
+
+    def __init__(self, request: AsyncRequest, status_code: int, headers: Dict[str, str], content: bytes):
+        self.request = request
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        """Decode the body once and return the same parsed object on later calls"""
+        try:
+            return self._parsed_json
+        except AttributeError:
+            self._parsed_json = jsonlib.loads(self.content)
+            return self._parsed_json
+
+
+class AsyncAPIClient:
+    """asyncio counterpart of APIClient with a bounded number of requests in flight"""
+
+    def __init__(self, base_url: Optional[str] = None, max_concurrency: Optional[int] = None):
+        self.base_url = base_url or Config.BASE_URL
+        self.timeout = aiohttp.ClientTimeout(total=Config.REQUEST_TIMEOUT)
+        self.max_concurrency = max_concurrency or Config.MAX_CONCURRENCY
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> "AsyncAPIClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Lazily create the pooled session inside the running event loop"""
+        if self._session is None or self._session.closed:
+            headers = {k: v for k, v in Config.get_headers().items() if v is not None}
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+            self._session = aiohttp.ClientSession(headers=headers, connector=connector, timeout=self.timeout)
+        return self._session
+
+    async def close(self):
+        """Close the underlying session and its connection pool"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def request(self, method: str, endpoint: str, **kwargs) -> AsyncResponse:
+        """Send a request, waiting for a free slot if max_concurrency requests are in flight"""
+        url = f"{self.base_url}{endpoint}"
+        async with self._semaphore:
+            async with self.session.request(method, url, **kwargs) as response:
+                content = await response.read()
+                return AsyncResponse(
+                    AsyncRequest(method, str(response.url)),
+                    response.status,
+                    dict(response.headers),
+                    content,
+                )
+
+    async def get(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> AsyncResponse:
+        """Send GET request to the specified endpoint"""
+        return await self.request("GET", endpoint, params=params)
+
+    async def post(self, endpoint: str, json: Optional[Dict[str, Any]] = None, data: Optional[Dict[str, Any]] = None) -> AsyncResponse:
+        """Send POST request to the specified endpoint"""
+        return await self.request("POST", endpoint, json=json, data=data)
+
+    async def put(self, endpoint: str, json: Optional[Dict[str, Any]] = None) -> AsyncResponse:
+        """Send PUT request to the specified endpoint"""
+        return await self.request("PUT", endpoint, json=json)
+
+    async def delete(self, endpoint: str) -> AsyncResponse:
+        """Send DELETE request to the specified endpoint"""
+        return await self.request("DELETE", endpoint)
+
+    async def patch(self, endpoint: str, json: Optional[Dict[str, Any]] = None) -> AsyncResponse:
+        """Send PATCH request to the specified endpoint"""
+        return await self.request("PATCH", endpoint, json=json)
@@ -0,0 +1,271 @@
+"""Micro-benchmarks of APIClient and the BaseTest helpers, run offline against the in-process stub
+
+    python -m utils.benchmark --save baseline
+    python -m utils.benchmark --compare baseline --threshold 0.2
+
+Every benchmark is calibrated to take at least --min-time per round and timed for --rounds rounds; results
+(per-call seconds) are saved to .benchmarks/NAME.json. --compare exits non-zero if any benchmark's median got
+more than --threshold slower than in the saved run.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, ".benchmarks")
+
+# name -> setup(context) returning the zero-argument callable to time; a setup may append callables to
+# context["teardown"], run once the benchmark is measured
+BENCHMARKS: Dict[str, Callable[[Dict[str, Any]], Callable[[], Any]]] = {}
+
+
+def benchmark(name: str):
+    """Register a benchmark setup function under `name`"""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def _objects(count: int) -> List[Dict[str, Any]]:
+    from utils.stub_server import SEED_OBJECTS
+    return [dict(SEED_OBJECTS[i % len(SEED_OBJECTS)], id=str(i)) for i in range(count)]
+
+
+def _client(context: Dict[str, Any]):
+    if "client" not in context:
+        from utils.api_client import APIClient
+        from utils.retry import RetryPolicy
+        from utils.stub_server import StubServer
+        server = context["server"] = StubServer().start()
+        context["client"] = APIClient(server.url, retry_policy=RetryPolicy(max_retries=0))
+    return context["client"]
+
+
+@benchmark("http.GET raw")
+def _raw_get(context):
+    """A keep-alive http.client GET, the floor the client overhead is measured against"""
+    import http.client
+    from urllib.parse import urlsplit
+    _client(context)
+    connection = http.client.HTTPConnection(urlsplit(context["server"].url).netloc)
+    context.setdefault("connections", []).append(connection)
+
+    def run():
+        connection.request("GET", "/objects/1")
+        connection.getresponse().read()
+    return run
+
+
+def _verb(method: str, endpoint: str, payload: Optional[Dict[str, Any]] = None):
+    def setup(context):
+        client = _client(context)
+        if method == "POST":
+            store = context["server"].store
+            seeded = {obj["id"] for obj in store.list()}
+
+            def delete_created():
+                for obj in store.list():
+                    if obj["id"] not in seeded:
+                        store.delete(obj["id"])
+            context.setdefault("teardown", []).append(delete_created)
+        kwargs = {"json": payload} if payload is not None else {}
+        return lambda: client.request(method, endpoint, **kwargs)
+    return setup
+
+
+_PAYLOAD = {"name": "Apple MacBook Pro 16", "data": {"year": 2019, "price": 1849.99, "CPU model": "Intel Core i9"}}
+benchmark("client.GET")(_verb("GET", "/objects/1"))
+benchmark("client.POST")(_verb("POST", "/objects", _PAYLOAD))
+benchmark("client.PUT")(_verb("PUT", "/objects/7", _PAYLOAD))
+
+
+@benchmark("client.PUT pre-encoded")
+def _put_encoded(context):
+    """The same PUT with its body serialized once up front instead of on every call"""
+    client = _client(context)
+    payload = client.encode(_PAYLOAD)
+    return lambda: client.put("/objects/7", json=payload)
+
+
+benchmark("client.PATCH")(_verb("PATCH", "/objects/7", {"name": "Apple MacBook Pro 16"}))
+benchmark("client.DELETE")(_verb("DELETE", "/objects/does-not-exist"))
+
+
+def _validate_many(count: int):
+    def setup(context):
+        from utils.models import PRODUCT_SCHEMA
+        from utils.schema_validation import validate_many
+        objects = _objects(count)
+        return lambda: validate_many(objects, PRODUCT_SCHEMA)
+    return setup
+
+
+for _count in (1, 1000, 100000):
+    benchmark(f"schema.validate_many[{_count}]")(_validate_many(_count))
+
+
+def _json_decode(count: int):
+    def setup(context):
+        from utils.api_client import APIResponse
+        body = json.dumps(_objects(count)).encode("utf-8")
+
+        def run():
+            response = APIResponse()
+            response._content = body
+            return response.json()
+        return run
+    return setup
+
+
+for _count in (1000, 100000):
+    benchmark(f"json.decode[{_count}]")(_json_decode(_count))
+
+
+@benchmark("models.decode_products[100000]")
+def _decode_products(context):
+    from utils.models import decode_products
+    objects = _objects(100000)
+    return lambda: decode_products(objects)
+
+
+@benchmark("helpers.assert_status_code")
+def _assert_status_code(context):
+    """Helper call on a passing test: the debug record is buffered but never formatted"""
+    from tests.base_test import BaseTest
+    from utils.log import configure_logging
+    configure_logging("DEBUG")
+    response = _client(context).get("/objects/7")
+    helper = BaseTest()
+    return lambda: helper.assert_status_code(response, 200)
+
+
+@benchmark("helpers.validate_response_schema")
+def _validate_response_schema(context):
+    from tests.base_test import BaseTest
+    from utils.models import PRODUCT_SCHEMA
+    from utils.log import configure_logging
+    configure_logging("DEBUG")
+    response = _client(context).get("/objects/7")
+    helper = BaseTest()
+    return lambda: helper.validate_response_schema(response, PRODUCT_SCHEMA)
+
+
+def measure(func: Callable[[], Any], rounds: int = 5, min_time: float = 0.05) -> Dict[str, float]:
+    """Per-call timings of `func` over `rounds` rounds, each repeating it enough to last `min_time`"""
+    func()  # warm up caches, connections and lazily compiled validators
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9) * 1.2))
+    samples = [elapsed / number]
+    for _ in range(rounds - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+    return {"min": min(samples), "median": statistics.median(samples), "mean": statistics.fmean(samples),
+            "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0, "rounds": rounds, "number": number}
+
+
+def run_benchmarks(names: List[str], rounds: int, min_time: float) -> Dict[str, Dict[str, float]]:
+    context: Dict[str, Any] = {}
+    results = {}
+    try:
+        for name in names:
+            results[name] = measure(BENCHMARKS[name](context), rounds, min_time)
+            for teardown in context.pop("teardown", ()):
+                teardown()
+            print(f"{name:<36} {_format_time(results[name]['median']):>10}  (x{results[name]['number']})")
+    finally:
+        for connection in context.get("connections", ()):
+            connection.close()
+        if "client" in context:
+            context["client"].close()
+            context["server"].stop()
+    return results
+
+
+def compare(current: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float) -> List[Tuple[str, float, float, float]]:
+    """(name, baseline median, current median, ratio) of benchmarks over `1 + threshold` times slower"""
+    regressions = []
+    for name, stats in current.items():
+        if name in baseline:
+            ratio = stats["median"] / baseline[name]["median"]
+            if ratio > 1 + threshold:
+                regressions.append((name, baseline[name]["median"], stats["median"], ratio))
+    return regressions
+
+
+def _format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f}{unit}"
+    return f"{seconds / 1e-9:.0f}ns"
+
+
+def _results_path(name: str) -> str:
+    return name if name.endswith(".json") else os.path.join(RESULTS_DIR, f"{name}.json")
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--rounds", type=int, default=5, help="Timed rounds per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Minimum seconds per round")
+    parser.add_argument("--save", nargs="?", const="", default=None,
+                        help="Save results as .benchmarks/NAME.json (default NAME: current commit)")
+    parser.add_argument("--compare", help="Saved results (NAME or path) to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown of a median, e.g. 0.2 = 20%%")
+    parser.add_argument("--list", action="store_true", help="List benchmark names and exit")
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    if args.list:
+        print("\n".join(names))
+        return
+    sys.path.insert(0, ROOT)
+    results = run_benchmarks(names, args.rounds, args.min_time)
+
+    if args.save is not None:
+        commit = _commit()
+        path = _results_path(args.save or commit or "latest")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"commit": commit, "python": platform.python_version(), "machine": platform.machine(),
+                       "benchmarks": results}, f, indent=2)
+        print(f"saved {path}")
+
+    if args.compare:
+        with open(_results_path(args.compare)) as f:
+            baseline = json.load(f)["benchmarks"]
+        regressions = compare(results, baseline, args.threshold)
+        for name, before, after, ratio in regressions:
+            print(f"REGRESSION {name}: {_format_time(before)} -> {_format_time(after)} ({ratio:.2f}x)")
+        if regressions:
+            sys.exit(1)
+        print(f"no benchmark is more than {args.threshold:.0%} slower than {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
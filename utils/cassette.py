@@ -0,0 +1,189 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+import requests
+from utils.payload import decoded_headers
+
+MODES = ("record", "replay", "replay-or-record")
+
+# File layout: records | index (entries sorted by key) | footer
+_MAGIC = b"APICASS1"
+_FOOTER = struct.Struct("<QQ8s")  # index offset, entry count, magic
+_ENTRY = struct.Struct("<16sQI")  # request key, record offset, record length
+_RECORD = struct.Struct("<HBII")  # status, flags, meta length, body length
+_COMPRESSED = 0x01
+# Share of the data section that may be replaced records before save() rewrites the file without them
+COMPACT_RATIO = 0.5
+
+# (status, reason, headers, body) of a recorded response
+Recording = Tuple[int, str, List[Tuple[str, str]], bytes]
+
+
+class CassetteMissError(requests.RequestException):
+    """Raised in replay mode when a request has no recorded response"""
+
+
+class Cassette:
+    """Recorded responses in a compact single-file store, looked up by request hash through a memory-mapped index
+
+    Modes: `record` re-records every request it sees (keeping the file's other recordings), `replay` never touches
+    the network, `replay-or-record` replays what it has and records the rest. Only `methods` (GET by default) are
+    recorded; other requests pass through.
+    """
+
+    def __init__(self, path: str, mode: str = "replay-or-record", compress: bool = False,
+                 methods: Iterable[str] = ("GET",)):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode {mode!r}, expected one of {', '.join(MODES)}")
+        self.path = path
+        self.mode = mode
+        self.compress = compress
+        self.methods = frozenset(m.upper() for m in methods)
+        self._lock = threading.Lock()
+        self._pending: Dict[bytes, bytes] = {}
+        self._file = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._index_offset = 0
+        self._count = 0
+        # Mapped in record mode too, so save() keeps the recordings this session doesn't replace
+        self._open()
+
+    @staticmethod
+    def key(method: str, url: str, body: Union[bytes, str, None]) -> bytes:
+        """Hash of method, path, query and body; the host is left out so recordings replay against any base URL"""
+        parts = urlsplit(url)
+        target = parts.path + ("?" + parts.query if parts.query else "")
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(method.upper().encode("ascii") + b" " + target.encode("utf-8") + b"\n")
+        digest.update(body or b"")
+        return digest.digest()
+
+    def _open(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < _FOOTER.size:
+            if self.mode == "replay":
+                raise FileNotFoundError(f"Cassette not found: {self.path}")
+            return
+        self._file = open(self.path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._index_offset, self._count, magic = _FOOTER.unpack_from(self._mmap, len(self._mmap) - _FOOTER.size)
+        if magic != _MAGIC:
+            self._close_map()
+            raise ValueError(f"{self.path} is not a cassette file")
+
+    def _close_map(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._file.close()
+        self._mmap = self._file = None
+        self._index_offset = self._count = 0
+
+    def _find(self, key: bytes) -> Optional[bytes]:
+        """Binary search the mapped index and return the raw record for key"""
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            entry_key, offset, length = _ENTRY.unpack_from(self._mmap, self._index_offset + mid * _ENTRY.size)
+            if entry_key == key:
+                return self._mmap[offset:offset + length]
+            if entry_key < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def lookup(self, key: bytes) -> Optional[Recording]:
+        with self._lock:
+            record = self._pending.get(key)
+            if record is None and self._mmap is not None:
+                record = self._find(key)
+        return None if record is None else self._decode(record)
+
+    def record(self, key: bytes, status: int, reason: str, headers: List[Tuple[str, str]], body: bytes):
+        """Store a response with its decoded body; transient failures (5xx, 429) are not recorded so they can't replay"""
+        if status >= 500 or status == 429:
+            return
+        headers = decoded_headers(headers)
+        meta = json.dumps({"reason": reason, "headers": headers}, separators=(",", ":")).encode("utf-8")
+        flags = 0
+        if self.compress:
+            body = zlib.compress(body)
+            flags |= _COMPRESSED
+        record = _RECORD.pack(status, flags, len(meta), len(body)) + meta + body
+        with self._lock:
+            self._pending[key] = record
+
+    @staticmethod
+    def _decode(record: bytes) -> Recording:
+        status, flags, meta_length, body_length = _RECORD.unpack_from(record)
+        meta = json.loads(record[_RECORD.size:_RECORD.size + meta_length])
+        body = record[_RECORD.size + meta_length:_RECORD.size + meta_length + body_length]
+        if flags & _COMPRESSED:
+            body = zlib.decompress(body)
+        return status, meta["reason"], [tuple(h) for h in meta["headers"]], bytes(body)
+
+    def save(self):
+        """Append this session's recordings and rewrite the index; existing records are kept unless re-recorded
+
+        A re-recorded key leaves its old bytes behind; once those make up more than COMPACT_RATIO of the data,
+        the file is rewritten with the live records only.
+        """
+        with self._lock:
+            if not self._pending:
+                return
+            existing = {}
+            live = 0
+            for i in range(self._count):
+                entry_key, offset, length = _ENTRY.unpack_from(self._mmap, self._index_offset + i * _ENTRY.size)
+                if entry_key not in self._pending:
+                    existing[entry_key] = (offset, length)
+                    live += length
+            data_end = self._index_offset
+
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            if data_end and data_end - live > COMPACT_RATIO * data_end:
+                temporary = self.path + ".tmp"
+                with open(temporary, "wb") as f:
+                    for entry_key, (offset, length) in list(existing.items()):
+                        existing[entry_key] = (f.tell(), length)
+                        f.write(self._mmap[offset:offset + length])
+                    self._write_tail(f, existing)
+                self._close_map()
+                os.replace(temporary, self.path)
+            else:
+                self._close_map()
+                with open(self.path, "r+b" if data_end else "wb") as f:
+                    # Records stay where they are; new ones overwrite the old index, which is rewritten after them
+                    f.seek(data_end)
+                    self._write_tail(f, existing)
+            self._pending.clear()
+        self._open()
+
+    def _write_tail(self, f, existing: Dict[bytes, Tuple[int, int]]):
+        """Write the pending records, then the index of them and `existing`, then the footer"""
+        for entry_key, record in self._pending.items():
+            existing[entry_key] = (f.tell(), len(record))
+            f.write(record)
+        index_offset = f.tell()
+        for entry_key in sorted(existing):
+            f.write(_ENTRY.pack(entry_key, *existing[entry_key]))
+        f.write(_FOOTER.pack(index_offset, len(existing), _MAGIC))
+        f.truncate()
+
+    def close(self):
+        """Persist new recordings and release the mapping"""
+        if self.mode != "replay":
+            self.save()
+        self._close_map()
+
+    def __len__(self) -> int:
+        with self._lock:
+            replaced = sum(1 for key in self._pending if self._mmap is not None and self._find(key) is not None)
+            return self._count + len(self._pending) - replaced
@@ -0,0 +1,228 @@
+"""Data-driven expectations read from JSONL, CSV or Parquet files in batches, and compared column by column"""
+import csv
+import json
+import os
+from itertools import compress
+from operator import ne
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+def _parquet(path: str):
+    """pyarrow.parquet, imported only when a Parquet case file is read so collection doesn't pay for it"""
+    try:
+        import pyarrow.parquet
+    except ImportError:  # optional, only needed for .parquet case files
+        raise ImportError(f"Reading {path} requires pyarrow") from None
+    return pyarrow.parquet
+
+
+class _Any:
+    """Expected value of a field a case doesn't mention: equal to anything"""
+
+    def __eq__(self, other):
+        return True
+
+    def __ne__(self, other):
+        return False
+
+    def __repr__(self):
+        return "<any>"
+
+
+class _Missing:
+    def __repr__(self):
+        return "<missing>"
+
+
+ANY = _Any()
+MISSING = _Missing()
+
+
+def _csv_cell(value: str) -> Any:
+    """CSV cells are JSON values when they parse as JSON (7.9, null, "419.99"), plain strings otherwise"""
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+def _csv_row(header: List[str], line: bytes, key: str) -> Dict[str, Any]:
+    values = next(csv.reader([line.decode("utf-8")]))
+    row = {}
+    for field, value in zip(header, values):
+        if value != "":
+            row[field] = value if field == key else _csv_cell(value)
+    return row
+
+
+def _case_lines(f) -> Iterator[bytes]:
+    """Non-blank lines of a binary file from its current position"""
+    for line in iter(f.readline, b""):
+        if line.strip():
+            yield line
+
+
+class CaseBatch:
+    """`count` consecutive cases of a case file, located at collection time and read only when the test runs"""
+
+    def __init__(self, path: str, start: int, count: int, key: str = "id", offset: int = 0,
+                 header: Optional[List[str]] = None, row_group: Optional[int] = None):
+        self.path = path
+        self.start = start
+        self.count = count
+        self.key = key
+        self.offset = offset
+        self.header = header
+        self.row_group = row_group
+
+    def __repr__(self) -> str:
+        name = os.path.basename(self.path)
+        if self.count == 1:
+            return f"{name}[{self.start}]"
+        return f"{name}[{self.start}:{self.start + self.count}]"
+
+    def rows(self) -> List[Dict[str, Any]]:
+        if self.row_group is not None:
+            return _parquet(self.path).ParquetFile(self.path).read_row_group(self.row_group).to_pylist()
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            lines = [line for _, line in zip(range(self.count), _case_lines(f))]
+        if self.header is not None:
+            return [_csv_row(self.header, line, self.key) for line in lines]
+        return [json.loads(line) for line in lines]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.rows())
+
+
+def scan_batches(path: str, batch_size: int = 1000, key: str = "id") -> Iterator[CaseBatch]:
+    """Locate the batches of a case file without parsing or keeping any case
+
+    JSONL and CSV batches hold `batch_size` lines each (CSV cells must not contain line breaks);
+    Parquet batches are the file's row groups.
+    """
+    if path.endswith(".parquet"):
+        metadata = _parquet(path).ParquetFile(path).metadata
+        start = 0
+        for index in range(metadata.num_row_groups):
+            count = metadata.row_group(index).num_rows
+            yield CaseBatch(path, start, count, key, row_group=index)
+            start += count
+        return
+
+    with open(path, "rb") as f:
+        header = None
+        if path.endswith(".csv"):
+            header = next(csv.reader([f.readline().decode("utf-8")]))
+        start = count = 0
+        offset = f.tell()
+        while True:
+            position = f.tell()
+            line = f.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            if count == 0:
+                offset = position
+            count += 1
+            if count == batch_size:
+                yield CaseBatch(path, start, count, key, offset, header)
+                start, count = start + count, 0
+        if count:
+            yield CaseBatch(path, start, count, key, offset, header)
+
+
+def iter_cases(path: str, key: str = "id") -> Iterator[Dict[str, Any]]:
+    """Stream every case of a file, one batch in memory at a time"""
+    for batch in scan_batches(path, key=key):
+        yield from batch.rows()
+
+
+def flatten(obj: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+    """Nested dicts as dotted paths: {"data": {"color": "Red"}} -> {"data.color": "Red"}"""
+    flat = {}
+    for name, value in obj.items():
+        path = f"{prefix}{name}"
+        if isinstance(value, dict) and value:
+            flat.update(flatten(value, path + "."))
+        else:
+            flat[path] = value
+    return flat
+
+
+def to_columns(rows: Iterable[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """Transpose rows into one list per dotted field; rows without a field get ANY"""
+    columns: Dict[str, List[Any]] = {}
+    length = 0
+    for row in rows:
+        for field, value in flatten(row).items():
+            column = columns.get(field)
+            if column is None:
+                column = columns[field] = []
+            column.extend([ANY] * (length - len(column)))
+            column.append(value)
+        length += 1
+    for column in columns.values():
+        column.extend([ANY] * (length - len(column)))
+    return columns
+
+
+def pluck(obj: Any, path: List[str]) -> Any:
+    """Value at a split dotted path, or MISSING"""
+    for name in path:
+        if not isinstance(obj, dict) or name not in obj:
+            return MISSING
+        obj = obj[name]
+    return obj
+
+
+class FieldMismatch:
+    """One field of one object that differs from its expectation"""
+
+    def __init__(self, key: Any, field: str, expected: Any, actual: Any):
+        self.key = key
+        self.field = field
+        self.expected = expected
+        self.actual = actual
+
+    def __repr__(self) -> str:
+        return f"{self.key}: {self.field} expected {self.expected!r}, got {self.actual!r}"
+
+
+def _typed_ne(a: Any, b: Any) -> bool:
+    # [True] == [1], so lists are always candidates
+    return type(a) is not type(b) or a != b or type(a) is list
+
+
+def column_differences(expected_rows: Iterable[Dict[str, Any]], actual_rows: List[Any],
+                       key: str = "id", typed: bool = False) -> Iterator[Tuple[int, str, Any, Any]]:
+    """(row index, field, expected, actual) for every field where rows paired by position differ
+
+    Compared one field (column) at a time: plain != runs at C speed over a whole column, so callers only look at
+    the candidates it yields. A row that isn't a dict (e.g. None for a missing object) has every field MISSING.
+    With `typed`, equal values of different types (True and 1, 1 and 1.0) and lists are yielded too, for callers
+    that decide with a comparison of their own.
+    """
+    differ = _typed_ne if typed else ne
+    expected = to_columns(expected_rows)
+    expected.pop(key, None)
+    for field, expected_values in expected.items():
+        parts = field.split(".")
+        actual_values = [pluck(obj, parts) for obj in actual_rows]
+        for i in compress(range(len(actual_values)), map(differ, expected_values, actual_values)):
+            yield i, field, expected_values[i], actual_values[i]
+
+
+def compare_columns(expected_rows: Iterable[Dict[str, Any]], actual_objects: Iterable[Dict[str, Any]],
+                    key: str = "id") -> List[FieldMismatch]:
+    """Compare objects against expectations one field (column) at a time instead of object by object"""
+    expected_rows = list(expected_rows)
+    keys = [row.get(key) for row in expected_rows]
+    by_key = {obj.get(key): obj for obj in actual_objects}
+    actual_rows = [by_key.get(k) for k in keys]
+    mismatches = [FieldMismatch(k, key, k, MISSING) for k, obj in zip(keys, actual_rows) if obj is None]
+    for i, field, expected, actual in column_differences(expected_rows, actual_rows, key):
+        if actual_rows[i] is not None:
+            mismatches.append(FieldMismatch(keys[i], field, expected, actual))
+    return mismatches
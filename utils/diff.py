@@ -0,0 +1,190 @@
+"""Compare a collection of API objects against expectations in one pass and report every difference
+
+    report = diff_objects(expected, api_client.iter_objects("/objects"), rel_tol=1e-6)
+    assert not report, report.summary()
+
+Objects are matched by key, so their order doesn't matter. Expectations may be partial (only the fields they
+mention are checked) and use nested dicts or dotted paths ("data.color"). Actual objects are consumed as a
+stream and compared a chunk at a time, field by field, so memory is bounded by the expectations plus one chunk.
+"""
+import math
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional
+
+from utils.data_cases import MISSING, column_differences, flatten
+
+CHANGED = "changed"  # a field differs from its expectation (actual may be MISSING)
+ADDED = "added"  # strict mode: a field that isn't expected
+MISSING_OBJECT = "missing"  # an expected object isn't in the response
+UNEXPECTED = "unexpected"  # an object in the response isn't expected
+DUPLICATE = "duplicate"  # the same key appears more than once in the expectations or in the response
+
+KINDS = (CHANGED, ADDED, MISSING_OBJECT, UNEXPECTED, DUPLICATE)
+
+
+class Difference:
+    """One difference between the expected and actual collections"""
+
+    def __init__(self, kind: str, key: Any, path: Optional[str] = None, expected: Any = None, actual: Any = None):
+        self.kind = kind
+        self.key = key
+        self.path = path
+        self.expected = expected
+        self.actual = actual
+
+    def __repr__(self) -> str:
+        if self.kind == CHANGED:
+            return f"{self.key}: {self.path} expected {self.expected!r}, got {self.actual!r}"
+        if self.kind == ADDED:
+            return f"{self.key}: unexpected field {self.path} = {self.actual!r}"
+        return f"{self.key}: {self.kind} object"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"kind": self.kind, "key": self.key, "path": self.path,
+                "expected": repr(self.expected) if self.expected is MISSING else self.expected,
+                "actual": repr(self.actual) if self.actual is MISSING else self.actual}
+
+
+class DiffReport:
+    """Counts of every difference found, and the first `max_differences` of them in detail"""
+
+    def __init__(self, max_differences: int = 100):
+        self.max_differences = max_differences
+        self.compared = 0
+        self.counts = dict.fromkeys(KINDS, 0)
+        self.differences: List[Difference] = []
+
+    def add(self, difference: Difference):
+        self.counts[difference.kind] += 1
+        if len(self.differences) < self.max_differences:
+            self.differences.append(difference)
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    @property
+    def truncated(self) -> bool:
+        return self.total > len(self.differences)
+
+    def __bool__(self) -> bool:
+        return self.total > 0
+
+    def summary(self) -> str:
+        counts = ", ".join(f"{count} {kind}" for kind, count in self.counts.items() if count)
+        lines = [f"{self.total} differences in {self.compared} compared objects ({counts or 'none'})"]
+        lines += [f"  {difference!r}" for difference in self.differences]
+        if self.truncated:
+            lines.append(f"  ... and {self.total - len(self.differences)} more")
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"compared": self.compared, "counts": dict(self.counts), "truncated": self.truncated,
+                "differences": [difference.to_dict() for difference in self.differences]}
+
+
+def _number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def equivalent(expected: Any, actual: Any, rel_tol: float = 1e-9, abs_tol: float = 0.0,
+               unordered_lists: bool = False) -> bool:
+    """Equality where floats may differ within tolerance, recursively through lists and dicts; booleans only
+    equal booleans"""
+    if isinstance(expected, bool) or isinstance(actual, bool):
+        return type(expected) is type(actual) and expected == actual
+    if _number(expected) and _number(actual):
+        if isinstance(expected, float) or isinstance(actual, float):
+            return math.isclose(expected, actual, rel_tol=rel_tol, abs_tol=abs_tol)
+        return expected == actual
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        return expected.keys() == actual.keys() and all(
+            equivalent(value, actual[name], rel_tol, abs_tol, unordered_lists) for name, value in expected.items())
+    if isinstance(expected, list) and isinstance(actual, list):
+        if len(expected) != len(actual):
+            return False
+        if not unordered_lists:
+            return all(equivalent(e, a, rel_tol, abs_tol, unordered_lists) for e, a in zip(expected, actual))
+        remaining = list(actual)
+        for e in expected:
+            for i, a in enumerate(remaining):
+                if equivalent(e, a, rel_tol, abs_tol, unordered_lists):
+                    del remaining[i]
+                    break
+            else:
+                return False
+        return True
+    return expected == actual
+
+
+class _Differ:
+    def __init__(self, report: DiffReport, key: str, rel_tol: float, abs_tol: float, ignore: Iterable[str],
+                 strict: bool, unordered_lists: bool):
+        self.report = report
+        self.key = key
+        self.rel_tol = rel_tol
+        self.abs_tol = abs_tol
+        self.ignore = tuple(ignore)
+        self.strict = strict
+        self.unordered_lists = unordered_lists
+
+    def ignored(self, path: str) -> bool:
+        return any(path == name or path.startswith(name + ".") for name in self.ignore)
+
+    def compare(self, keys: List[Any], expected_rows: List[Dict[str, Any]], actual_rows: List[Dict[str, Any]]):
+        """Compare a chunk of matched objects one field (column) at a time"""
+        # Only the candidates a type-aware != finds pay for the tolerant comparison
+        for i, path, expected, actual in column_differences(expected_rows, actual_rows, self.key, typed=True):
+            if not self.ignored(path) and not equivalent(expected, actual, self.rel_tol, self.abs_tol,
+                                                         self.unordered_lists):
+                self.report.add(Difference(CHANGED, keys[i], path, expected, actual))
+        if self.strict:
+            for key, expected, actual in zip(keys, expected_rows, actual_rows):
+                expected_paths = flatten(expected)
+                for path, value in flatten(actual).items():
+                    if path != self.key and path not in expected_paths and not self.ignored(path):
+                        self.report.add(Difference(ADDED, key, path, MISSING, value))
+
+
+def diff_objects(expected: Iterable[Dict[str, Any]], actual: Iterable[Dict[str, Any]], key: str = "id",
+                 rel_tol: float = 1e-9, abs_tol: float = 0.0, ignore: Iterable[str] = (), strict: bool = False,
+                 ignore_unexpected: bool = False, unordered_lists: bool = False, max_differences: int = 100,
+                 chunk_size: int = 1024) -> DiffReport:
+    """Diff actual objects (any iterable, e.g. a stream) against expectations matched by `key`
+
+    `ignore` lists field paths (and their children) to skip, `strict` also reports fields that aren't expected,
+    `ignore_unexpected` allows objects that aren't expected (e.g. checking a few ids of a full listing) and
+    `unordered_lists` compares list values as multisets.
+    """
+    report = DiffReport(max_differences)
+    differ = _Differ(report, key, rel_tol, abs_tol, ignore, strict, unordered_lists)
+    pending = {}
+    for row in expected:
+        if row[key] in pending:
+            report.add(Difference(DUPLICATE, row[key]))
+        else:
+            pending[row[key]] = row
+    seen = set()
+    actual = iter(actual)
+    while True:
+        chunk = list(islice(actual, chunk_size))
+        if not chunk:
+            break
+        keys, expected_rows, actual_rows = [], [], []
+        for obj in chunk:
+            object_key = obj.get(key, MISSING)
+            row = pending.pop(object_key, None)
+            if row is not None:
+                seen.add(object_key)
+                keys.append(object_key)
+                expected_rows.append(row)
+                actual_rows.append(obj)
+            elif object_key in seen:
+                report.add(Difference(DUPLICATE, object_key))
+            elif not ignore_unexpected:
+                report.add(Difference(UNEXPECTED, object_key))
+        report.compared += len(keys)
+        differ.compare(keys, expected_rows, actual_rows)
+    for object_key in pending:
+        report.add(Difference(MISSING_OBJECT, object_key))
+    return report
@@ -0,0 +1,400 @@
+"""Property-based traffic generated from PRODUCT_SCHEMA and sent through APIClient POST/PUT/PATCH
+
+    python -m utils.fuzz --cases 100000 --workers 8 --seed 1
+    python -m utils.fuzz --duration 60 --base-url http://127.0.0.1:8000
+
+Without --base-url an in-process stub is started. Every case is one generated payload sent with one method; the
+response must be 200, match the schema and echo the payload (for PATCH: the target merged with the patch).
+Failing cases are shrunk to a minimal payload that still fails and written to --failures.
+"""
+import argparse
+import copy
+import itertools
+import json
+import random
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from utils.diff import equivalent
+from utils.metrics import LatencyHistogram
+from utils.models import PRODUCT_SCHEMA
+from utils.schema_validation import validate
+
+METHODS = ("POST", "PUT", "PATCH")
+
+BOUNDARY_VALUES = {
+    "string": ("", " ", "a" * 1024, "ünïcødé ✓", "line\nbreak", '"quoted"', "0", "null"),
+    "integer": (0, -1, 1, 2 ** 31 - 1, -2 ** 31, 2 ** 53, -2 ** 53),
+    "number": (0.0, -1.5, 0.1, 1e-9, 1e15, 1849.99),
+    "boolean": (True, False),
+    "null": (None,),
+}
+
+_ALPHABET = "abcdefghijklmnopqrstuvwxyz ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_"
+
+
+class PayloadGenerator:
+    """Random payloads that satisfy a JSON schema, with `boundary_ratio` of values taken from BOUNDARY_VALUES
+
+    Server-assigned fields (`id`) are left out. Objects get a random subset of their optional properties and,
+    where additionalProperties allows, an occasional extra one.
+    """
+
+    def __init__(self, schema: Dict[str, Any] = PRODUCT_SCHEMA, seed: Optional[int] = None,
+                 boundary_ratio: float = 0.3, server_fields=("id",)):
+        self.schema = schema
+        self.rng = random.Random(seed)
+        self.boundary_ratio = boundary_ratio
+        self.server_fields = frozenset(server_fields)
+
+    def payload(self) -> Dict[str, Any]:
+        return self._object(self.schema, top=True)
+
+    def patch(self) -> Dict[str, Any]:
+        """A partial payload: a non-empty subset of the top-level fields"""
+        payload = self.payload()
+        names = sorted(payload)
+        keep = self.rng.sample(names, self.rng.randint(1, len(names)))
+        return {name: payload[name] for name in keep}
+
+    def value(self, schema: Dict[str, Any]) -> Any:
+        types = schema.get("type", "string")
+        kind = self.rng.choice(types) if isinstance(types, list) else types
+        if kind == "object":
+            return self._object(schema)
+        if kind == "array":
+            return [self.value(schema.get("items", {})) for _ in range(self.rng.randint(0, 3))]
+        if self.rng.random() < self.boundary_ratio:
+            return self.rng.choice(BOUNDARY_VALUES[kind])
+        if kind == "string":
+            return "".join(self.rng.choices(_ALPHABET, k=self.rng.randint(1, 40)))
+        if kind == "integer":
+            return self.rng.randint(-10 ** 6, 10 ** 6)
+        if kind == "number":
+            return round(self.rng.uniform(-10 ** 4, 10 ** 4), self.rng.randint(0, 4))
+        if kind == "boolean":
+            return self.rng.random() < 0.5
+        return None
+
+    def _object(self, schema: Dict[str, Any], top: bool = False) -> Dict[str, Any]:
+        required = set(schema.get("required", ()))
+        obj = {}
+        for name, subschema in schema.get("properties", {}).items():
+            if top and name in self.server_fields:
+                continue
+            if name in required or self.rng.random() < 0.5:
+                obj[name] = self.value(subschema)
+        if schema.get("additionalProperties", True) is not False and not top and self.rng.random() < 0.2:
+            obj["extra " + "".join(self.rng.choices(_ALPHABET, k=6))] = self.value({"type": "string"})
+        return obj
+
+
+def _smaller(value: Any) -> Iterator[Any]:
+    """Candidate replacements for a value, simplest first"""
+    if isinstance(value, dict):
+        for name in value:
+            yield {k: v for k, v in value.items() if k != name}
+        for name, item in value.items():
+            for smaller in _smaller(item):
+                yield dict(value, **{name: smaller})
+    elif isinstance(value, list):
+        for i in range(len(value)):
+            yield value[:i] + value[i + 1:]
+    elif isinstance(value, str):
+        if value:
+            yield ""
+            yield value[:len(value) // 2]
+    elif isinstance(value, bool) or value is None:
+        return
+    elif isinstance(value, (int, float)):
+        if value != 0:
+            yield type(value)(0)
+            half = value / 2 if isinstance(value, float) else int(value / 2)
+            if half != value:
+                yield half
+
+
+def shrink(payload: Dict[str, Any], still_fails: Callable[[Dict[str, Any]], bool],
+           max_attempts: int = 200) -> Dict[str, Any]:
+    """Greedily simplify a failing payload (drop fields, shorten strings, move numbers toward 0) while it fails
+
+    Top-level fields are kept so the payload stays a valid request; `data` may become null.
+    """
+    current = payload
+    attempts = 0
+    improved = True
+    while improved and attempts < max_attempts:
+        improved = False
+        for name, value in current.items():
+            candidates = list(_smaller(value))
+            if isinstance(value, dict):
+                candidates.insert(0, None)
+            for candidate in candidates:
+                attempts += 1
+                trial = dict(current, **{name: candidate})
+                if still_fails(trial):
+                    current = trial
+                    improved = True
+                    break
+                if attempts >= max_attempts:
+                    break
+            if improved or attempts >= max_attempts:
+                break
+    return current
+
+
+class FuzzFailure:
+    """A case whose response broke a property, with the shrunk payload that still breaks it"""
+
+    def __init__(self, method: str, payload: Dict[str, Any], message: str):
+        self.method = method
+        self.payload = payload
+        self.message = message
+        self.shrunk: Optional[Dict[str, Any]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"method": self.method, "message": self.message, "payload": self.payload, "shrunk": self.shrunk}
+
+
+class FuzzStats:
+    """Counts, throughput and per-case cost (generate + send + check) of a run; deleting what a POST created is
+    timed apart as `cleanup`"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.cases: Dict[str, int] = dict.fromkeys(METHODS, 0)
+        self.cost = {method: LatencyHistogram() for method in METHODS}
+        self.generate = LatencyHistogram()
+        self.cleanup = LatencyHistogram()
+        self.failures: List[FuzzFailure] = []
+        self.failed = 0
+        self.elapsed = 0.0
+        self._reserved = 0  # places in `failures` already claimed
+
+    @property
+    def total(self) -> int:
+        return sum(self.cases.values())
+
+    @property
+    def throughput(self) -> float:
+        return self.total / self.elapsed if self.elapsed else 0.0
+
+    def record(self, method: str, generate: float, cost: float, cleanup: Optional[float],
+               failure: Optional[FuzzFailure], kept: bool = False):
+        with self._lock:
+            self.cases[method] += 1
+            self.generate.record(generate)
+            self.cost[method].record(cost)
+            if cleanup is not None:
+                self.cleanup.record(cleanup)
+            if failure is not None:
+                self._add_failure(failure, kept)
+
+    def reserve_failure(self, keep: int) -> bool:
+        """Claim one of the first `keep` places in `failures`, so only a failure that will be kept gets shrunk"""
+        with self._lock:
+            return self._reserve(keep)
+
+    def record_failure(self, failure: FuzzFailure, keep: int):
+        """Count a failure outside any case, e.g. a worker that couldn't set up"""
+        with self._lock:
+            self._add_failure(failure, self._reserve(keep))
+
+    def _reserve(self, keep: int) -> bool:
+        if self._reserved >= keep:
+            return False
+        self._reserved += 1
+        return True
+
+    def _add_failure(self, failure: FuzzFailure, kept: bool):
+        self.failed += 1
+        if kept:
+            self.failures.append(failure)
+
+    def summary(self) -> Dict[str, Any]:
+        return {"cases": self.total, "failed": self.failed, "elapsed_s": self.elapsed,
+                "cases_per_s": self.throughput, "generate": self.generate.summary(),
+                "cleanup": self.cleanup.summary(),
+                "cost": {method: h.summary() for method, h in self.cost.items() if h.count}}
+
+
+class FuzzRunner:
+    """Sends generated cases through an APIClient from `workers` threads and checks every response
+
+    Each worker owns one target object for PUT/PATCH (created first, deleted at the end) and deletes what its
+    POSTs create, so the server's object count stays flat however many cases run. `check(method, sent, body)`
+    may add a property of its own, returning an error message or None.
+    """
+
+    def __init__(self, client, workers: int = 8, seed: int = 0, methods=METHODS, schema=PRODUCT_SCHEMA,
+                 keep_failures: int = 10, shrink_attempts: int = 200,
+                 check: Optional[Callable[[str, Dict[str, Any], Any], Optional[str]]] = None):
+        self.client = client
+        self.workers = workers
+        self.seed = seed
+        self.methods = tuple(methods)
+        self.schema = schema
+        self.keep_failures = keep_failures
+        self.shrink_attempts = shrink_attempts
+        self.extra_check = check
+        self.stats = FuzzStats()
+
+    def run(self, cases: Optional[int] = None, duration: Optional[float] = None) -> FuzzStats:
+        if cases is None and duration is None:
+            raise ValueError("Pass a number of cases, a duration or both")
+        budget = itertools.count()
+        deadline = time.perf_counter() + duration if duration else None
+        lock = threading.Lock()
+
+        def take() -> bool:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return False
+            if cases is not None:
+                with lock:
+                    return next(budget) < cases
+            return True
+
+        threads = [threading.Thread(target=self._worker, args=(index, take), daemon=True)
+                   for index in range(self.workers)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.stats.elapsed = time.perf_counter() - start
+        return self.stats
+
+    def _worker(self, index: int, take: Callable[[], bool]):
+        generator = PayloadGenerator(self.schema, seed=self.seed * 1000003 + index)
+        rng = random.Random(self.seed * 1000003 + index)
+        payload = generator.payload()
+        try:
+            target = _Target(self.client, payload)
+        except Exception as e:
+            # Without a target this worker can't run any case; the run must still end as failed
+            message = f"creating the PUT/PATCH target raised {type(e).__name__}: {e}"
+            self.stats.record_failure(FuzzFailure("POST", payload, message), self.keep_failures)
+            return
+        try:
+            while take():
+                method = rng.choice(self.methods)
+                start = time.perf_counter()
+                payload = generator.patch() if method == "PATCH" else generator.payload()
+                generated = time.perf_counter()
+                message, cleanup = self._case(method, payload, target)
+                cost = time.perf_counter() - start - (cleanup or 0.0)
+                failure, kept = None, False
+                if message is not None:
+                    failure = FuzzFailure(method, payload, message)
+                    kept = self.stats.reserve_failure(self.keep_failures)
+                    if kept:
+                        failure.shrunk = shrink(payload, lambda p: self._case(method, p, target)[0] is not None,
+                                                self.shrink_attempts)
+                self.stats.record(method, generated - start, cost, cleanup, failure, kept)
+        finally:
+            target.delete()
+
+    def _case(self, method: str, payload: Dict[str, Any], target: "_Target") -> Tuple[Optional[str], Optional[float]]:
+        """Send one case; return what's wrong with the response (or None) and how long deleting a POSTed object took"""
+        cleanup = None
+        try:
+            if method == "POST":
+                response = self.client.post("/objects", json=payload)
+                expected = payload
+            else:
+                expected = dict(target.state, **payload) if method == "PATCH" else payload
+                response = self.client.request(method, f"/objects/{target.id}", json=payload)
+            if response.status_code != 200:
+                return f"{method} returned {response.status_code}", cleanup
+            body = response.json()
+            if isinstance(body, dict):
+                if method == "POST" and "id" in body:
+                    started = time.perf_counter()
+                    self.client.delete(f"/objects/{body['id']}")
+                    cleanup = time.perf_counter() - started
+                elif method != "POST":
+                    # Whatever the server answered is now the target's state, right or wrong
+                    target.state = {"name": body.get("name"), "data": body.get("data")}
+            message = _check_echo(method, expected, body, self.schema)
+            if message is None and self.extra_check is not None:
+                message = self.extra_check(method, payload, body)
+            return message, cleanup
+        except Exception as e:
+            return f"{method} raised {type(e).__name__}: {e}", cleanup
+
+
+def _check_echo(method: str, expected: Dict[str, Any], body: Any, schema: Dict[str, Any]) -> Optional[str]:
+    try:
+        validate(body, schema)
+    except Exception as e:
+        return f"{method} response doesn't match the schema: {str(e).splitlines()[0]}"
+    for name in ("name", "data"):
+        if name in expected and not equivalent(expected[name], body.get(name)):
+            return f"{method} response {name} is {body.get(name)!r}, sent {expected[name]!r}"
+    return None
+
+
+class _Target:
+    """The object a worker's PUT and PATCH cases change, and its last known state"""
+
+    def __init__(self, client, payload: Dict[str, Any]):
+        self.client = client
+        response = client.post("/objects", json=payload)
+        response.raise_for_status()
+        body = response.json()
+        self.id = body["id"]
+        self.state = {"name": body.get("name"), "data": copy.deepcopy(body.get("data"))}
+
+    def delete(self):
+        self.client.delete(f"/objects/{self.id}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=None, help="Number of cases to run (default 10000)")
+    parser.add_argument("--duration", type=float, default=None, help="Stop after this many seconds")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent workers")
+    parser.add_argument("--seed", type=int, default=0, help="Seed making the generated cases reproducible")
+    parser.add_argument("--methods", default=",".join(METHODS), help="Comma-separated methods to fuzz")
+    parser.add_argument("--base-url", help="API to fuzz (default: an in-process stub)")
+    parser.add_argument("--failures", default="fuzz_failures.json", help="Where to write failing cases")
+    args = parser.parse_args(argv)
+    if args.cases is None and args.duration is None:
+        args.cases = 10000
+
+    from utils.api_client import APIClient
+    from utils.retry import RetryPolicy
+    server = None
+    if args.base_url is None:
+        from utils.stub_server import StubServer
+        server = StubServer().start()
+    client = APIClient(args.base_url or server.url, retry_policy=RetryPolicy(max_retries=0))
+    try:
+        runner = FuzzRunner(client, workers=args.workers, seed=args.seed,
+                            methods=[m.strip().upper() for m in args.methods.split(",")])
+        stats = runner.run(args.cases, args.duration)
+    finally:
+        client.close()
+        if server is not None:
+            server.stop()
+
+    summary = stats.summary()
+    print(f"{stats.total} cases in {stats.elapsed:.1f}s ({stats.throughput:.0f} cases/s), {stats.failed} failed")
+    print(f"generate: p50 {summary['generate'].get('p50_ms', 0):.3f}ms")
+    for method, cost in summary["cost"].items():
+        print(f"{method:<6} {cost['count']:>8} cases  cost p50 {cost['p50_ms']:.2f}ms  p99 {cost['p99_ms']:.2f}ms")
+    if stats.cleanup.count:
+        print(f"cleanup DELETE p50 {summary['cleanup']['p50_ms']:.2f}ms (not part of the POST cost)")
+    if stats.failures:
+        with open(args.failures, "w") as f:
+            json.dump({"summary": summary, "failures": [failure.to_dict() for failure in stats.failures]},
+                      f, indent=2, default=str)
+        for failure in stats.failures:
+            print(f"FAILED {failure.method}: {failure.message}\n  shrunk: {json.dumps(failure.shrunk)}")
+    if stats.failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
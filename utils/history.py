@@ -0,0 +1,181 @@
+import math
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS test_durations (
+    nodeid TEXT PRIMARY KEY,
+    duration REAL NOT NULL,
+    methods TEXT NOT NULL DEFAULT '',
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS test_runs (
+    run_id INTEGER NOT NULL,
+    nodeid TEXT NOT NULL,
+    duration REAL NOT NULL,
+    outcome TEXT NOT NULL,
+    PRIMARY KEY (nodeid, run_id)
+);
+CREATE TABLE IF NOT EXISTS endpoint_runs (
+    run_id INTEGER NOT NULL,
+    endpoint TEXT NOT NULL,
+    requests INTEGER NOT NULL,
+    p50 REAL NOT NULL,
+    p99 REAL NOT NULL,
+    PRIMARY KEY (endpoint, run_id)
+);
+"""
+
+# Weight of the latest run in the smoothed duration, so one slow run doesn't reorder the whole schedule
+_SMOOTHING = 0.5
+
+# Slowdowns smaller than this (seconds) are noise, whatever the relative change
+_MIN_REGRESSION = 0.005
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q / 100 * len(ordered)) - 1, 0)]
+
+
+class Regression:
+    """A test or endpoint slower in this run than the given percentile of its recent runs allows"""
+
+    def __init__(self, name: str, value: float, baseline: float, runs: int):
+        self.name = name
+        self.value = value
+        self.baseline = baseline
+        self.runs = runs
+
+    @property
+    def ratio(self) -> float:
+        return self.value / self.baseline if self.baseline else math.inf
+
+
+def find_regressions(current: Dict[str, float], baselines: Dict[str, List[float]], q: float = 95.0,
+                     tolerance: float = 0.2, min_runs: int = 5) -> List[Regression]:
+    """Flag values above (1 + tolerance) x the q-th percentile of their baseline, worst first"""
+    regressions = []
+    for name, value in current.items():
+        baseline = baselines.get(name, [])
+        if len(baseline) < min_runs:
+            continue
+        threshold = percentile(baseline, q)
+        if value > threshold * (1 + tolerance) and value - threshold > _MIN_REGRESSION:
+            regressions.append(Regression(name, value, threshold, len(baseline)))
+    return sorted(regressions, key=lambda r: r.ratio, reverse=True)
+
+
+class RunHistory:
+    """Per-test and per-endpoint durations remembered across runs in a small sqlite database
+
+    The last `keep_runs` runs are kept in full as rolling baselines; older ones only live on in the
+    smoothed per-test duration used for scheduling.
+    """
+
+    def __init__(self, path: str, keep_runs: int = 20):
+        self.path = path
+        self.keep_runs = keep_runs
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(_SCHEMA)
+        self._run_id: Optional[int] = None
+
+    @property
+    def run_id(self) -> int:
+        """Id of the current run, created on first write"""
+        if self._run_id is None:
+            with self._conn:
+                self._run_id = self._conn.execute("INSERT INTO runs (started) VALUES (?)", (time.time(),)).lastrowid
+        return self._run_id
+
+    def durations(self) -> Dict[str, float]:
+        return dict(self._conn.execute("SELECT nodeid, duration FROM test_durations"))
+
+    def methods(self) -> Dict[str, List[str]]:
+        """HTTP methods each test sent through APIClient on its last run"""
+        rows = self._conn.execute("SELECT nodeid, methods FROM test_durations")
+        return {nodeid: methods.split(",") if methods else [] for nodeid, methods in rows}
+
+    def last_runs(self) -> Dict[str, Tuple[str, float]]:
+        """Outcome and start time of the most recent earlier run of each test"""
+        rows = self._conn.execute(
+            """
+            SELECT t.nodeid, t.outcome, r.started FROM test_runs t JOIN runs r ON r.id = t.run_id
+            WHERE t.run_id = (SELECT MAX(run_id) FROM test_runs WHERE nodeid = t.nodeid AND run_id != ?)
+            """,
+            (self._run_id or -1,),
+        )
+        return {nodeid: (outcome, started) for nodeid, outcome, started in rows}
+
+    def record(self, results: Iterable[Tuple[str, float, Iterable[str], str]]):
+        """Store (nodeid, duration, methods, outcome) of finished tests in one transaction"""
+        results = list(results)
+        now = time.time()
+        run_id = self.run_id
+        with self._conn:
+            self._conn.executemany(
+                """
+                INSERT INTO test_durations (nodeid, duration, methods, updated) VALUES (?, ?, ?, ?)
+                ON CONFLICT(nodeid) DO UPDATE SET
+                    duration = duration * (1 - ?) + excluded.duration * ?,
+                    methods = excluded.methods,
+                    updated = excluded.updated
+                """,
+                [(nodeid, duration, ",".join(sorted(methods)), now, _SMOOTHING, _SMOOTHING)
+                 for nodeid, duration, methods, _ in results],
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO test_runs (run_id, nodeid, duration, outcome) VALUES (?, ?, ?, ?)",
+                [(run_id, nodeid, duration, outcome) for nodeid, duration, _, outcome in results],
+            )
+            self._prune()
+
+    def record_endpoints(self, rows: Iterable[Tuple[str, int, float, float]]):
+        """Store (endpoint, requests, p50, p99) of this run, latencies in seconds"""
+        run_id = self.run_id
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO endpoint_runs (run_id, endpoint, requests, p50, p99) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, *row) for row in rows],
+            )
+            self._prune()
+
+    def _prune(self):
+        oldest = self.run_id - self.keep_runs
+        self._conn.execute("DELETE FROM test_runs WHERE run_id <= ?", (oldest,))
+        self._conn.execute("DELETE FROM endpoint_runs WHERE run_id <= ?", (oldest,))
+        self._conn.execute("DELETE FROM runs WHERE id <= ?", (oldest,))
+
+    def _current_and_baselines(self, query: str) -> Tuple[Dict[str, float], Dict[str, List[float]]]:
+        current: Dict[str, float] = {}
+        baselines: Dict[str, List[float]] = {}
+        for run_id, name, value in self._conn.execute(query):
+            if run_id == self._run_id:
+                current[name] = value
+            else:
+                baselines.setdefault(name, []).append(value)
+        return current, baselines
+
+    def test_regressions(self, q: float = 95.0, tolerance: float = 0.2, min_runs: int = 5) -> List[Regression]:
+        """Tests of this run slower than their baseline of earlier passing runs"""
+        if self._run_id is None:
+            return []
+        current, baselines = self._current_and_baselines(
+            "SELECT run_id, nodeid, duration FROM test_runs WHERE outcome = 'passed'")
+        return find_regressions(current, baselines, q, tolerance, min_runs)
+
+    def endpoint_regressions(self, q: float = 95.0, tolerance: float = 0.2, min_runs: int = 5) -> List[Regression]:
+        """Endpoints whose median latency in this run is above their baseline"""
+        if self._run_id is None:
+            return []
+        current, baselines = self._current_and_baselines("SELECT run_id, endpoint, p50 FROM endpoint_runs")
+        return find_regressions(current, baselines, q, tolerance, min_runs)
+
+    def close(self):
+        self._conn.close()
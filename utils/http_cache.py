@@ -0,0 +1,213 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+from utils.payload import decoded_headers
+
+# Methods whose request changes the resource, so cached copies of it (and of its collection) are dropped
+UNSAFE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+
+class CacheStats:
+    """Hit/miss counters of a ResponseCache"""
+
+    FIELDS = ("hits", "revalidated", "misses", "stored", "evicted", "invalidated")
+
+    def __init__(self, **counts: int):
+        for name in self.FIELDS:
+            setattr(self, name, counts.get(name, 0))
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.revalidated + self.misses
+
+    @property
+    def hit_ratio(self) -> float:
+        """Share of lookups answered without transferring the body again"""
+        return (self.hits + self.revalidated) / self.lookups if self.lookups else 0.0
+
+    def merge(self, other: "CacheStats"):
+        """Add another set of counters (e.g. from an xdist worker) to this one"""
+        for name in self.FIELDS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def as_dict(self) -> Dict[str, int]:
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+
+class CacheEntry:
+    """A cached GET response with its expiry and validators"""
+
+    __slots__ = ("url", "key", "path", "status", "reason", "headers", "body", "expires", "etag", "last_modified", "size")
+
+    def __init__(self, url: str, status: int, reason: str, headers: List[Tuple[str, str]], body: bytes,
+                 expires: float, key: Optional[str] = None):
+        self.url = url
+        self.key = key or url
+        self.path = urlsplit(url).path.rstrip("/")
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+        self.expires = expires
+        lowered = {name.lower(): value for name, value in headers}
+        self.etag = lowered.get("etag")
+        self.last_modified = lowered.get("last-modified")
+        self.size = len(body) + sum(len(name) + len(value) for name, value in headers) + len(url)
+
+    @property
+    def recording(self) -> Tuple[int, str, List[Tuple[str, str]], bytes]:
+        return self.status, self.reason, self.headers, self.body
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers asking the server to answer 304 if the cached copy is still current"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def _cache_control(headers) -> Dict[str, Optional[str]]:
+    directives = {}
+    for part in (headers.get("Cache-Control") or "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"') or None
+    return directives
+
+
+def _vary(headers) -> Optional[Tuple[str, ...]]:
+    """Request header names a response varies on, or None for `Vary: *` (it can never be reused)"""
+    names = sorted({name.strip().lower() for name in (headers.get("Vary") or "").split(",") if name.strip()})
+    return None if "*" in names else tuple(names)
+
+
+class ResponseCache:
+    """Session-wide LRU cache of GET responses, bounded by total size in bytes
+
+    Entries are fresh for `ttl` seconds (or the response's Cache-Control max-age); stale entries with an ETag or
+    Last-Modified are revalidated with a conditional request. A POST/PUT/PATCH/DELETE through the same client
+    drops the cached copies of its URL and of the collection it belongs to (e.g. /objects/3 and /objects?id=...).
+    Responses with a Vary header are cached per value of the request headers it names (e.g. Accept-Encoding).
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl: float = 60.0, clock=time.monotonic):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self.stats = CacheStats()
+        self.size = 0
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._by_path: Dict[str, Set[str]] = {}
+        # url -> request header names its last stored response varied on
+        self._vary: Dict[str, Tuple[str, ...]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, url: str, request_headers=None) -> Tuple[Optional[CacheEntry], bool]:
+        """(entry, fresh) for a GET of `url` with `request_headers`; a stale entry is returned so it can be
+        revalidated"""
+        with self._lock:
+            key = self._key(url, self._vary.get(url, ()), request_headers)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None, False
+            self._entries.move_to_end(key)
+            if entry.expires > self.clock():
+                self.stats.hits += 1
+                return entry, True
+            if not (entry.etag or entry.last_modified):
+                self._remove(entry)
+                self.stats.misses += 1
+                return None, False
+            return entry, False
+
+    def revalidated(self, entry: CacheEntry, headers) -> CacheEntry:
+        """Extend a stale entry after the server answered 304 Not Modified"""
+        with self._lock:
+            self.stats.revalidated += 1
+            entry.expires = self.clock() + self._ttl(_cache_control(headers))
+            return entry
+
+    def not_revalidated(self):
+        """Count a stale entry whose conditional request returned a new body"""
+        with self._lock:
+            self.stats.misses += 1
+
+    def store(self, url: str, status: int, reason: str, headers, body: bytes,
+              request_headers=None) -> Optional[CacheEntry]:
+        """Cache a successful GET response unless it forbids storing or is larger than the whole cache"""
+        directives = _cache_control(headers)
+        vary = _vary(headers)
+        if status != 200 or "no-store" in directives or vary is None:
+            return None
+        entry = CacheEntry(url, status, reason, decoded_headers(headers.items()), body,
+                           self.clock() + self._ttl(directives), key=self._key(url, vary, request_headers))
+        if entry.size > self.max_bytes:
+            return None
+        with self._lock:
+            if self._vary.get(url, vary) != vary:
+                # Variants keyed on the old header names could never be looked up again
+                for key in list(self._by_path.get(entry.path, ())):
+                    if self._entries[key].url == url:
+                        self._remove(self._entries[key])
+            old = self._entries.get(entry.key)
+            if old is not None:
+                self._remove(old)
+            self._entries[entry.key] = entry
+            self._by_path.setdefault(entry.path, set()).add(entry.key)
+            self._vary[url] = vary
+            self.size += entry.size
+            self.stats.stored += 1
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self._entries.values())))
+                self.stats.evicted += 1
+        return entry
+
+    def invalidate(self, url: str):
+        """Drop cached copies of a resource and of the collection containing it"""
+        path = urlsplit(url).path.rstrip("/")
+        with self._lock:
+            for affected in {path, path.rsplit("/", 1)[0]}:
+                for key in list(self._by_path.get(affected, ())):
+                    self._remove(self._entries[key])
+                    self.stats.invalidated += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_path.clear()
+            self._vary.clear()
+            self.size = 0
+
+    def _ttl(self, directives: Dict[str, Optional[str]]) -> float:
+        if "no-cache" in directives:
+            return 0.0
+        try:
+            return float(directives["max-age"])
+        except (KeyError, TypeError, ValueError):
+            return self.ttl
+
+    @staticmethod
+    def _key(url: str, vary: Tuple[str, ...], request_headers) -> str:
+        if not vary:
+            return url
+        request_headers = request_headers or {}
+        return url + "".join(f"\n{name}: {request_headers.get(name, '')}" for name in vary)
+
+    def _remove(self, entry: CacheEntry):
+        del self._entries[entry.key]
+        keys = self._by_path[entry.path]
+        keys.discard(entry.key)
+        if not keys:
+            del self._by_path[entry.path]
+        if not any(self._entries[key].url == entry.url for key in keys):
+            self._vary.pop(entry.url, None)
+        self.size -= entry.size
+
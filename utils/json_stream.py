@@ -0,0 +1,73 @@
+import codecs
+import json
+from typing import Any, Iterable, Iterator
+
+_WHITESPACE = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+
+def iter_json_array(chunks: Iterable[bytes], encoding: str = "utf-8") -> Iterator[Any]:
+    """Incrementally decode a top-level JSON array from byte chunks, yielding one item at a time
+
+    Only the item being decoded (plus one chunk) is held in memory, never the whole document.
+    """
+    text_decoder = codecs.getincrementaldecoder(encoding)(errors="strict")
+    chunks = iter(chunks)
+    buffer = ""
+    pos = 0
+    exhausted = False
+
+    def fill() -> bool:
+        nonlocal buffer, pos, exhausted
+        if exhausted:
+            return False
+        chunk = next(chunks, None)
+        if chunk is None:
+            exhausted = True
+            buffer = buffer[pos:] + text_decoder.decode(b"", final=True)
+        else:
+            buffer = buffer[pos:] + text_decoder.decode(chunk)
+        pos = 0
+        return True
+
+    def skip_whitespace() -> bool:
+        """Advance to the next significant character, reading more input as needed"""
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buffer):
+                return True
+            if not fill():
+                return False
+
+    if not skip_whitespace() or buffer[pos] != "[":
+        raise ValueError("Response body is not a JSON array")
+    pos += 1
+    if not skip_whitespace():
+        raise ValueError("Unterminated JSON array")
+    if buffer[pos] == "]":
+        return
+
+    while True:
+        try:
+            item, end = _decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if not fill():
+                raise
+            continue
+        # A scalar ending exactly at the buffer edge (e.g. a number) may continue in the next chunk
+        if end == len(buffer) and not exhausted:
+            fill()
+            continue
+        pos = end
+        yield item
+
+        if not skip_whitespace():
+            raise ValueError("Unterminated JSON array")
+        if buffer[pos] == "]":
+            return
+        if buffer[pos] != ",":
+            raise ValueError(f"Expected ',' or ']' in JSON array, got {buffer[pos]!r}")
+        pos += 1
+        skip_whitespace()
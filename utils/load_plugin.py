@@ -0,0 +1,169 @@
+"""pytest plugin replaying collected tests as load scenarios (`pytest --load`)"""
+import contextlib
+import inspect
+import itertools
+import os
+import threading
+import time
+import pytest
+from typing import List, Optional
+from utils.metrics import LatencyRecorder
+
+load_report_key = pytest.StashKey["LoadReport"]()
+
+# Pytest outcomes (fail/skip) derive from BaseException, so catch them alongside ordinary errors
+_TEST_ERRORS = (Exception, pytest.fail.Exception, pytest.skip.Exception)
+
+
+class ScenarioResult:
+    """Outcome of replaying one test repeatedly"""
+
+    def __init__(self, nodeid: str):
+        self.nodeid = nodeid
+        self.iterations = 0
+        self.failures = 0
+        self.elapsed = 0.0
+        self.first_error: Optional[str] = None
+        self.skipped_reason: Optional[str] = None
+
+    def add(self, error: Optional[BaseException]):
+        self.iterations += 1
+        if error is not None:
+            self.failures += 1
+            if self.first_error is None:
+                self.first_error = f"{type(error).__name__}: {error}".splitlines()[0]
+
+
+class LoadReport:
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.scenarios: List[ScenarioResult] = []
+        self.recorder = LatencyRecorder()
+        self.elapsed = 0.0
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("load", "load/throughput mode")
+    group.addoption("--load", action="store_true", default=False,
+                    help="Replay each selected test repeatedly as a load scenario instead of running it once")
+    group.addoption("--load-workers", type=int, default=10,
+                    help="Number of concurrent workers per scenario (default 10)")
+    group.addoption("--load-duration", type=float, default=None,
+                    help="Seconds to run each scenario for; overrides --load-iterations")
+    group.addoption("--load-iterations", type=int, default=100,
+                    help="Total iterations per scenario, shared by all workers (default 100)")
+
+
+def pytest_configure(config):
+    if config.getoption("load") and config.getoption("numprocesses", None):
+        raise pytest.UsageError("--load runs every scenario in this process; drop -n/--numprocesses "
+                                "(use utils.load_runner to spread load over processes)")
+
+
+def _run_scenario(item, workers: int, duration: Optional[float], iterations: int, result: ScenarioResult):
+    deadline = time.perf_counter() + duration if duration else None
+    budget = itertools.count()
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            if deadline is not None:
+                if time.perf_counter() >= deadline:
+                    return
+            elif next(budget) >= iterations:
+                return
+            error = None
+            try:
+                item.runtest()
+            except _TEST_ERRORS as e:
+                error = e
+            with lock:
+                result.add(error)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    result.elapsed = time.perf_counter() - start
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtestloop(session):
+    config = session.config
+    if not config.getoption("load") or config.option.collectonly:
+        return None
+
+    report = LoadReport(config.getoption("load_workers"))
+    config.stash[load_report_key] = report
+    duration = config.getoption("load_duration")
+    iterations = config.getoption("load_iterations")
+    session_start = time.perf_counter()
+
+    for i, item in enumerate(session.items):
+        nextitem = session.items[i + 1] if i + 1 < len(session.items) else None
+        result = ScenarioResult(item.nodeid)
+        report.scenarios.append(result)
+        if inspect.iscoroutinefunction(getattr(item, "obj", None)):
+            result.skipped_reason = "async tests are not replayed"
+            continue
+        # Workers share the item, its test instance and its fixtures: concurrent iterations of a test that
+        # creates, changes or deletes objects would race on the same fixture-created object
+        if item.get_closest_marker("mutating"):
+            result.skipped_reason = "mutating tests are not replayed (workers would share one fixture object)"
+            continue
+
+        client = None
+        setup_failed = False
+        try:
+            item.ihook.pytest_runtest_setup(item=item)
+            client = getattr(item.instance, "api_client", None)
+            if client is not None:
+                client.add_listener(report.recorder.record)
+            # Keep anything tests print out of the terminal while they run thousands of times
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                _run_scenario(item, report.workers, duration, iterations, result)
+        except _TEST_ERRORS as e:
+            result.skipped_reason = f"setup failed: {type(e).__name__}: {e}".splitlines()[0]
+            setup_failed = True
+        finally:
+            if client is not None:
+                client.remove_listener(report.recorder.record)
+            item.ihook.pytest_runtest_teardown(item=item, nextitem=nextitem)
+        # A scenario with any failed iteration fails the run, so CI notices a broken load test
+        session.testsfailed += bool(result.failures or setup_failed)
+        if session.shouldstop:
+            break
+
+    report.elapsed = time.perf_counter() - session_start
+    return True
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    report = config.stash.get(load_report_key, None)
+    if report is None:
+        return
+    tr = terminalreporter
+    tr.write_sep("=", f"load results ({report.workers} workers, {report.elapsed:.1f}s)")
+
+    tr.write_line(f"{'scenario':<90} {'iters':>7} {'it/s':>8} {'fail%':>6}")
+    for scenario in report.scenarios:
+        if scenario.skipped_reason:
+            tr.write_line(f"{scenario.nodeid:<90} skipped: {scenario.skipped_reason}")
+            continue
+        rate = scenario.iterations / scenario.elapsed if scenario.elapsed else 0.0
+        fail_pct = 100.0 * scenario.failures / scenario.iterations if scenario.iterations else 0.0
+        tr.write_line(f"{scenario.nodeid:<90} {scenario.iterations:>7} {rate:>8.1f} {fail_pct:>6.1f}")
+        if scenario.first_error:
+            tr.write_line(f"    first failure: {scenario.first_error}")
+
+    tr.write_line("")
+    tr.write_line(f"{'endpoint':<30} {'requests':>9} {'req/s':>8} {'err%':>6} "
+                  f"{'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'p999 ms':>8}")
+    for (method, endpoint), stats in sorted(report.recorder.endpoints.items()):
+        rate = stats.count / report.elapsed if report.elapsed else 0.0
+        err_pct = 100.0 * stats.errors / stats.count if stats.count else 0.0
+        p50, p90, p99, p999 = (stats.phases["total"].percentile(q) * 1000 for q in (50, 90, 99, 99.9))
+        tr.write_line(f"{method + ' ' + endpoint:<30} {stats.count:>9} {rate:>8.1f} {err_pct:>6.1f} "
+                      f"{p50:>8.2f} {p90:>8.2f} {p99:>8.2f} {p999:>8.2f}")
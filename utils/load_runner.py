@@ -0,0 +1,637 @@
+"""Multi-process load runner replaying a traffic plan captured from the tests/ API scenarios
+
+    python -m utils.load_runner --processes 4 --users 40 --duration 30               # closed loop
+    python -m utils.load_runner --processes 4 --rate 1000 --ramp-up 10 --duration 60 # open model
+    LOAD_RUNNER_AUTHKEY=secret python -m utils.load_runner --listen 0.0.0.0:7700 --remote-processes 8 ...
+    LOAD_RUNNER_AUTHKEY=secret python -m utils.load_runner --connect coordinator:7700 --processes 8  # load hosts
+
+The plan is captured by running the API tests once against a stub and recording each test's requests (ids
+created by a POST become placeholders filled in on replay), or loaded from a --plan file written by --save-plan.
+Worker processes, local or on other hosts, connect to the coordinator, run their share of the users or arrival
+rate and stream per-endpoint and per-scenario latency histograms every --interval seconds; the coordinator merges
+them bucket by bucket, so percentiles are as accurate as a single process's. In the open model latency is measured
+from each scenario's scheduled start, so a slow server can't hide queueing delay (coordinated omission).
+"""
+import argparse
+import ipaddress
+import json
+import math
+import multiprocessing
+import os
+import random
+import secrets
+import socket
+import sys
+import threading
+import time
+from multiprocessing.connection import Client, Listener, wait
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import pytest
+from utils.metrics import LatencyHistogram, LatencyRecorder
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The API tests whose traffic makes up the default plan
+DEFAULT_TESTS = ["tests/test_get_api.py", "tests/test_multiple_ids_api.py", "tests/test_post_api.py",
+                 "tests/test_put_api.py", "tests/test_patch_api.py", "tests/test_delete_api.py"]
+
+ARRIVALS = ("closed", "open")
+
+
+class Step:
+    """One request of a scenario; `{name}` placeholders are filled from ids saved by earlier steps"""
+
+    def __init__(self, method: str, endpoint: str, json: Any = None, params: Any = None, expect: int = 200,
+                 save: Optional[str] = None):
+        self.method = method
+        self.endpoint = endpoint
+        self.json = json
+        self.params = params
+        self.expect = expect
+        self.save = save  # name to store the `id` of this step's response under
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: value for key, value in vars(self).items() if value is not None}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Step":
+        return cls(**data)
+
+
+class Scenario:
+    """A named sequence of steps, picked with probability proportional to `weight`"""
+
+    def __init__(self, name: str, steps: List[Step], weight: float = 1.0):
+        self.name = name
+        self.steps = steps
+        self.weight = weight
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "weight": self.weight, "steps": [step.to_dict() for step in self.steps]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Scenario":
+        return cls(data["name"], [Step.from_dict(step) for step in data["steps"]], data.get("weight", 1.0))
+
+
+def _substitute(value: Any, variables: Dict[str, str]) -> Any:
+    if isinstance(value, str):
+        for name, replacement in variables.items():
+            value = value.replace(name, replacement)
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_substitute(item, variables) for item in value]
+    if isinstance(value, dict):
+        return {key: _substitute(item, variables) for key, item in value.items()}
+    return value
+
+
+def run_scenario(client, scenario: Scenario) -> Optional[str]:
+    """Send a scenario's steps in order; return why it failed, or None"""
+    variables: Dict[str, str] = {}
+    for step in scenario.steps:
+        endpoint = _substitute(step.endpoint, variables)
+        kwargs = {}
+        if step.json is not None:
+            kwargs["json"] = _substitute(step.json, variables)
+        if step.params is not None:
+            kwargs["params"] = _substitute(step.params, variables)
+        response = client.request(step.method, endpoint, **kwargs)
+        if response.status_code != step.expect:
+            return f"{step.method} {step.endpoint} returned {response.status_code}, expected {step.expect}"
+        if step.save:
+            variables["{" + step.save + "}"] = response.json()["id"]
+    return None
+
+
+class _PlanCapture:
+    """pytest plugin recording every APIClient request of each test as the steps of one scenario"""
+
+    def __init__(self):
+        self.scenarios: List[Scenario] = []
+        self._steps: List[Step] = []
+        self._ids: Dict[str, str] = {}  # id returned by a POST -> its placeholder
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+        from utils.api_client import APIClient
+        self._steps, self._ids = [], {}
+        original = APIClient.request
+        capture = self
+
+        def request(client, method, endpoint, **kwargs):
+            response = original(client, method, endpoint, **kwargs)
+            capture._record(method, endpoint, kwargs, response)
+            return response
+
+        APIClient.request = request
+        try:
+            yield
+        finally:
+            APIClient.request = original
+        if self._steps:
+            self.scenarios.append(Scenario(item.nodeid, self._steps))
+
+    def _record(self, method: str, endpoint: str, kwargs: Dict[str, Any], response):
+        variables = {id_: "{" + name + "}" for id_, name in self._ids.items()}
+        step = Step(method, _substitute(endpoint, variables), json=_substitute(kwargs.get("json"), variables),
+                    params=_substitute(kwargs.get("params"), variables), expect=response.status_code)
+        if method == "POST" and not kwargs.get("stream"):
+            try:
+                body = response.json()
+            except ValueError:
+                body = None
+            if isinstance(body, dict) and isinstance(body.get("id"), str):
+                step.save = self._ids[body["id"]] = f"id{len(self._ids)}"
+        self._steps.append(step)
+
+
+def capture_plan(test_args: Optional[List[str]] = None) -> List[Scenario]:
+    """Run tests once against an in-process stub and turn each test's requests into a scenario"""
+    from config.config import Config
+    base_url = Config.BASE_URL
+    capture = _PlanCapture()
+    args = list(test_args or DEFAULT_TESTS) + ["--stub", "-q", "-p", "no:cacheprovider", "-o", "addopts=",
+                                               "--results-jsonl=", "--metrics-json="]
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    try:
+        exit_code = pytest.main(args, plugins=[capture])
+    finally:
+        os.chdir(cwd)
+        Config.BASE_URL = base_url
+    if exit_code not in (0, 1) or not capture.scenarios:
+        raise RuntimeError(f"Capturing a plan from {' '.join(args)} failed (pytest exit code {int(exit_code)})")
+    return capture.scenarios
+
+
+def save_plan(scenarios: List[Scenario], path: str):
+    with open(path, "w") as f:
+        json.dump({"scenarios": [scenario.to_dict() for scenario in scenarios]}, f, indent=2)
+
+
+def load_plan(path: str) -> List[Scenario]:
+    with open(path) as f:
+        return [Scenario.from_dict(data) for data in json.load(f)["scenarios"]]
+
+
+def arrival_times(rate: float, ramp_up: float = 0.0, index: int = 0, stride: int = 1) -> Iterator[float]:
+    """Scheduled start offsets (seconds) of arrivals index, index + stride, ... at `rate` per second overall
+
+    The rate climbs linearly from 0 over `ramp_up` seconds. Process k of P takes (index=k, stride=P), so the
+    processes together produce exactly the single evenly spaced schedule.
+    """
+    ramp_arrivals = rate * ramp_up / 2
+    n = index
+    while True:
+        if n < ramp_arrivals:
+            yield math.sqrt(2 * ramp_up * n / rate)
+        else:
+            yield ramp_up + (n - ramp_arrivals) / rate
+        n += stride
+
+
+class ScenarioStats:
+    """Iterations, failures and end-to-end latency of one scenario"""
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.failures = 0
+        self.first_error: Optional[str] = None
+
+    @property
+    def iterations(self) -> int:
+        return self.latency.count
+
+    def record(self, seconds: float, error: Optional[str]):
+        self.latency.record(seconds)
+        if error is not None:
+            self.failures += 1
+            if self.first_error is None:
+                self.first_error = error
+
+    def merge(self, other: "ScenarioStats"):
+        self.latency.merge(other.latency)
+        self.failures += other.failures
+        if self.first_error is None:
+            self.first_error = other.first_error
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"latency": self.latency.to_dict(), "failures": self.failures, "first_error": self.first_error}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ScenarioStats":
+        stats = cls()
+        stats.latency = LatencyHistogram.from_dict(data["latency"])
+        stats.failures = data["failures"]
+        stats.first_error = data["first_error"]
+        return stats
+
+
+class LoadStats:
+    """Everything measured over an interval or a whole run: per-endpoint requests, per-scenario iterations and,
+    in the open model, how late scenarios started compared to their schedule"""
+
+    def __init__(self):
+        self.recorder = LatencyRecorder()
+        self.scenarios: Dict[str, ScenarioStats] = {}
+        self.lag = LatencyHistogram()
+
+    @property
+    def iterations(self) -> int:
+        return sum(stats.iterations for stats in self.scenarios.values())
+
+    @property
+    def failures(self) -> int:
+        return sum(stats.failures for stats in self.scenarios.values())
+
+    def record(self, scenario: str, seconds: float, error: Optional[str]):
+        stats = self.scenarios.get(scenario)
+        if stats is None:
+            stats = self.scenarios[scenario] = ScenarioStats()
+        stats.record(seconds, error)
+
+    def latency(self) -> LatencyHistogram:
+        """Latency of every scenario together"""
+        histogram = LatencyHistogram()
+        for stats in self.scenarios.values():
+            histogram.merge(stats.latency)
+        return histogram
+
+    def merge(self, other: "LoadStats"):
+        self.recorder.merge(other.recorder)
+        for name, stats in other.scenarios.items():
+            if name in self.scenarios:
+                self.scenarios[name].merge(stats)
+            else:
+                self.scenarios[name] = ScenarioStats.from_dict(stats.to_dict())
+        self.lag.merge(other.lag)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"recorder": self.recorder.to_dict(), "lag": self.lag.to_dict(),
+                "scenarios": {name: stats.to_dict() for name, stats in self.scenarios.items()}}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LoadStats":
+        stats = cls()
+        stats.recorder = LatencyRecorder.from_dict(data["recorder"])
+        stats.lag = LatencyHistogram.from_dict(data["lag"])
+        stats.scenarios = {name: ScenarioStats.from_dict(s) for name, s in data["scenarios"].items()}
+        return stats
+
+
+def _share(total: int, index: int, processes: int) -> int:
+    return total // processes + (index < total % processes)
+
+
+class _LoadWorker:
+    """The threads of one worker process and the stats they record, handed to the coordinator every interval"""
+
+    def __init__(self, conn, config: Dict[str, Any]):
+        self.conn = conn
+        self.config = config
+        self.scenarios = [Scenario.from_dict(data) for data in config["plan"]]
+        self.cum_weights = []
+        total = 0.0
+        for scenario in self.scenarios:
+            total += scenario.weight
+            self.cum_weights.append(total)
+        self._lock = threading.Lock()
+        self._current = LoadStats()
+
+    def _record_timing(self, timing):
+        with self._lock:
+            self._current.recorder.record(timing)
+
+    def _snapshot(self) -> LoadStats:
+        with self._lock:
+            stats, self._current = self._current, LoadStats()
+        return stats
+
+    def run(self):
+        from utils.api_client import APIClient
+        from utils.retry import RetryPolicy
+        config = self.config
+        index, processes = config["index"], config["processes"]
+        self.client = APIClient(config["base_url"], retry_policy=RetryPolicy(max_retries=0))
+        self.client.add_listener(self._record_timing)
+        self.start = time.perf_counter() + (config["start_at"] - time.time())
+        self.deadline = self.start + config["duration"]
+        seed = config.get("seed") or 0
+
+        if config["arrival"] == "open":
+            self._arrivals = arrival_times(config["rate"], config["ramp_up"], index, processes)
+            threads = [threading.Thread(target=self._open_user, args=(random.Random(f"{seed}:{index}:{i}"),),
+                                        daemon=True) for i in range(config["concurrency"])]
+        else:
+            users = _share(config["users"], index, processes)
+            ramp_step = config["ramp_up"] / config["users"] if config["users"] else 0.0
+            # Global user number u starts at u * ramp_step; this process runs users index, index + P, ...
+            threads = [threading.Thread(target=self._closed_user,
+                                        args=(random.Random(f"{seed}:{index}:{i}"),
+                                              (index + i * processes) * ramp_step), daemon=True)
+                       for i in range(users)]
+        for thread in threads:
+            thread.start()
+        interval = config["interval"]
+        next_report = self.start + interval
+        while any(thread.is_alive() for thread in threads):
+            time.sleep(max(min(next_report - time.perf_counter(), 0.1), 0.0))
+            if time.perf_counter() >= next_report:
+                self.conn.send({"type": "stats", "stats": self._snapshot().to_dict()})
+                next_report += interval
+        self.client.close()
+        self.conn.send({"type": "stats", "stats": self._snapshot().to_dict()})
+        self.conn.send({"type": "done"})
+
+    def _choose(self, rng: random.Random) -> Scenario:
+        return rng.choices(self.scenarios, cum_weights=self.cum_weights)[0]
+
+    def _run_one(self, rng: random.Random, started_at: float):
+        scenario = self._choose(rng)
+        try:
+            error = run_scenario(self.client, scenario)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}".splitlines()[0]
+        elapsed = time.perf_counter() - started_at
+        with self._lock:
+            self._current.record(scenario.name, elapsed, error)
+
+    def _closed_user(self, rng: random.Random, delay: float):
+        think_time = self.config["think_time"]
+        _sleep_until(self.start + delay)
+        while time.perf_counter() < self.deadline:
+            self._run_one(rng, time.perf_counter())
+            if think_time:
+                time.sleep(think_time)
+
+    def _open_user(self, rng: random.Random):
+        while True:
+            with self._lock:
+                scheduled = self.start + next(self._arrivals)
+            if scheduled >= self.deadline:
+                return
+            _sleep_until(scheduled)
+            lag = time.perf_counter() - scheduled
+            with self._lock:
+                self._current.lag.record(lag)
+            # Timed from the schedule: when every thread is busy the wait counts against the server
+            self._run_one(rng, scheduled)
+
+
+def _sleep_until(moment: float):
+    delay = moment - time.perf_counter()
+    if delay > 0:
+        time.sleep(delay)
+
+
+def _worker_main(address, authkey: bytes):
+    """Entry point of a worker process: connect, wait for the start message, run and stream stats"""
+    conn = Client(tuple(address), authkey=authkey)
+    try:
+        conn.send({"type": "hello", "host": socket.gethostname(), "pid": os.getpid()})
+        message = conn.recv()
+        if message.get("type") == "start":
+            _LoadWorker(conn, message).run()
+    finally:
+        conn.close()
+
+
+def start_workers(address, authkey: bytes, processes: int) -> List[multiprocessing.Process]:
+    """Spawn worker processes that connect to the coordinator at `address`"""
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=_worker_main, args=(tuple(address), authkey), daemon=True)
+               for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    return workers
+
+
+class LoadResult:
+    """Merged stats of a run plus the worker counts it was produced by"""
+
+    def __init__(self, processes: int):
+        self.processes = processes
+        self.stats = LoadStats()
+        self.elapsed = 0.0
+        self.lost: List[str] = []  # workers that disconnected without finishing
+
+
+class Coordinator:
+    """Accepts worker connections, starts them together and merges the stats they stream
+
+    Messages are pickles, so only peers holding `authkey` may connect; without one a random key is generated,
+    which only workers started by this process (start_workers) know.
+    """
+
+    def __init__(self, address=("127.0.0.1", 0), authkey: Optional[bytes] = None):
+        self.authkey = authkey or secrets.token_bytes(32)
+        self.listener = Listener(tuple(address), authkey=self.authkey)
+        self._closed = False
+
+    @property
+    def address(self):
+        return self.listener.address
+
+    def close(self):
+        self._closed = True
+        self.listener.close()
+
+    def _accept(self, count: int, timeout: float) -> List[Any]:
+        conns: List[Any] = []
+
+        def accept():
+            while len(conns) < count:
+                try:
+                    conn = self.listener.accept()
+                    conns.append((conn, conn.recv()))
+                except (OSError, EOFError, multiprocessing.AuthenticationError):
+                    if self._closed:
+                        return  # a peer with the wrong authkey or one that hung up is just ignored
+
+        thread = threading.Thread(target=accept, daemon=True)
+        thread.start()
+        thread.join(timeout)
+        if len(conns) < count:
+            raise TimeoutError(f"Only {len(conns)} of {count} workers connected within {timeout:.0f}s")
+        return conns
+
+    def run(self, config: Dict[str, Any], processes: int, connect_timeout: float = 60.0,
+            progress=None) -> LoadResult:
+        """Wait for `processes` workers, run `config` on all of them and return the merged stats
+
+        `progress(elapsed, interval_stats)` is called whenever an interval's stats have arrived.
+        """
+        conns = self._accept(processes, connect_timeout)
+        result = LoadResult(processes)
+        start_at = time.time() + 1.0
+        for index, (conn, hello) in enumerate(conns):
+            conn.send(dict(config, type="start", index=index, processes=processes, start_at=start_at))
+        names = {conn: f"{hello['host']}:{hello['pid']}" for conn, hello in conns}
+        pending = [conn for conn, _ in conns]
+        interval_stats = LoadStats()
+        reports = 0
+        while pending:
+            for conn in wait(pending, timeout=1.0):
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    pending.remove(conn)
+                    result.lost.append(names[conn])
+                    continue
+                if message["type"] == "stats":
+                    stats = LoadStats.from_dict(message["stats"])
+                    result.stats.merge(stats)
+                    interval_stats.merge(stats)
+                    reports += 1
+                    if reports % len(conns) == 0:
+                        if progress is not None and interval_stats.iterations:
+                            progress(time.time() - start_at, interval_stats)
+                        interval_stats = LoadStats()
+                elif message["type"] == "done":
+                    pending.remove(conn)
+                    conn.close()
+        result.elapsed = min(time.time() - start_at, config["duration"]) if config["duration"] else 0.0
+        return result
+
+
+def _serve_stub(conn):
+    from utils.stub_server import StubServer
+    server = StubServer()
+    conn.send(server.url)
+    server.serve_forever()
+
+
+def _start_stub() -> Tuple[multiprocessing.Process, str]:
+    """Serve the stub from its own process so it doesn't share an interpreter with any worker"""
+    context = multiprocessing.get_context("spawn")
+    parent, child = context.Pipe()
+    process = context.Process(target=_serve_stub, args=(child,), daemon=True)
+    process.start()
+    return process, parent.recv()
+
+
+def _address(value: str):
+    host, _, port = value.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host.strip("[]")).is_loopback
+    except ValueError:
+        return False
+
+
+def _print_progress(elapsed: float, stats: LoadStats):
+    latency = stats.latency()
+    print(f"[{elapsed:6.1f}s] {stats.iterations:>7} scenarios  {stats.failures:>5} failed  "
+          f"p50 {latency.percentile(50) * 1000:7.2f}ms  p99 {latency.percentile(99) * 1000:7.2f}ms")
+
+
+def print_summary(result: LoadResult):
+    stats = result.stats
+    elapsed = result.elapsed or 1.0
+    print(f"\n{result.processes} processes, {elapsed:.1f}s: {stats.iterations} scenarios "
+          f"({stats.iterations / elapsed:.1f}/s), {stats.failures} failed")
+    if result.lost:
+        print(f"lost workers: {', '.join(result.lost)}")
+    if stats.lag.count:
+        print(f"start lag behind schedule: p50 {stats.lag.percentile(50) * 1000:.2f}ms  "
+              f"p99 {stats.lag.percentile(99) * 1000:.2f}ms  max {stats.lag.max * 1000:.2f}ms")
+    print(f"\n{'scenario':<90} {'iters':>7} {'it/s':>8} {'fail%':>6} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, scenario in sorted(stats.scenarios.items()):
+        fail_pct = 100.0 * scenario.failures / scenario.iterations if scenario.iterations else 0.0
+        print(f"{name:<90} {scenario.iterations:>7} {scenario.iterations / elapsed:>8.1f} {fail_pct:>6.1f} "
+              f"{scenario.latency.percentile(50) * 1000:>8.2f} {scenario.latency.percentile(99) * 1000:>8.2f}")
+        if scenario.first_error:
+            print(f"    first failure: {scenario.first_error}")
+    print(f"\n{'endpoint':<30} {'requests':>9} {'req/s':>8} {'err%':>6} "
+          f"{'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'p999 ms':>8}")
+    for (method, endpoint), endpoint_stats in sorted(stats.recorder.endpoints.items()):
+        err_pct = 100.0 * endpoint_stats.errors / endpoint_stats.count if endpoint_stats.count else 0.0
+        p50, p90, p99, p999 = (endpoint_stats.phases["total"].percentile(q) * 1000 for q in (50, 90, 99, 99.9))
+        print(f"{method + ' ' + endpoint:<30} {endpoint_stats.count:>9} {endpoint_stats.count / elapsed:>8.1f} "
+              f"{err_pct:>6.1f} {p50:>8.2f} {p90:>8.2f} {p99:>8.2f} {p999:>8.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="Local worker processes")
+    parser.add_argument("--arrival", choices=ARRIVALS, default=None,
+                        help="closed: --users loop back to back; open: scenarios start at --rate per second "
+                             "(default: open if --rate is given)")
+    parser.add_argument("--users", type=int, default=10, help="Closed model: concurrent virtual users in total")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Closed model: pause between scenarios")
+    parser.add_argument("--rate", type=float, default=None, help="Open model: scenario starts per second in total")
+    parser.add_argument("--concurrency", type=int, default=32, help="Open model: threads per process")
+    parser.add_argument("--ramp-up", type=float, default=0.0,
+                        help="Seconds over which the rate (or the number of users) grows linearly to its target")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to generate load for")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between stats reports")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of each worker's scenario choices")
+    parser.add_argument("--base-url", help="API to load (default: a stub in its own process)")
+    parser.add_argument("--tests", nargs="*", default=None, help="Tests to capture the plan from")
+    parser.add_argument("--plan", help="Load the plan from this file instead of capturing it")
+    parser.add_argument("--save-plan", help="Capture the plan, write it to this file and exit")
+    parser.add_argument("--listen", default="127.0.0.1:0", help="Coordinator address for workers to connect to")
+    parser.add_argument("--remote-processes", type=int, default=0,
+                        help="Worker processes expected to --connect from other hosts")
+    parser.add_argument("--connect", help="Run --processes workers for the coordinator at HOST:PORT and exit")
+    parser.add_argument("--authkey", default=os.environ.get("LOAD_RUNNER_AUTHKEY"),
+                        help="Shared secret of coordinator and workers (env LOAD_RUNNER_AUTHKEY); required to "
+                             "--connect or to --listen beyond loopback")
+    parser.add_argument("--json", help="Also write the merged results to this file")
+    args = parser.parse_args(argv)
+    # Whoever holds the key can make the coordinator unpickle data, so never fall back to a shared default
+    authkey = args.authkey.encode("utf-8") if args.authkey else None
+    if authkey is None and (args.connect or not _is_loopback(_address(args.listen)[0])):
+        parser.error("--connect and a non-loopback --listen need --authkey or LOAD_RUNNER_AUTHKEY")
+    sys.path.insert(0, ROOT)
+
+    if args.connect:
+        for worker in start_workers(_address(args.connect), authkey, args.processes):
+            worker.join()
+        return
+
+    if args.save_plan:
+        save_plan(capture_plan(args.tests), args.save_plan)
+        print(f"saved {args.save_plan}")
+        return
+    scenarios = load_plan(args.plan) if args.plan else capture_plan(args.tests)
+    arrival = args.arrival or ("open" if args.rate else "closed")
+    if arrival == "open" and not args.rate:
+        parser.error("--arrival open needs --rate")
+
+    stub = None
+    base_url = args.base_url
+    if base_url is None:
+        stub, base_url = _start_stub()
+    coordinator = Coordinator(_address(args.listen), authkey)
+    processes = args.processes + args.remote_processes
+    config = {"base_url": base_url, "plan": [scenario.to_dict() for scenario in scenarios], "arrival": arrival,
+              "users": args.users, "think_time": args.think_time, "rate": args.rate, "concurrency": args.concurrency,
+              "ramp_up": args.ramp_up, "duration": args.duration, "interval": args.interval, "seed": args.seed}
+    host, port = coordinator.address
+    print(f"{len(scenarios)} scenarios, {arrival} model against {base_url}; coordinator on {host}:{port}")
+    try:
+        start_workers(coordinator.address, coordinator.authkey, args.processes)
+        result = coordinator.run(config, processes, progress=_print_progress)
+    finally:
+        coordinator.close()
+        if stub is not None:
+            stub.terminate()
+    print_summary(result)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"processes": result.processes, "elapsed": result.elapsed, "lost": result.lost,
+                       "arrival": arrival, "stats": result.stats.to_dict(),
+                       "requests": result.stats.recorder.summary()}, f)
+    if result.stats.failures or result.lost:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
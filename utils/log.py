@@ -0,0 +1,66 @@
+import json
+import logging
+from collections import deque
+from typing import Any
+
+logger = logging.getLogger("api_tests")
+
+
+class TruncatedJSON:
+    """Log argument that pretty-prints an object only when formatted, stopping after `limit` characters"""
+
+    def __init__(self, obj: Any, limit: int = 500):
+        self.obj = obj
+        self.limit = limit
+
+    def __str__(self) -> str:
+        parts = []
+        size = 0
+        for chunk in json.JSONEncoder(indent=2).iterencode(self.obj):
+            parts.append(chunk)
+            size += len(chunk)
+            if size > self.limit:
+                return "".join(parts)[:self.limit] + "..."
+        return "".join(parts)
+
+
+class TruncatedBody:
+    """Log argument that decodes at most `limit` bytes of a response body, only when formatted"""
+
+    def __init__(self, response: Any, limit: int = 1000):
+        self.response = response
+        self.limit = limit
+
+    def __str__(self) -> str:
+        content = self.response.content
+        text = content[:self.limit].decode(getattr(self.response, "encoding", None) or "utf-8", errors="replace")
+        return text + "..." if len(content) > self.limit else text
+
+
+class FailureLogHandler(logging.Handler):
+    """Keeps the raw records of the current test and formats them only if someone asks (i.e. on failure)"""
+
+    def __init__(self, capacity: int = 500):
+        super().__init__()
+        self.records = deque(maxlen=capacity)
+        self.setFormatter(logging.Formatter("%(levelname)-8s %(message)s"))
+
+    def emit(self, record: logging.LogRecord):
+        self.records.append(record)
+
+    def clear(self):
+        self.records.clear()
+
+    def format_records(self) -> str:
+        return "\n".join(self.format(record) for record in list(self.records))
+
+
+def configure_logging(level: str = "DEBUG", capacity: int = 500) -> FailureLogHandler:
+    """Route the framework logger into a failure-only buffer instead of pytest's eager log capture"""
+    handler = FailureLogHandler(capacity)
+    for existing in [h for h in logger.handlers if isinstance(h, FailureLogHandler)]:
+        logger.removeHandler(existing)
+    logger.addHandler(handler)
+    logger.setLevel(level.upper())
+    logger.propagate = False
+    return handler
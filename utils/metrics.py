@@ -0,0 +1,237 @@
+import math
+import re
+import threading
+from typing import Dict, List, Optional, Tuple, Any
+from urllib.parse import urlsplit
+
+# Path segments that identify a single resource: numeric ids and the hex/uuid ids the API generates
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-fA-F-]{16,})$")
+
+# Phases of a request, in the order they happen; dns/connect/tls only occur when a new connection is opened
+PHASES = ("dns", "connect", "tls", "ttfb", "total")
+
+
+def endpoint_template(url: str) -> str:
+    """Collapse resource ids so `/objects/7` and `/objects/13` aggregate under `/objects/{id}`"""
+    path = urlsplit(url).path or "/"
+    # Only id-looking segments, so prefixes like `/api/v1` and names like `/objects/search` are kept
+    return "/".join("{id}" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/"))
+
+
+class LatencyHistogram:
+    """HDR-style histogram: log-spaced buckets with a fixed relative error, constant memory and exact merging"""
+
+    def __init__(self, precision: float = 0.01):
+        self.precision = precision
+        self._log_base = math.log1p(precision)
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def _index(self, seconds: float) -> int:
+        # Bucket on microseconds; anything under 1us shares the first bucket
+        return int(math.log(max(seconds * 1e6, 1.0)) / self._log_base)
+
+    def _value(self, index: int) -> float:
+        return math.exp((index + 0.5) * self._log_base) / 1e6
+
+    def record(self, seconds: float):
+        index = self._index(seconds)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def merge(self, other: "LatencyHistogram"):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge histograms with different precision")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q: float) -> float:
+        """Value (in seconds) at percentile q, accurate to within `precision`"""
+        if not self.count:
+            return 0.0
+        rank = max(math.ceil(q / 100.0 * self.count), 1)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(max(self._value(index), self.min), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        """Count plus mean/min/max/percentiles in milliseconds"""
+        if not self.count:
+            return {"count": 0}
+        summary = {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000,
+            "min_ms": self.min * 1000,
+            "max_ms": self.max * 1000,
+        }
+        for q, name in ((50, "p50_ms"), (90, "p90_ms"), (99, "p99_ms"), (99.9, "p999_ms")):
+            summary[name] = self.percentile(q) * 1000
+        return summary
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "precision": self.precision,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max,
+            "buckets": {str(index): count for index, count in self.buckets.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        histogram = cls(data["precision"])
+        histogram.buckets = {int(index): count for index, count in data["buckets"].items()}
+        histogram.count = data["count"]
+        histogram.total = data["total"]
+        histogram.min = math.inf if data["min"] is None else data["min"]
+        histogram.max = data["max"]
+        return histogram
+
+
+class RequestTiming:
+    """Timing and size breakdown of one request; connection phases stay None when a pooled connection was reused"""
+
+    def __init__(self, method: str, url: str):
+        self.method = method
+        self.url = url
+        self.status: Optional[int] = None
+        self.dns: Optional[float] = None
+        self.connect: Optional[float] = None
+        self.tls: Optional[float] = None
+        self.ttfb: Optional[float] = None
+        self.total: Optional[float] = None
+        self.request_bytes = 0  # bodies before compression
+        self.response_bytes = 0
+        self.request_wire_bytes = 0  # bodies as sent and received, compressed or not
+        self.response_wire_bytes = 0
+        self.error: Optional[str] = None
+        self.attempt = 0  # 0 for the first try, n for the nth retry
+        self.cached = False  # answered from the response cache; counted in CacheStats, not in latencies
+
+    @property
+    def failed(self) -> bool:
+        """A connection error, a 5xx or a 429: a throttled request is the server failing under load too"""
+        return self.error is not None or (self.status is not None and (self.status >= 500 or self.status == 429))
+
+
+class EndpointStats:
+    """Aggregated timings, statuses and byte counts for one (method, endpoint template) pair"""
+
+    BYTE_COUNTS = ("request_bytes", "response_bytes", "request_wire_bytes", "response_wire_bytes")
+
+    def __init__(self):
+        self.phases: Dict[str, LatencyHistogram] = {phase: LatencyHistogram() for phase in PHASES}
+        self.statuses: Dict[str, int] = {}
+        self.errors = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.request_wire_bytes = 0
+        self.response_wire_bytes = 0
+
+    @property
+    def count(self) -> int:
+        return self.phases["total"].count
+
+    def record(self, timing: RequestTiming):
+        for phase in PHASES:
+            value = getattr(timing, phase)
+            if value is not None:
+                self.phases[phase].record(value)
+        status = str(timing.status) if timing.status is not None else "error"
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        self.errors += timing.failed
+        for name in self.BYTE_COUNTS:
+            setattr(self, name, getattr(self, name) + getattr(timing, name))
+
+    def merge(self, other: "EndpointStats"):
+        for phase in PHASES:
+            self.phases[phase].merge(other.phases[phase])
+        for status, count in other.statuses.items():
+            self.statuses[status] = self.statuses.get(status, 0) + count
+        self.errors += other.errors
+        for name in self.BYTE_COUNTS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "phases": {phase: histogram.to_dict() for phase, histogram in self.phases.items()},
+            "statuses": self.statuses,
+            "errors": self.errors,
+            **{name: getattr(self, name) for name in self.BYTE_COUNTS},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "EndpointStats":
+        stats = cls()
+        stats.phases = {phase: LatencyHistogram.from_dict(h) for phase, h in data["phases"].items()}
+        stats.statuses = dict(data["statuses"])
+        stats.errors = data["errors"]
+        for name in cls.BYTE_COUNTS:
+            setattr(stats, name, data.get(name, 0))
+        return stats
+
+
+class LatencyRecorder:
+    """Thread-safe per-endpoint aggregation of RequestTiming records; usable as an APIClient listener"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.endpoints: Dict[Tuple[str, str], EndpointStats] = {}
+
+    def record(self, timing: RequestTiming):
+        if timing.cached:
+            return
+        key = (timing.method, endpoint_template(timing.url))
+        with self._lock:
+            stats = self.endpoints.get(key)
+            if stats is None:
+                stats = self.endpoints[key] = EndpointStats()
+            stats.record(timing)
+
+    def merge(self, other: "LatencyRecorder"):
+        with self._lock:
+            for key, stats in other.endpoints.items():
+                if key in self.endpoints:
+                    self.endpoints[key].merge(stats)
+                else:
+                    self.endpoints[key] = EndpointStats.from_dict(stats.to_dict())
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """One row per endpoint with request counts, bytes and per-phase latency summaries"""
+        rows = []
+        for (method, endpoint), stats in sorted(self.endpoints.items()):
+            rows.append({
+                "method": method,
+                "endpoint": endpoint,
+                "requests": stats.count,
+                "errors": stats.errors,
+                "statuses": stats.statuses,
+                **{name: getattr(stats, name) for name in EndpointStats.BYTE_COUNTS},
+                "phases": {phase: h.summary() for phase, h in stats.phases.items() if h.count},
+            })
+        return rows
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {f"{method} {endpoint}": stats.to_dict() for (method, endpoint), stats in self.endpoints.items()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyRecorder":
+        recorder = cls()
+        for key, stats in data.items():
+            method, endpoint = key.split(" ", 1)
+            recorder.endpoints[(method, endpoint)] = EndpointStats.from_dict(stats)
+        return recorder
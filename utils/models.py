@@ -0,0 +1,205 @@
+import sys
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+# Common schema for product objects
+PRODUCT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "id": {"type": "string"},
+        "name": {"type": "string"},
+        "data": {
+            "type": ["object", "null"],
+            "properties": {
+                "color": {"type": ["string", "null"]},
+                "capacity": {"type": ["string", "null"]},
+                "capacity GB": {"type": ["integer", "null"]},
+                "price": {"type": ["number", "null"]},
+                "generation": {"type": ["string", "null"]},
+                "year": {"type": ["integer", "null"]},
+                "CPU model": {"type": ["string", "null"]},
+                "Hard disk size": {"type": ["string", "null"]},
+                "Strap Colour": {"type": ["string", "null"]},
+                "Case Size": {"type": ["string", "null"]},
+                "Color": {"type": ["string", "null"]},
+                "Description": {"type": ["string", "null"]},
+                "Screen size": {"type": ["number", "null"]},
+                "Capacity": {"type": ["string", "null"]},
+                "Generation": {"type": ["string", "null"]},
+                "Price": {"type": ["string", "null"]}
+            },
+            "additionalProperties": True
+        }
+    },
+    "required": ["id", "name", "data"]
+}
+
+# The data fields the schema knows, interned so every decoded product shares one copy of each key
+DATA_FIELDS: Dict[str, str] = {sys.intern(name): sys.intern(name)
+                               for name in PRODUCT_SCHEMA["properties"]["data"]["properties"]}
+
+
+class _Missing:
+    def __repr__(self):
+        return "<missing>"
+
+
+MISSING = _Missing()
+
+
+def _intern_keys(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {DATA_FIELDS.get(key, key): value for key, value in data.items()}
+
+
+class Product:
+    """One /objects item: id, name and its free-form data (None when the API returns null)"""
+
+    __slots__ = ("id", "name", "data")
+
+    def __init__(self, id: str, name: str, data: Optional[Dict[str, Any]] = None):
+        self.id = id
+        self.name = name
+        self.data = data
+
+    @classmethod
+    def from_dict(cls, obj: Dict[str, Any]) -> "Product":
+        data = obj.get("data")
+        return cls(obj["id"], obj["name"], _intern_keys(data) if isinstance(data, dict) else data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "name": self.name, "data": dict(self.data) if self.data is not None else None}
+
+    def get(self, field: str, default: Any = None) -> Any:
+        """A data field, or default if it's absent or data is null"""
+        return self.data.get(field, default) if self.data else default
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Product):
+            return NotImplemented
+        return (self.id, self.name, self.data) == (other.id, other.name, other.data)
+
+    def __repr__(self) -> str:
+        return f"Product(id={self.id!r}, name={self.name!r}, data={self.data!r})"
+
+
+class _Column:
+    """Values of one data field across a ProductTable
+
+    Stays a typed array while every value is an int (`q`) or every value is a float (`d`), with a presence bitmap
+    for products without the field, and falls back to a plain list (MISSING marking absent values) otherwise, so
+    values always come back with their original type.
+    """
+
+    __slots__ = ("values", "present")
+
+    def __init__(self):
+        self.values: Union[array, List[Any], None] = None  # type decided by the first value
+        self.present = bytearray()
+
+    def append(self, index: int, value: Any):
+        """Set the value of product `index`, products since the last value being absent"""
+        values = self.values
+        gap = index - len(self.present)
+        if values is None:
+            typecode = self._typecode(value)
+            if typecode:
+                values = self.values = array(typecode, bytes(8 * index))
+            else:
+                values = self.values = [MISSING] * index
+        else:
+            if isinstance(values, array) and self._typecode(value) != values.typecode:
+                values = self.values = self.to_list(len(self.present))
+            if gap:
+                values.extend([0 if isinstance(values, array) else MISSING] * gap)
+        if gap:
+            self.present.extend(bytes(gap))
+        values.append(value)
+        self.present.append(1)
+
+    @staticmethod
+    def _typecode(value: Any) -> Optional[str]:
+        if type(value) is int and -2 ** 63 <= value < 2 ** 63:
+            return "q"
+        if type(value) is float:
+            return "d"
+        return None
+
+    def __getitem__(self, index: int) -> Any:
+        if index >= len(self.present) or not self.present[index]:
+            return MISSING
+        return self.values[index]
+
+    def to_list(self, length: int) -> List[Any]:
+        """Values of the first `length` products, MISSING where absent"""
+        values = [v if p else MISSING for v, p in zip(self.values, self.present)]
+        return values + [MISSING] * (length - len(values))
+
+
+class ProductTable:
+    """Many products stored column by column instead of as one dict per product
+
+    Build it from a decoded list or, to never hold every dict at once, from a stream such as
+    `api_client.iter_objects("/objects")`. Rows are rebuilt as Product objects only when accessed.
+    """
+
+    __slots__ = ("ids", "names", "has_data", "columns")
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.names: List[str] = []
+        self.has_data = bytearray()  # 0 where the API returned "data": null
+        self.columns: Dict[str, _Column] = {}
+
+    @classmethod
+    def from_objects(cls, objects: Iterable[Dict[str, Any]]) -> "ProductTable":
+        table = cls()
+        for obj in objects:
+            table.append(obj)
+        return table
+
+    def append(self, obj: Dict[str, Any]):
+        index = len(self.ids)
+        self.ids.append(obj["id"])
+        self.names.append(obj["name"])
+        data = obj.get("data")
+        if isinstance(data, dict):
+            self.has_data.append(1)
+            columns = self.columns
+            for key, value in data.items():
+                column = columns.get(key)
+                if column is None:
+                    column = columns[DATA_FIELDS.get(key, key)] = _Column()
+                column.append(index, value)
+        else:
+            self.has_data.append(0)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index: int) -> Product:
+        index = range(len(self.ids))[index]  # columns are sparse, so resolve negative indices (and IndexError) first
+        if not self.has_data[index]:
+            return Product(self.ids[index], self.names[index], None)
+        data = {}
+        for key, column in self.columns.items():
+            value = column[index]
+            if value is not MISSING:
+                data[key] = value
+        return Product(self.ids[index], self.names[index], data)
+
+    def __iter__(self) -> Iterator[Product]:
+        return (self[index] for index in range(len(self.ids)))
+
+    def column(self, field: str) -> List[Any]:
+        """Every product's value of `field` (id, name or a data field), MISSING where absent"""
+        if field == "id":
+            return list(self.ids)
+        if field == "name":
+            return list(self.names)
+        column = self.columns.get(field)
+        return column.to_list(len(self.ids)) if column is not None else [MISSING] * len(self.ids)
+
+
+def decode_products(objects: Iterable[Dict[str, Any]]) -> ProductTable:
+    """Bulk-decode a list (or stream) of product dicts into a ProductTable"""
+    return ProductTable.from_objects(objects)
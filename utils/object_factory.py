@@ -0,0 +1,33 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
+from config.config import Config
+from utils.api_client import APIClient
+from utils.log import logger
+
+
+class ObjectFactory:
+    """Creates objects through an APIClient and deletes them all again on cleanup"""
+
+    def __init__(self, api_client: APIClient, endpoint: str = "/objects"):
+        self.api_client = api_client
+        self.endpoint = endpoint
+        self.created_ids: List[str] = []
+
+    def create(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POST a new object and remember its id for cleanup"""
+        response = self.api_client.post(self.endpoint, json=payload)
+        assert response.status_code == 200, f"Expected status code 200 but got {response.status_code}"
+        created = response.json()
+        self.created_ids.append(created["id"])
+        logger.debug("Created object with ID: %s", created["id"])
+        return created
+
+    def cleanup(self) -> List[str]:
+        """Delete every created object in one concurrent batch and return the ids that could not be deleted"""
+        ids, self.created_ids = self.created_ids, []
+        if not ids:
+            return []
+        with ThreadPoolExecutor(max_workers=min(len(ids), Config.POOL_MAXSIZE)) as executor:
+            responses = list(executor.map(lambda id_: self.api_client.delete(f"{self.endpoint}/{id_}"), ids))
+        # 404 means the test already deleted the object itself
+        return [id_ for id_, response in zip(ids, responses) if response.status_code not in (200, 404)]
@@ -0,0 +1,120 @@
+"""Request bodies serialized once and reused, with optional gzip/deflate/zstd compression"""
+import gzip
+import json
+import zlib
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Content-Encodings request bodies can be compressed with (zstd needs the zstandard package)
+COMPRESSIONS = ("gzip", "deflate", "zstd")
+
+# Headers describing a body as it crossed the wire, which no longer hold once it has been decoded
+_WIRE_HEADERS = frozenset({"content-encoding", "content-length"})
+
+
+class UnsupportedEncoding(ValueError):
+    """A Content-Encoding this process can't (de)compress"""
+
+
+def _json_encoder() -> Callable[[Any], bytes]:
+    """orjson when it is installed, otherwise the stdlib encoder without the whitespace `json=` adds"""
+    try:
+        import orjson
+    except ImportError:
+        return lambda obj: json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return orjson.dumps
+
+
+dumps = _json_encoder()
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise UnsupportedEncoding("zstd needs the zstandard package (pip install zstandard)") from None
+    return zstandard
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        return gzip.compress(body, mtime=0)  # no timestamp, so equal payloads give equal bytes
+    if encoding == "deflate":
+        return zlib.compress(body)
+    if encoding == "zstd":
+        return _zstandard().ZstdCompressor().compress(body)
+    raise UnsupportedEncoding(f"Unsupported content encoding {encoding!r}; expected one of {', '.join(COMPRESSIONS)}")
+
+
+def decompress(body: bytes, encoding: Optional[str]) -> bytes:
+    encoding = (encoding or "identity").strip().lower()
+    if encoding == "identity":
+        return body
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "deflate":
+        return zlib.decompress(body)
+    if encoding == "zstd":
+        return _zstandard().ZstdDecompressor().decompressobj().decompress(body)
+    raise UnsupportedEncoding(f"Unsupported content encoding {encoding!r}")
+
+
+class EncodedPayload:
+    """A JSON body serialized (and maybe compressed) once; pass it as `json=` to send the same bytes every time"""
+
+    __slots__ = ("body", "size", "content_encoding")
+
+    def __init__(self, body: bytes, size: int, content_encoding: Optional[str] = None):
+        self.body = body
+        self.size = size  # length before compression
+        self.content_encoding = content_encoding
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        headers = {"Content-Type": "application/json"}
+        if self.content_encoding:
+            headers["Content-Encoding"] = self.content_encoding
+        return headers
+
+    def __len__(self) -> int:
+        return len(self.body)
+
+    def __repr__(self) -> str:
+        encoding = f", {self.content_encoding} to {len(self.body)}" if self.content_encoding else ""
+        return f"<EncodedPayload {self.size} bytes{encoding}>"
+
+
+def encode_payload(obj: Any, compression: Optional[str] = None, min_size: int = 0) -> EncodedPayload:
+    """Serialize obj to JSON, compressing it with `compression` if it is at least `min_size` bytes"""
+    raw = dumps(obj)
+    if compression and len(raw) >= min_size:
+        return EncodedPayload(compress(raw, compression), len(raw), compression)
+    return EncodedPayload(raw, len(raw))
+
+
+def decoded_headers(headers: Iterable[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """Response headers to keep next to its decoded body (e.g. when caching or recording it)"""
+    return [(name, value) for name, value in headers if name.lower() not in _WIRE_HEADERS]
+
+
+def negotiate(accept_encoding: Optional[str], offered=("zstd", "gzip", "deflate")) -> Optional[str]:
+    """The first of `offered` that an Accept-Encoding header allows and this process can compress, or None"""
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.partition(";")
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip().lower())
+    for encoding in offered:
+        if encoding in accepted or "*" in accepted:
+            if encoding == "zstd":
+                try:
+                    _zstandard()
+                except UnsupportedEncoding:
+                    continue
+            return encoding
+    return None
@@ -0,0 +1,174 @@
+"""Render a --results-jsonl file as an HTML page or Allure results, after (or during) the run
+
+    python -m utils.report test-results.jsonl --html report.html
+    python -m utils.report test-results.jsonl --allure allure-results
+
+The file is streamed twice (once for the summary, once for the rows), so memory doesn't grow with the run.
+"""
+import argparse
+import hashlib
+import html
+import json
+import os
+import uuid
+from typing import Any, Dict, Iterator, TextIO
+
+OUTCOMES = ("failed", "error", "xpassed", "xfailed", "skipped", "passed")
+
+_ALLURE_STATUS = {"passed": "passed", "xpassed": "passed", "failed": "failed", "error": "broken",
+                  "skipped": "skipped", "xfailed": "skipped"}
+
+_STYLE = """body{font-family:sans-serif;margin:2em}table{border-collapse:collapse}td,th{border:1px solid #ccc;
+padding:2px 8px;text-align:left}pre{white-space:pre-wrap;margin:0}.failed,.error{color:#b00}
+.passed,.xpassed{color:#080}.skipped,.xfailed{color:#888}"""
+
+
+def iter_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Records of a results file, skipping a partially written last line"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+class Summary:
+    """Session-level facts gathered in a first pass over the results"""
+
+    def __init__(self, path: str):
+        self.start: Dict[str, Any] = {}
+        self.finish: Dict[str, Any] = {}
+        self.metrics: Dict[str, Any] = {}
+        self.counts = dict.fromkeys(OUTCOMES, 0)
+        self.duration = 0.0
+        for record in iter_records(path):
+            event = record.get("event")
+            if event == "test":
+                self.counts[record["outcome"]] = self.counts.get(record["outcome"], 0) + 1
+                self.duration += record.get("duration") or 0.0
+            elif event == "session_start":
+                self.start = record
+            elif event == "session_finish":
+                self.finish = record
+            elif event == "metrics":
+                self.metrics = record
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+
+def _write_metrics(out: TextIO, metrics: Dict[str, Any]):
+    rows = metrics.get("requests") or []
+    if rows:
+        out.write("<h2>Request metrics</h2><table><tr><th>Endpoint</th><th>Requests</th><th>Errors</th>"
+                  "<th>p50 ms</th><th>p90 ms</th><th>p99 ms</th><th>p999 ms</th><th>Bytes sent</th>"
+                  "<th>Bytes received</th><th>Wire sent</th><th>Wire received</th></tr>")
+        for row in rows:
+            total = row["phases"]["total"]
+            out.write(f"<tr><td>{html.escape(row['method'])} {html.escape(row['endpoint'])}</td>"
+                      f"<td>{row['requests']}</td><td>{row['errors']}</td>"
+                      + "".join(f"<td>{total[p]:.1f}</td>" for p in ("p50_ms", "p90_ms", "p99_ms", "p999_ms"))
+                      + f"<td>{row['request_bytes']}</td><td>{row['response_bytes']}</td>"
+                      f"<td>{row.get('request_wire_bytes', '')}</td><td>{row.get('response_wire_bytes', '')}</td></tr>")
+        out.write("</table>")
+    for name in ("connections", "cache"):
+        if metrics.get(name):
+            counters = ", ".join(f"{key}: {value}" for key, value in metrics[name].items())
+            out.write(f"<p>{name}: {html.escape(counters)}</p>")
+
+
+def render_html(path: str, output: str, failures_only: bool = False):
+    summary = Summary(path)
+    with open(output, "w", encoding="utf-8") as out:
+        out.write(f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>Test report</title>"
+                  f"<style>{_STYLE}</style></head><body><h1>Test report</h1>")
+        wall = summary.finish.get("duration")
+        out.write(f"<p>{summary.total} tests"
+                  + (f" in {wall:.1f}s" if wall is not None else " (run still in progress)") + ": "
+                  + ", ".join(f"<span class='{o}'>{n} {o}</span>" for o, n in summary.counts.items() if n)
+                  + "</p>")
+        if summary.start:
+            out.write(f"<p>{html.escape(summary.start.get('host', ''))}, Python "
+                      f"{html.escape(summary.start.get('python', ''))}: "
+                      f"<code>pytest {html.escape(' '.join(summary.start.get('args', [])))}</code></p>")
+        _write_metrics(out, summary.metrics)
+        out.write("<h2>Tests</h2><table><tr><th>Result</th><th>Test</th><th>Duration</th><th>Worker</th></tr>")
+        for record in iter_records(path):
+            if record.get("event") != "test":
+                continue
+            outcome = record["outcome"]
+            if failures_only and outcome not in ("failed", "error", "xpassed"):
+                continue
+            out.write(f"<tr><td class='{outcome}'>{outcome}</td><td>{html.escape(record['nodeid'])}")
+            if record.get("longrepr"):
+                out.write(f"<details><summary>{html.escape(record.get('message') or record.get('when') or '')}"
+                          f"</summary><pre>{html.escape(record['longrepr'])}</pre>")
+                for title, content in record.get("sections") or []:
+                    out.write(f"<h4>{html.escape(title)}</h4><pre>{html.escape(content)}</pre>")
+                out.write("</details>")
+            out.write(f"</td><td>{record.get('duration') or 0:.3f}s</td>"
+                      f"<td>{html.escape(record.get('worker') or '')}</td></tr>\n")
+        out.write("</table></body></html>\n")
+    return summary
+
+
+def allure_result(record: Dict[str, Any]) -> Dict[str, Any]:
+    """An Allure result (the *-result.json format read by `allure generate`) for one test record"""
+    nodeid = record["nodeid"]
+    module, _, rest = nodeid.partition("::")
+    parts = rest.split("::") if rest else [module]
+    labels = [{"name": "suite", "value": module}, {"name": "framework", "value": "pytest"},
+              {"name": "language", "value": "python"}]
+    if len(parts) > 1:
+        labels.append({"name": "testClass", "value": parts[0]})
+    if record.get("worker"):
+        labels.append({"name": "thread", "value": record["worker"]})
+    result = {
+        "uuid": str(uuid.uuid4()),
+        "historyId": hashlib.md5(nodeid.encode("utf-8")).hexdigest(),
+        "fullName": nodeid,
+        "name": parts[-1],
+        "status": _ALLURE_STATUS.get(record["outcome"], "unknown"),
+        "stage": "finished",
+        "labels": labels,
+    }
+    if record.get("start") is not None:
+        result["start"] = int(record["start"] * 1000)
+        result["stop"] = int(record["stop"] * 1000)
+    if record.get("longrepr"):
+        result["statusDetails"] = {"message": record.get("message") or "", "trace": record["longrepr"]}
+    return result
+
+
+def write_allure(path: str, directory: str) -> int:
+    os.makedirs(directory, exist_ok=True)
+    count = 0
+    for record in iter_records(path):
+        if record.get("event") == "test":
+            result = allure_result(record)
+            with open(os.path.join(directory, f"{result['uuid']}-result.json"), "w", encoding="utf-8") as f:
+                json.dump(result, f)
+            count += 1
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("results", help="File written by pytest --results-jsonl")
+    parser.add_argument("--html", help="Write a standalone HTML report here")
+    parser.add_argument("--failures-only", action="store_true", help="Only list failed tests in the HTML report")
+    parser.add_argument("--allure", help="Write Allure results into this directory")
+    args = parser.parse_args(argv)
+    if not (args.html or args.allure):
+        parser.error("nothing to do: pass --html and/or --allure")
+    if args.html:
+        summary = render_html(args.results, args.html, args.failures_only)
+        print(f"wrote {args.html} ({summary.total} tests)")
+    if args.allure:
+        print(f"wrote {write_allure(args.results, args.allure)} results to {args.allure}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""pytest plugin streaming one JSON line per test to --results-jsonl, rendered later by `python -m utils.report`"""
+import json
+import os
+import platform
+import socket
+import threading
+import time
+import pytest
+from typing import Any, Dict, Optional
+
+results_writer_key = pytest.StashKey[Optional["ResultsWriter"]]()
+
+# Captured output kept with failed tests, cut so one noisy test can't bloat the file
+MAX_TEXT = 20000
+
+
+def _text(value: Any) -> str:
+    text = str(value)
+    return text if len(text) <= MAX_TEXT else text[:MAX_TEXT] + "\n... (truncated)"
+
+
+def _message(report) -> str:
+    """One-line reason of a failure or skip"""
+    if isinstance(report.longrepr, tuple):  # (path, lineno, reason) of a skip
+        return report.longrepr[2]
+    crash = getattr(report.longrepr, "reprcrash", None)
+    if crash is not None:
+        return crash.message.splitlines()[0]
+    lines = report.longreprtext.strip().splitlines()
+    return lines[-1] if lines else ""
+
+
+class ResultsWriter:
+    """Appends JSON lines to a file as events happen, one write per line, from a single process
+
+    Under xdist only the controller writes: workers' reports already reach it through pytest_runtest_logreport.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "w", buffering=1, encoding="utf-8")
+
+    def write(self, record: Dict[str, Any]):
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class _TestRecord:
+    """Phases (setup/call/teardown) of one test, merged into a single line when its teardown is reported"""
+
+    def __init__(self, report):
+        node = getattr(report, "node", None)  # set on reports relayed from an xdist worker
+        self.data: Dict[str, Any] = {
+            "event": "test", "nodeid": report.nodeid, "outcome": "passed", "when": None,
+            "start": report.start, "stop": report.stop, "duration": 0.0,
+            "worker": node.gateway.id if node is not None else None,
+        }
+
+    def add(self, report):
+        data = self.data
+        data["stop"] = report.stop
+        data["duration"] += report.duration
+        outcome = self._outcome(report)
+        if outcome != "passed" and data["outcome"] in ("passed", "xpassed"):
+            data["outcome"] = outcome
+            data["when"] = report.when
+            if report.longrepr is not None:
+                data["message"] = _text(_message(report))
+                data["longrepr"] = _text(report.longreprtext)
+            if report.failed:
+                data["sections"] = [[title, _text(content)] for title, content in report.sections]
+        elif outcome == "xpassed":
+            data["outcome"] = outcome
+        if report.when == "call":
+            data["properties"] = [list(prop) for prop in report.user_properties]
+
+    @staticmethod
+    def _outcome(report) -> str:
+        if hasattr(report, "wasxfail"):
+            return "xfailed" if report.skipped else "xpassed"
+        if report.failed:
+            return "failed" if report.when == "call" else "error"
+        return report.outcome
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("results", "streaming results")
+    group.addoption("--results-jsonl", default="",
+                    help="Write one JSON line per test to this file as tests finish ('' to disable)")
+
+
+def pytest_configure(config):
+    path = config.getoption("results_jsonl")
+    if not path or hasattr(config, "workerinput"):
+        config.stash[results_writer_key] = None
+        return
+    writer = config.stash[results_writer_key] = ResultsWriter(path)
+    config.pluginmanager.register(_ResultsRecorder(writer), "results_recorder")
+
+
+def pytest_unconfigure(config):
+    writer = config.stash.get(results_writer_key, None)
+    if writer is not None:
+        writer.close()
+
+
+class _ResultsRecorder:
+    def __init__(self, writer: ResultsWriter):
+        self.writer = writer
+        self.pending: Dict[str, _TestRecord] = {}
+        self.counts: Dict[str, int] = {}
+        self.started = time.time()
+
+    def pytest_sessionstart(self, session):
+        self.writer.write({"event": "session_start", "time": self.started, "host": socket.gethostname(),
+                           "python": platform.python_version(), "args": session.config.invocation_params.args})
+
+    def pytest_runtest_logreport(self, report):
+        record = self.pending.get(report.nodeid)
+        if record is None:
+            record = self.pending[report.nodeid] = _TestRecord(report)
+        record.add(report)
+        if report.when == "teardown":
+            del self.pending[report.nodeid]
+            outcome = record.data["outcome"]
+            self.counts[outcome] = self.counts.get(outcome, 0) + 1
+            self.writer.write(record.data)
+
+    def pytest_collectreport(self, report):
+        if report.failed:
+            self.counts["error"] = self.counts.get("error", 0) + 1
+            self.writer.write({"event": "test", "nodeid": report.nodeid or "<collection>", "outcome": "error",
+                               "when": "collect", "longrepr": _text(report.longreprtext)})
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_sessionfinish(self, session, exitstatus):
+        # Tests whose teardown never arrived (e.g. a crashed xdist worker) are still written
+        for record in self.pending.values():
+            self.writer.write(record.data)
+        self.pending.clear()
+        self.writer.write({"event": "session_finish", "time": time.time(), "duration": time.time() - self.started,
+                           "exitstatus": int(exitstatus), "counts": self.counts})
@@ -0,0 +1,142 @@
+import email.utils
+import random
+import threading
+import time
+from typing import Callable, Iterable, Optional
+import requests
+from config.config import Config
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class RetryBudget:
+    """Token bucket capping retries at a fraction of recent requests, so retries can't multiply load
+
+    Every request deposits `ratio` tokens (up to `max_tokens`) and every retry spends one; the bucket starts
+    with `min_tokens` so the first few transient failures can be retried.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_tokens: float = 10.0, max_tokens: float = 100.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = min_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self._tokens + self.ratio, self.max_tokens)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class CircuitBreaker:
+    """Stops retries after `threshold` consecutive failed attempts until `reset_timeout` seconds have passed
+
+    Requests themselves still go out (tests should fail, not hang); only the extra attempts are suppressed.
+    The first retry after the timeout probes the backend: another failure opens the circuit again.
+    """
+
+    def __init__(self, threshold: int = 5, reset_timeout: float = 30.0):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        opened_at = self._opened_at
+        return opened_at is not None and time.monotonic() - opened_at < self.reset_timeout
+
+    def record(self, failed: bool):
+        with self._lock:
+            if failed:
+                self.failures += 1
+                if self.failures >= self.threshold:
+                    self._opened_at = time.monotonic()
+            else:
+                self.failures = 0
+                self._opened_at = None
+
+
+# Shared by every client in the process, so retries are bounded across the whole test session
+_shared_budget: Optional[RetryBudget] = None
+_shared_breaker: Optional[CircuitBreaker] = None
+
+
+def shared_budget() -> RetryBudget:
+    global _shared_budget
+    if _shared_budget is None:
+        _shared_budget = RetryBudget(ratio=Config.RETRY_BUDGET_RATIO)
+    return _shared_budget
+
+
+def shared_breaker() -> CircuitBreaker:
+    global _shared_breaker
+    if _shared_breaker is None:
+        _shared_breaker = CircuitBreaker(Config.CIRCUIT_BREAKER_THRESHOLD, Config.CIRCUIT_BREAKER_RESET)
+    return _shared_breaker
+
+
+class RetryPolicy:
+    """When and how long APIClient waits before re-sending a request that failed transiently
+
+    Only idempotent methods are retried, plus POST/PATCH requests carrying an Idempotency-Key header.
+    Delays use exponential backoff with full jitter; a Retry-After header takes precedence, and one asking
+    for more than `max_retry_after` seconds ends the retries instead of stalling the test.
+    """
+
+    def __init__(self, max_retries: Optional[int] = None, backoff: Optional[float] = None,
+                 backoff_max: Optional[float] = None, max_retry_after: float = 30.0,
+                 statuses: Iterable[int] = RETRY_STATUSES, budget: Optional[RetryBudget] = None,
+                 breaker: Optional[CircuitBreaker] = None, sleep: Callable[[float], None] = time.sleep):
+        self.max_retries = Config.MAX_RETRIES if max_retries is None else max_retries
+        self.backoff = Config.RETRY_BACKOFF if backoff is None else backoff
+        self.backoff_max = Config.RETRY_BACKOFF_MAX if backoff_max is None else backoff_max
+        self.max_retry_after = max_retry_after
+        self.statuses = frozenset(statuses)
+        self.budget = budget or shared_budget()
+        self.breaker = breaker or shared_breaker()
+        self.sleep = sleep
+
+    def is_retryable_request(self, method: str, headers) -> bool:
+        return method.upper() in IDEMPOTENT_METHODS or bool(headers and headers.get(IDEMPOTENCY_HEADER))
+
+    def is_failure(self, response: Optional[requests.Response], error: Optional[BaseException]) -> bool:
+        if error is not None:
+            return isinstance(error, (requests.ConnectionError, requests.Timeout))
+        return response.status_code in self.statuses
+
+    def delay(self, attempt: int, response: Optional[requests.Response]) -> Optional[float]:
+        """Seconds to wait before retry number `attempt` (0-based), or None if the server asked for too long"""
+        retry_after = self.retry_after(response) if response is not None else None
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_retry_after else None
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2 ** attempt))
+
+    @staticmethod
+    def retry_after(response: requests.Response) -> Optional[float]:
+        """Parse a Retry-After header given either in seconds or as an HTTP date"""
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            date = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(date.timestamp() - time.time(), 0.0)
+
+    def should_retry(self, attempt: int) -> bool:
+        """Check the attempt limit, circuit breaker and budget, spending a budget token if the retry may go ahead"""
+        return attempt < self.max_retries and not self.breaker.is_open and self.budget.withdraw()
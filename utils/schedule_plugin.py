@@ -0,0 +1,232 @@
+"""pytest plugin remembering test durations across runs to order tests, schedule xdist and flag slowdowns"""
+import json
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+import pytest
+from typing import Dict, List, Optional, Tuple
+from xdist.scheduler import LoadScopeScheduling
+from config.config import Config
+from utils.history import Regression, RunHistory
+
+history_key = pytest.StashKey[Optional[RunHistory]]()
+hints_dir_key = pytest.StashKey[Optional[str]]()
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+ORDERS = ("slowest-first", "fail-first", "changed-first")
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("schedule", "duration history and xdist scheduling")
+    group.addoption("--history-db", default=Config.HISTORY_DB,
+                    help="sqlite file remembering test durations between runs ('' to disable)")
+    group.addoption("--api-schedule", action="store_true", default=False,
+                    help="With -n: spread read-only tests over all workers, keep mutating tests grouped by "
+                         "module/class or @pytest.mark.resource, and hand out the longest work first")
+    group.addoption("--order", choices=ORDERS, default=None,
+                    help="Run tests slowest first, last-failed first, or those whose file changed since they last ran first")
+    group.addoption("--regression-percentile", type=float, default=95.0,
+                    help="Baseline percentile of a test's recent durations to compare this run against (default 95)")
+    group.addoption("--regression-tolerance", type=float, default=0.2,
+                    help="How far above the baseline percentile counts as a regression (default 0.2 = 20%%)")
+    group.addoption("--regression-min-runs", type=int, default=5,
+                    help="Earlier runs needed before a test or endpoint is checked for regressions (default 5)")
+
+
+def pytest_configure(config):
+    path = config.getoption("history_db")
+    history = config.stash[history_key] = RunHistory(path) if path else None
+    # xdist workers only read the history (for --order); the controller records what they report
+    if history is not None and not hasattr(config, "workerinput"):
+        config.pluginmanager.register(_HistoryRecorder(config, history), "api-history-recorder")
+
+    hints_dir = None
+    if config.getoption("api_schedule") and config.getoption("numprocesses", None):
+        hints_dir = tempfile.mkdtemp(prefix="api-schedule-")
+    config.stash[hints_dir_key] = hints_dir
+
+
+def pytest_unconfigure(config):
+    history = config.stash.get(history_key, None)
+    if history is not None:
+        history.close()
+    hints_dir = config.stash.get(hints_dir_key, None)
+    if hints_dir:
+        shutil.rmtree(hints_dir, ignore_errors=True)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    hints_dir = node.config.stash[hints_dir_key]
+    if hints_dir:
+        node.workerinput["api_schedule_hints"] = hints_dir
+
+
+def _order_items(items: List[pytest.Item], order: str, history: RunHistory):
+    """Stable-sort items so the requested tests come first; every xdist worker computes the same order"""
+    if order == "slowest-first":
+        durations = history.durations()
+        items.sort(key=lambda item: -durations.get(item.nodeid, 0.0))
+        return
+    last_runs = history.last_runs()
+    if order == "fail-first":
+        items.sort(key=lambda item: last_runs.get(item.nodeid, ("",))[0] != "failed")
+        return
+    mtimes: Dict[str, float] = {}
+
+    def unchanged(item) -> bool:
+        last_run = last_runs.get(item.nodeid)
+        if last_run is None:
+            return False  # new test
+        path = str(item.path)
+        if path not in mtimes:
+            mtimes[path] = os.stat(path).st_mtime
+        return mtimes[path] <= last_run[1]
+
+    items.sort(key=unchanged)
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(config, items):
+    order = config.getoption("order")
+    history = config.stash[history_key]
+    if order and history is not None:
+        _order_items(items, order, history)
+
+    # On xdist workers, hand the markers of collected tests to the controller's scheduler
+    workerinput = getattr(config, "workerinput", None)
+    hints_dir = workerinput and workerinput.get("api_schedule_hints")
+    if not hints_dir:
+        return
+    hints = {}
+    for item in items:
+        hint = {}
+        if item.get_closest_marker("read_only"):
+            hint["kind"] = "read_only"
+        elif item.get_closest_marker("mutating"):
+            hint["kind"] = "mutating"
+        resource = item.get_closest_marker("resource")
+        if resource:
+            hint["resource"] = resource.args[0]
+        if hint:
+            hints[item.nodeid] = hint
+    path = os.path.join(hints_dir, f"{workerinput['workerid']}.json")
+    with open(path + ".tmp", "w") as f:
+        json.dump(hints, f)
+    os.replace(path + ".tmp", path)
+
+
+@pytest.hookimpl(tryfirst=True, optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    if config.stash[hints_dir_key]:
+        return APIScheduling(config, log)
+    return None
+
+
+class _HistoryRecorder:
+    """Sums the setup/call/teardown durations of each test, stores them when the session ends and reports regressions"""
+
+    def __init__(self, config, history: RunHistory):
+        self.config = config
+        self.history = history
+        self.running: Dict[str, Tuple[float, str]] = {}
+        self.results: List[Tuple[str, float, List[str], str]] = []
+        self.regressions: List[Tuple[str, Regression]] = []
+
+    def pytest_runtest_logreport(self, report):
+        duration, outcome = self.running.pop(report.nodeid, (0.0, "passed"))
+        duration += report.duration
+        if outcome == "passed":
+            outcome = report.outcome
+        if report.when != "teardown":
+            self.running[report.nodeid] = (duration, outcome)
+        elif outcome != "skipped":
+            # request_metrics adds the methods a test sent through the shared client
+            methods = dict(report.user_properties).get("api_methods", [])
+            self.results.append((report.nodeid, duration, methods, outcome))
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_sessionfinish(self):
+        # trylast: tests/conftest.py records this run's endpoint latencies first
+        if self.results:
+            self.history.record(self.results)
+        options = (self.config.getoption("regression_percentile"), self.config.getoption("regression_tolerance"),
+                   self.config.getoption("regression_min_runs"))
+        self.regressions = [("test", r) for r in self.history.test_regressions(*options)]
+        self.regressions += [("endpoint", r) for r in self.history.endpoint_regressions(*options)]
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.regressions:
+            return
+        q = self.config.getoption("regression_percentile")
+        terminalreporter.section("duration regressions", yellow=True)
+        for kind, r in self.regressions:
+            terminalreporter.line(
+                f"{kind:8} {r.name}: {r.value * 1000:.1f}ms vs p{q:g} {r.baseline * 1000:.1f}ms "
+                f"of last {r.runs} runs ({r.ratio:.1f}x)"
+            )
+
+
+class APIScheduling(LoadScopeScheduling):
+    """Load scheduling whose work units are single read-only tests or groups of mutating tests, longest first
+
+    A test is read-only if marked `read_only`, or if unmarked and it only sent safe methods last time it ran.
+    Mutating tests stay together per module/class, or per `resource` name, as with `--dist loadscope`.
+    """
+
+    def __init__(self, config, log=None):
+        super().__init__(config, log)
+        self.hints_dir = config.stash[hints_dir_key]
+        history = config.stash[history_key]
+        self.durations = history.durations() if history is not None else {}
+        self.methods = history.methods() if history is not None else {}
+        self._hints: Optional[Dict[str, Dict[str, str]]] = None
+        self._scopes: Dict[str, str] = {}
+        self._ordered = False
+
+    def _load_hints(self) -> Dict[str, Dict[str, str]]:
+        hints = {}
+        for name in os.listdir(self.hints_dir):
+            if name.endswith(".json"):
+                with open(os.path.join(self.hints_dir, name)) as f:
+                    hints.update(json.load(f))
+        return hints
+
+    def is_read_only(self, nodeid: str, kind: Optional[str]) -> bool:
+        if kind is not None:
+            return kind == "read_only"
+        methods = self.methods.get(nodeid)
+        return methods is not None and SAFE_METHODS.issuperset(methods)
+
+    def _split_scope(self, nodeid: str) -> str:
+        scope = self._scopes.get(nodeid)
+        if scope is None:
+            if self._hints is None:
+                self._hints = self._load_hints()
+            hint = self._hints.get(nodeid, {})
+            if hint.get("resource"):
+                scope = f"resource:{hint['resource']}"
+            elif self.is_read_only(nodeid, hint.get("kind")):
+                scope = nodeid
+            else:
+                scope = super()._split_scope(nodeid)
+            self._scopes[nodeid] = scope
+        return scope
+
+    def _assign_work_unit(self, node):
+        if not self._ordered:
+            known = [self.durations[nodeid] for nodeid in self.collection or () if nodeid in self.durations]
+            default = sum(known) / len(known) if known else 1.0
+            self.workqueue = OrderedDict(sorted(
+                self.workqueue.items(),
+                key=lambda unit: sum(self.durations.get(nodeid, default) for nodeid in unit[1]),
+                reverse=True,
+            ))
+            self._ordered = True
+        super()._assign_work_unit(node)
+
+    def remove_node(self, node):
+        # The dead node's work goes back into the queue and has to be re-sorted
+        self._ordered = False
+        return super().remove_node(node)
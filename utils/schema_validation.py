@@ -0,0 +1,85 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable
+from config.config import Config
+
+
+def _compile_fast(schema: Dict[str, Any]):
+    """Code-generate a validator with fastjsonschema when it is installed, otherwise return None"""
+    try:
+        import fastjsonschema
+    except ImportError:
+        return None
+    return fastjsonschema.compile(schema)
+
+
+class CachedValidator:
+    """Validator built once per schema; becomes a code-generated validator once the schema is hot"""
+
+    def __init__(self, schema: Dict[str, Any], fast_threshold: int = 0):
+        from jsonschema.validators import validator_for
+        validator_cls = validator_for(schema)
+        validator_cls.check_schema(schema)
+        self.schema = schema
+        self.calls = 0
+        self.fast_threshold = fast_threshold
+        self._validator = validator_cls(schema)
+        self._fast = None
+
+    def validate(self, instance: Any):
+        """Raise jsonschema.ValidationError if instance does not match the schema"""
+        self.calls += 1
+        if self._fast is None and self.fast_threshold and self.calls >= self.fast_threshold:
+            self._fast = _compile_fast(self.schema) or False
+        if self._fast:
+            try:
+                self._fast(instance)
+                return
+            except ValueError:
+                pass  # Fall through so failures are reported as a regular jsonschema ValidationError
+        self._validator.validate(instance)
+
+
+# Schemas whose validators are kept; least recently used ones are rebuilt when needed again
+MAX_CACHED_SCHEMAS = 256
+
+_lock = threading.Lock()
+_validators: "OrderedDict[int, CachedValidator]" = OrderedDict()
+_array_schemas: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+
+
+def _cached(cache: OrderedDict, schema: Dict[str, Any], schema_of: Callable[[Any], Any],
+            build: Callable[[Dict[str, Any]], Any]) -> Any:
+    """LRU lookup by id(schema); entries hold their schema, so the identity check rules out a reused id"""
+    key = id(schema)
+    with _lock:
+        entry = cache.get(key)
+        if entry is None or schema_of(entry) is not schema:
+            entry = cache[key] = build(schema)
+            while len(cache) > MAX_CACHED_SCHEMAS:
+                cache.popitem(last=False)
+        cache.move_to_end(key)
+        return entry
+
+
+def get_validator(schema: Dict[str, Any]) -> CachedValidator:
+    """Return the cached validator for this schema object, building it on first use"""
+    return _cached(_validators, schema, lambda validator: validator.schema,
+                   lambda s: CachedValidator(s, Config.SCHEMA_FAST_PATH_THRESHOLD))
+
+
+def _array_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    return _cached(_array_schemas, schema, lambda array_schema: array_schema["items"],
+                   lambda s: {"type": "array", "items": s})
+
+
+def validate(instance: Any, schema: Dict[str, Any]):
+    """Validate one instance using the cached validator for schema"""
+    get_validator(schema).validate(instance)
+
+
+def validate_many(objects: Iterable[Any], schema: Dict[str, Any]):
+    """Validate a whole list of objects against an item schema in a single validator call"""
+    if not isinstance(objects, list):
+        objects = list(objects)
+    get_validator(_array_schema(schema)).validate(objects)
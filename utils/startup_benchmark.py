@@ -0,0 +1,85 @@
+"""Measure how long collecting a large generated suite takes, and which imports it pays for
+
+    python -m utils.startup_benchmark --tests 2000 --budget-ms 3000
+
+Runs `python -X importtime -m pytest --collect-only` on a temporary directory of generated BaseTest
+modules under tests/ (so both conftest.py files load as usual) and exits non-zero if it exceeds the budget.
+"""
+import argparse
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)")
+
+
+def generate_tests(directory: str, count: int, per_module: int = 100):
+    """Write `count` test methods spread over modules of at most `per_module` tests each"""
+    for module, start in enumerate(range(0, count, per_module)):
+        lines = ["from tests.base_test import BaseTest", "", "", f"class TestGenerated{module}(BaseTest):"]
+        for i in range(start, min(start + per_module, count)):
+            lines += [f"    def test_case_{i}(self):", "        assert self.base_endpoint", ""]
+        with open(os.path.join(directory, f"test_generated_{module}.py"), "w") as f:
+            f.write("\n".join(lines))
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """(module, self us, cumulative us, nesting depth) for every line of -X importtime output"""
+    imports = []
+    for line in stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            imports.append((module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return imports
+
+
+def run(count: int, budget_ms: float, top: int) -> int:
+    directory = tempfile.mkdtemp(prefix="_startup_", dir=os.path.join(ROOT, "tests"))
+    try:
+        generate_tests(directory, count)
+        command = [sys.executable, "-X", "importtime", "-m", "pytest", "--collect-only", "-q",
+                   "-o", "addopts=", "-p", "no:cacheprovider", "--history-db", "", directory]
+        start = time.perf_counter()
+        process = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+        wall_ms = (time.perf_counter() - start) * 1000
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    if process.returncode != 0:
+        print(process.stdout[-2000:], process.stderr[-2000:], sep="\n")
+        return process.returncode
+    collected = re.search(r"(\d+) tests? collected", process.stdout)
+    imports = parse_importtime(process.stderr)
+    top_level = sorted((i for i in imports if i[3] == 0), key=lambda i: i[2], reverse=True)
+    import_ms = sum(i[2] for i in top_level) / 1000
+
+    print(f"collected {collected.group(1) if collected else '?'} tests in {wall_ms:.0f}ms "
+          f"(imports {import_ms:.0f}ms, budget {budget_ms:.0f}ms)")
+    print(f"{'cumulative ms':>14} {'self ms':>8}  module")
+    for module, self_us, cumulative_us, _ in top_level[:top]:
+        print(f"{cumulative_us / 1000:14.1f} {self_us / 1000:8.1f}  {module}")
+    if wall_ms > budget_ms:
+        print(f"FAILED: collection took {wall_ms:.0f}ms, over the {budget_ms:.0f}ms budget")
+        return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tests", type=int, default=2000, help="Number of generated tests to collect")
+    parser.add_argument("--budget-ms", type=float, default=5000, help="Fail if collection takes longer than this")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest top-level imports to list")
+    args = parser.parse_args(argv)
+    sys.exit(run(args.tests, args.budget_ms, args.top))
+
+
+if __name__ == "__main__":
+    main()
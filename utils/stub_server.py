@@ -0,0 +1,374 @@
+import argparse
+import copy
+import json
+import random
+import threading
+import time
+import uuid
+import zlib
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Dict, Any, List, Tuple
+from urllib.parse import urlsplit, parse_qsl
+from utils.payload import UnsupportedEncoding, compress, decompress, negotiate
+
+# Seed data mirroring the reserved objects of api.restful-api.dev that the tests assert on
+SEED_OBJECTS: List[Dict[str, Any]] = [
+    {"id": "1", "name": "Google Pixel 6 Pro", "data": {"color": "Cloudy White", "capacity": "128 GB"}},
+    {"id": "2", "name": "Apple iPhone 12 Mini, 256GB, Blue", "data": None},
+    {"id": "3", "name": "Apple iPhone 12 Pro Max", "data": {"color": "Cloudy White", "capacity GB": 512}},
+    {"id": "4", "name": "Apple iPhone 11, 64GB", "data": {"price": 389.99, "color": "Purple"}},
+    {"id": "5", "name": "Samsung Galaxy Z Fold2", "data": {"price": 689.99, "color": "Brown"}},
+    {"id": "6", "name": "Apple AirPods", "data": {"generation": "3rd", "price": 120}},
+    {"id": "7", "name": "Apple MacBook Pro 16", "data": {
+        "year": 2019, "price": 1849.99, "CPU model": "Intel Core i9", "Hard disk size": "1 TB"}},
+    {"id": "8", "name": "Apple Watch Series 8", "data": {"Strap Colour": "Elderberry", "Case Size": "41mm"}},
+    {"id": "9", "name": "Beats Studio3 Wireless", "data": {
+        "Color": "Red", "Description": "High-performance wireless noise cancelling headphones"}},
+    {"id": "10", "name": "Apple iPad Mini 5th Gen", "data": {"Capacity": "64 GB", "Screen size": 7.9}},
+    {"id": "11", "name": "Apple iPad Mini 5th Gen", "data": {"Capacity": "254 GB", "Screen size": 7.9}},
+    {"id": "12", "name": "Apple iPad Air", "data": {"Generation": "4th", "Price": "419.99", "Capacity": "64 GB"}},
+    {"id": "13", "name": "Apple iPad Air", "data": {"Generation": "4th", "Price": "519.99", "Capacity": "256 GB"}},
+]
+
+
+# Responses smaller than this are sent uncompressed even when the server compresses
+COMPRESS_MIN_BYTES = 1024
+
+
+class _BodyError(Exception):
+    """A request body the stub can't read, answered with `status`"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _timestamp() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+class ObjectStore:
+    """Thread-safe in-memory store implementing the /objects contract
+
+    Each object is kept alongside its encoded JSON so reads never re-serialize it.
+    """
+
+    def __init__(self, seed: Optional[List[Dict[str, Any]]] = None):
+        self._lock = threading.Lock()
+        self._objects: Dict[str, Dict[str, Any]] = {}
+        self._encoded: Dict[str, bytes] = {}
+        for obj in copy.deepcopy(SEED_OBJECTS if seed is None else seed):
+            self._put(obj)
+
+    def _put(self, obj: Dict[str, Any]):
+        self._objects[obj["id"]] = obj
+        self._encoded[obj["id"]] = json.dumps(obj).encode("utf-8")
+
+    def list(self, ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            if ids is None:
+                return list(self._objects.values())
+            return [self._objects[id_] for id_ in ids if id_ in self._objects]
+
+    def list_encoded(self, ids: Optional[List[str]] = None) -> bytes:
+        """The JSON array of the requested objects, assembled from their cached encodings"""
+        with self._lock:
+            if ids is None:
+                parts = list(self._encoded.values())
+            else:
+                parts = [self._encoded[id_] for id_ in ids if id_ in self._encoded]
+        return b"[" + b", ".join(parts) + b"]"
+
+    def get(self, object_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._objects.get(object_id)
+
+    def get_encoded(self, object_id: str) -> Optional[bytes]:
+        with self._lock:
+            return self._encoded.get(object_id)
+
+    def create(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        obj = {
+            "id": uuid.uuid4().hex,
+            "name": payload.get("name"),
+            "createdAt": _timestamp(),
+            "data": payload.get("data"),
+        }
+        with self._lock:
+            self._put({k: v for k, v in obj.items() if k != "createdAt"})
+        return obj
+
+    def replace(self, object_id: str, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if object_id not in self._objects:
+                return None
+            obj = {"id": object_id, "name": payload.get("name"), "data": payload.get("data")}
+            self._put(obj)
+        return dict(obj, updatedAt=_timestamp())
+
+    def update(self, object_id: str, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if object_id not in self._objects:
+                return None
+            # Replace rather than mutate so concurrent readers never serialize a half-updated object
+            obj = dict(self._objects[object_id])
+            for key in ("name", "data"):
+                if key in payload:
+                    obj[key] = payload[key]
+            self._put(obj)
+        return dict(obj, updatedAt=_timestamp())
+
+    def delete(self, object_id: str) -> bool:
+        with self._lock:
+            self._encoded.pop(object_id, None)
+            return self._objects.pop(object_id, None) is not None
+
+
+class _StubRequestHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps connections alive so pooled clients reuse them
+    protocol_version = "HTTP/1.1"
+    # Buffer writes so headers and body leave in one send; _send_bytes flushes after every response
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    @property
+    def store(self) -> ObjectStore:
+        return self.server.store
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_bytes(self, status: int, payload: bytes, headers: Optional[Dict[str, str]] = None):
+        if self.server.stub.compress_responses and len(payload) >= COMPRESS_MIN_BYTES:
+            encoding = negotiate(self.headers.get("Accept-Encoding"))
+            if encoding is not None:
+                payload = compress(payload, encoding)
+                headers = dict(headers or {}, **{"Content-Encoding": encoding, "Vary": "Accept-Encoding"})
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+        self.wfile.flush()
+
+    def _send_representation(self, payload: bytes):
+        """Send a GET body with an ETag, or 304 without one if the client already has it"""
+        etag = f'"{zlib.crc32(payload):08x}-{len(payload):x}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.flush()
+        else:
+            self._send_bytes(200, payload, {"ETag": etag})
+
+    def _send_json(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None):
+        self._send_bytes(status, json.dumps(body).encode("utf-8"), headers)
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        body = self.rfile.read(length)
+        try:
+            body = decompress(body, self.headers.get("Content-Encoding"))
+        except UnsupportedEncoding as e:
+            raise _BodyError(415, str(e))
+        except Exception as e:  # gzip, zlib and zstandard each raise their own error for a corrupt body
+            raise _BodyError(400, f"Body doesn't match its Content-Encoding: {e}")
+        try:
+            payload = json.loads(body)
+        except ValueError as e:  # JSONDecodeError, or UnicodeDecodeError for bytes that aren't text
+            raise _BodyError(400, f"Body is not valid JSON: {e}")
+        if not isinstance(payload, dict):
+            raise _BodyError(400, f"Body must be a JSON object, not {type(payload).__name__}")
+        return payload
+
+    def _route(self) -> Tuple[Optional[str], List[Tuple[str, str]]]:
+        """Return the object id (or None for the collection) and the query pairs"""
+        parts = urlsplit(self.path)
+        segments = [s for s in parts.path.split("/") if s]
+        if not segments or segments[0] != "objects" or len(segments) > 2:
+            raise LookupError(parts.path)
+        object_id = segments[1] if len(segments) == 2 else None
+        return object_id, parse_qsl(parts.query, keep_blank_values=True)
+
+    def _not_found(self, object_id: str):
+        self._send_json(404, {"error": f"Object with id={object_id} was not found."})
+
+    def _inject_faults(self) -> bool:
+        """Apply the server's configured latency and error rate; return True if an error was sent"""
+        stub = self.server.stub
+        delay = stub.latency + (stub.rng.uniform(0, stub.jitter) if stub.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        if stub.error_rate and stub.rng.random() < stub.error_rate:
+            # The body may still be pending; drain it so the connection stays usable
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            headers = {"Retry-After": str(stub.retry_after)} if stub.retry_after is not None else None
+            self._send_json(stub.error_status, {"error": "Injected failure"}, headers)
+            return True
+        return False
+
+    def _handle(self, method: str):
+        if self._inject_faults():
+            return
+        try:
+            object_id, query = self._route()
+        except LookupError:
+            self._send_json(404, {"error": "Not Found"})
+            return
+        try:
+            self._dispatch(method, object_id, query)
+        except _BodyError as e:
+            self._send_json(e.status, {"error": str(e)})
+
+    def _dispatch(self, method: str, object_id: Optional[str], query: List[Tuple[str, str]]):
+        if method == "GET":
+            if object_id is None:
+                ids = [v for k, v in query if k == "id"]
+                self._send_representation(self.store.list_encoded(ids if ids else None))
+                return
+            encoded = self.store.get_encoded(object_id)
+            if encoded is None:
+                self._not_found(object_id)
+            else:
+                self._send_representation(encoded)
+            return
+
+        if method == "POST":
+            if object_id is not None:
+                self._send_json(405, {"error": "Method Not Allowed"})
+                return
+            self._send_json(200, self.store.create(self._read_json()))
+            return
+
+        if object_id is None:
+            self._send_json(405, {"error": "Method Not Allowed"})
+            return
+
+        if method == "DELETE":
+            if self.store.delete(object_id):
+                self._send_json(200, {"message": f"Object with id = {object_id} has been deleted."})
+            else:
+                self._not_found(object_id)
+            return
+
+        payload = self._read_json()
+        if method == "PUT":
+            obj = self.store.replace(object_id, payload)
+        else:
+            obj = self.store.update(object_id, payload)
+        if obj is None:
+            self._not_found(object_id)
+        else:
+            self._send_json(200, obj)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+
+class StubServer:
+    """In-process HTTP server serving the /objects API on a background thread
+
+    latency/jitter (seconds) delay every response by `latency + uniform(0, jitter)`, and a fraction
+    `error_rate` of requests fail with `error_status` (sending `Retry-After` when retry_after is set).
+    With compress_responses, bodies of at least COMPRESS_MIN_BYTES are compressed with the best encoding the
+    request's Accept-Encoding allows. All of them can be changed while the server is running.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, seed: Optional[List[Dict[str, Any]]] = None,
+                 latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, error_status: int = 500,
+                 retry_after: Optional[int] = None, random_seed: Optional[int] = None,
+                 compress_responses: bool = False):
+        self._httpd = ThreadingHTTPServer((host, port), _StubRequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.store = ObjectStore(seed)
+        self._httpd.stub = self
+        self.rng = random.Random(random_seed)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.compress_responses = compress_responses
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def store(self) -> ObjectStore:
+        return self._httpd.store
+
+    def start(self) -> "StubServer":
+        """Start serving requests on a daemon thread"""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serve requests on the calling thread until interrupted"""
+        try:
+            self._httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._httpd.server_close()
+
+    def stop(self):
+        """Stop serving and release the listening socket"""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main(argv: Optional[List[str]] = None):
+    """Serve the stub in the foreground: python -m utils.stub_server --port 8000"""
+    parser = argparse.ArgumentParser(description="Local stub of the /objects API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Extra random delay, uniform in [0, jitter]")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=500, help="Status code of injected failures")
+    parser.add_argument("--retry-after", type=int, default=None, help="Retry-After seconds sent with failures")
+    parser.add_argument("--random-seed", type=int, default=None, help="Seed for reproducible jitter and errors")
+    parser.add_argument("--compress", action="store_true", help="Compress responses the client accepts compressed")
+    args = parser.parse_args(argv)
+
+    server = StubServer(args.host, args.port, latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000,
+                        error_rate=args.error_rate, error_status=args.error_status,
+                        retry_after=args.retry_after, random_seed=args.random_seed,
+                        compress_responses=args.compress)
+    print(f"Serving /objects stub on {server.url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()